@@ -1,126 +1,70 @@
 # gui_app.py
+import os
 import sys
-from datetime import datetime, timedelta
-import psycopg2
+import time
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel,
-    QLineEdit, QPushButton, QStackedWidget, QTableWidget, QTableWidgetItem,
-    QMessageBox, QFormLayout, QSpinBox, QComboBox
+    QLineEdit, QPushButton, QStackedWidget, QTableWidget, QTableWidgetItem, QTableView,
+    QMessageBox, QFormLayout, QSpinBox, QComboBox, QCheckBox, QAbstractItemView
+)
+from PyQt5.QtCore import (
+    Qt, QAbstractTableModel, QModelIndex, QObject, QRunnable, QThreadPool, pyqtSignal
 )
-from PyQt5.QtCore import Qt
-
-# If you already have backend/*.py files and want to use them, they'll still be used for convenience.
-# But this file is self-contained for GUI+DB operations.
-try:
-    from backend.user import User  # optional, used if available
-except Exception:
-    User = None
-
-try:
-    from backend.member import Member  # optional wrapper class
-except Exception:
-    Member = None
-
-try:
-    from backend.librarian import Librarian  # optional wrapper class
-except Exception:
-    Librarian = None
-
-# ---------------- Database Config ----------------
-db_config = {
-    "host": "localhost",
-    "database": "smartlibrary",
-    "user": "postgres",
-    "password": "Pes@2022"
-}
 
-# ---------------- Utility: detect user table ----------------
-def detect_user_table():
-    """
-    Return a safe table identifier to use for queries that need the users table.
-    It tries several common names and falls back to searching information_schema.
-    The return value is the table identifier to insert directly into SQL (e.g. user_account or "User").
-    """
-    conn = None
+# The GUI is a front end over backend/ (SQL, pooling, caching, policy); make it
+# importable when started as `python gui_app.py` from this directory.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.config import db_config  # shared with main.py and the jobs
+from backend.db import get_pool  # shared connection pool
+from backend.cache import cached, invalidate  # reference-data and catalog-page caches
+from backend.queries import run_query  # every statement, by name
+from backend.user import User
+from backend.member import Member
+from backend.librarian import Librarian
+from backend.catalog import Catalog  # ranked search and filtered browsing
+from backend.stats import LibraryStats  # one-round-trip dashboard figures
+from backend.leaderboard import Leaderboard  # windowed most-borrowed
+from backend.migrate import migrate  # schema + indexes, applied at startup
+from backend.notify import ChangeListener  # LISTEN/NOTIFY row-change feed
+
+def get_conn_cursor():
+    # conn.close() on a pooled connection returns it to the pool
+    conn = get_pool(db_config).getconn()
     try:
-        conn = psycopg2.connect(**db_config)
         cur = conn.cursor()
-
-        # Try some common names in order
-        candidates = ['user', 'user_account', 'users', 'User']
-        for name in candidates:
-            cur.execute("SELECT to_regclass(%s);", (f'public.{name}',))
-            res = cur.fetchone()
-            if res and res[0]:
-                # if name contains uppercase letters, we need to quote it in SQL
-                if any(c.isupper() for c in name):
-                    return f'"{name}"'
-                else:
-                    return name
-
-        # fallback: find any table name starting with user (case-insensitive)
-        cur.execute("""
-            SELECT table_name FROM information_schema.tables
-            WHERE table_schema='public' AND table_name ILIKE 'user%'
-            LIMIT 1;
-        """)
-        r = cur.fetchone()
-        if r:
-            t = r[0]
-            if any(c.isupper() for c in t):
-                return f'"{t}"'
-            else:
-                return t
-
-        # if none found, return plain user (will likely error)
-        return 'user'
     except Exception:
-        # fallback
-        return 'user'
-    finally:
-        if conn:
-            conn.close()
-
-# Detect once at module load
-USER_TABLE_IDENTIFIER = detect_user_table()
-
-
-# ---------------- Helper Functions ----------------
-def get_conn_cursor():
-    conn = psycopg2.connect(**db_config)
-    cur = conn.cursor()
+        conn.close()
+        raise
     return conn, cur
 
-def get_books():
+# ---------------- Helper Functions ----------------
+@cached("books")
+def get_books_page(after_id=0, limit=200):
+    """One keyset page of the catalog: rows with book_id > after_id, in book_id order"""
     conn, cur = get_conn_cursor()
     try:
-        cur.execute("SELECT book_id, title, category, isbn, copies_available FROM book ORDER BY book_id;")
-        rows = cur.fetchall()
-        return rows
+        run_query(cur, "catalog_page", (after_id, limit))
+        return cur.fetchall()
     finally:
         cur.close()
         conn.close()
 
-def get_authors():
+def get_books_by_ids(book_ids):
+    # never cached: used to patch rows another desk just changed
     conn, cur = get_conn_cursor()
     try:
-        cur.execute("SELECT author_id, full_name FROM author ORDER BY author_id;")
-        rows = cur.fetchall()
-        return rows
+        run_query(cur, "catalog_by_ids", (list(book_ids),))
+        return cur.fetchall()
     finally:
         cur.close()
         conn.close()
 
-def get_most_borrowed(limit=5):
+@cached("authors")
+def get_authors():
     conn, cur = get_conn_cursor()
     try:
-        cur.execute("""
-            SELECT b.book_id, b.title, COUNT(*) as cnt
-            FROM loan l JOIN book b ON l.book_id = b.book_id
-            GROUP BY b.book_id, b.title
-            ORDER BY cnt DESC
-            LIMIT %s;
-        """, (limit,))
+        run_query(cur, "all_authors")
         rows = cur.fetchall()
         return rows
     finally:
@@ -130,65 +74,311 @@ def get_most_borrowed(limit=5):
 def get_active_loans_for_member(member_id):
     conn, cur = get_conn_cursor()
     try:
-        cur.execute("""
-            SELECT l.loan_id, b.book_id, b.title, l.borrow_date, l.due_date
-            FROM loan l JOIN book b ON l.book_id = b.book_id
-            WHERE l.member_id=%s AND l.returned=FALSE;
-        """, (member_id,))
+        run_query(cur, "member_loans", (member_id,))
         rows = cur.fetchall()
         return rows
     finally:
         cur.close()
         conn.close()
 
-def get_members_count():
-    conn, cur = get_conn_cursor()
-    try:
-        # Use detected user table identifier
-        cur.execute(f"SELECT COUNT(*) FROM {USER_TABLE_IDENTIFIER} WHERE role_id=2;")
-        count = cur.fetchone()[0]
-        return count
-    finally:
-        cur.close()
-        conn.close()
-
-def get_active_loans_count():
-    conn, cur = get_conn_cursor()
-    try:
-        cur.execute("SELECT COUNT(*) FROM loan WHERE returned=FALSE;")
-        count = cur.fetchone()[0]
-        return count
-    finally:
-        cur.close()
-        conn.close()
-
+@cached("bookclubs")
 def get_bookclubs():
     conn, cur = get_conn_cursor()
     try:
-        cur.execute("SELECT club_id, club_name, moderator_id FROM bookclub ORDER BY club_id;")
+        run_query(cur, "all_book_clubs")
         rows = cur.fetchall()
         return rows
     finally:
         cur.close()
         conn.close()
 
+@cached("bookclub_members")
 def get_bookclub_members(club_id):
     conn, cur = get_conn_cursor()
     try:
-        # use detected user table identifier
-        cur.execute(f"""
-            SELECT u.user_id, u.full_name
-            FROM bookclubmembers bcm
-            JOIN {USER_TABLE_IDENTIFIER} u ON bcm.member_id = u.user_id
-            WHERE bcm.club_id = %s;
-        """, (club_id,))
+        run_query(cur, "club_members", (club_id,))
         rows = cur.fetchall()
         return rows
     finally:
         cur.close()
         conn.close()
 
+def execute_write(query, params, *namespaces):
+    """One named write (backend/queries.py) in its own transaction; drops the cached namespaces"""
+    conn, cur = get_conn_cursor()
+    try:
+        run_query(cur, query, params)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close(); conn.close()
+    invalidate(*namespaces)
+
+def submit_write(page, done_text, error_text, topic, query, params, *namespaces, after=None):
+    """
+    Run execute_write on the page's QueryExecutor so the window stays responsive,
+    then report the outcome and mark pages showing `topic` stale.
+    """
+    def done(_):
+        QMessageBox.information(page, "Success", done_text)
+        if topic:
+            page.parent.notify_write(topic)
+        if after:
+            after()
+
+    def failed(message):
+        QMessageBox.critical(page, "Error", error_text + message)
+
+    page.parent.db.submit(None, execute_write, query, params, *namespaces, on_done=done, on_error=failed)
+
+# ---------------- Background Queries ----------------
+class ChangeSignals(QObject):
+    # carries change notifications from the listener thread to the UI thread
+    changed = pyqtSignal(object)
+
+class QuerySignals(QObject):
+    finished = pyqtSignal(int, object)
+    failed = pyqtSignal(int, str)
+
+class QueryTask(QRunnable):
+    def __init__(self, ticket, fn, args, signals):
+        super().__init__()
+        # QueryExecutor keeps the task until it reports back, so the pool never
+        # deletes one that tryTake() might still be handed
+        self.setAutoDelete(False)
+        self.ticket = ticket
+        self.fn = fn
+        self.args = args
+        self.signals = signals
+
+    def run(self):
+        try:
+            result = self.fn(*self.args)
+        except Exception as e:
+            self.signals.failed.emit(self.ticket, str(e))
+        else:
+            self.signals.finished.emit(self.ticket, result)
+
+class QueryExecutor(QObject):
+    """
+    Runs DB calls on a QThreadPool and hands results back on the UI thread.
+    Calls submitted under the same key supersede each other: a queued older call
+    is dropped before it starts and a running one has its result ignored.
+    """
+    busy_changed = pyqtSignal(bool)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pool = QThreadPool.globalInstance()
+        self.signals = QuerySignals()
+        self.signals.finished.connect(self._on_finished)
+        self.signals.failed.connect(self._on_failed)
+        self.next_ticket = 0
+        self.pending = {}   # ticket -> (key, on_done, on_error)
+        self.latest = {}    # key -> (ticket, task)
+        self.tasks = {}     # ticket -> task, alive until it finishes or is taken back
+
+    def submit(self, key, fn, *args, on_done=None, on_error=None):
+        """key=None means the call is never superseded (use it for writes)"""
+        self.next_ticket += 1
+        ticket = self.next_ticket
+        task = QueryTask(ticket, fn, args, self.signals)
+        if key is not None:
+            previous = self.latest.get(key)
+            if previous and self.pool.tryTake(previous[1]):
+                self.pending.pop(previous[0], None)
+                self.tasks.pop(previous[0], None)
+            self.latest[key] = (ticket, task)
+        self.pending[ticket] = (key, on_done, on_error)
+        self.tasks[ticket] = task
+        self.busy_changed.emit(True)
+        self.pool.start(task)
+        return ticket
+
+    def _take(self, ticket):
+        key, on_done, on_error = self.pending.pop(ticket, (None, None, None))
+        self.tasks.pop(ticket, None)
+        current = True
+        if key is not None:
+            current = self.latest.get(key, (None,))[0] == ticket
+            if current:
+                del self.latest[key]
+        if not self.pending:
+            self.busy_changed.emit(False)
+        return current, on_done, on_error
+
+    def _on_finished(self, ticket, result):
+        current, on_done, _ = self._take(ticket)
+        if current and on_done:
+            on_done(result)
+
+    def _on_failed(self, ticket, message):
+        current, _, on_error = self._take(ticket)
+        if current and on_error:
+            on_error(message)
+        elif current:
+            print("Background query failed:", message)
+
+# ---------------- Models ----------------
+class BookTableModel(QAbstractTableModel):
+    """
+    Catalog rows for a QTableView, fetched a page at a time as the view scrolls
+    (keyset pagination: each page starts after the last row fetched, in the
+    listing's order), so only the pages actually looked at are loaded.
+    """
+    HEADERS = ["ID","Title","Category","ISBN","Available"]
+
+    def __init__(self, page_size=200, parent=None, executor=None):
+        super().__init__(parent)
+        self.page_size = page_size
+        self.executor = executor
+        self.fetching = False
+        self.rows = []
+        self.search_fn = None
+        self.browse_fn = None
+        self.last_row = None   # as fetched: the next page's cursor, unaffected by patches
+        self.exhausted = False
+
+    def set_catalog(self):
+        """Page through the whole catalog in book_id order"""
+        self._reset(None, None)
+
+    def set_search(self, search_fn):
+        """Page through ranked results instead: search_fn(limit, offset) -> rows"""
+        self._reset(search_fn, None)
+
+    def set_browse(self, browse_fn):
+        """Page through a filtered, sorted listing: browse_fn(limit, after_row) -> rows"""
+        self._reset(None, browse_fn)
+
+    def reload(self):
+        self._reset(self.search_fn, self.browse_fn)
+
+    def _reset(self, search_fn, browse_fn):
+        self.beginResetModel()
+        self.search_fn = search_fn
+        self.browse_fn = browse_fn
+        self.last_row = None
+        self.rows = []
+        self.exhausted = False
+        self.fetching = False   # a page still in flight belongs to the old filter
+        self.endResetModel()
+        self.fetchMore()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role != Qt.DisplayRole:
+            return None
+        return str(self.rows[index.row()][index.column()])
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self.exhausted and not self.fetching
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self.exhausted or self.fetching:
+            return
+        args = (self.search_fn, self.browse_fn, self.last_row, len(self.rows), self.page_size)
+        if self.executor:
+            self.fetching = True
+            self.executor.submit(("book_model", id(self)), self._load_page, *args,
+                                 on_done=self._append_page, on_error=self._fetch_failed)
+        else:
+            self._append_page(self._load_page(*args))
+
+    @staticmethod
+    def _load_page(search_fn, browse_fn, last_row, offset, page_size):
+        if search_fn:
+            return [r[:len(BookTableModel.HEADERS)] for r in search_fn(page_size, offset)]
+        if browse_fn:
+            return browse_fn(page_size, last_row)
+        return get_books_page(last_row[0] if last_row else 0, page_size)
+
+    def _fetch_failed(self, message):
+        self.fetching = False
+        print("Error loading books:", message)
+
+    def _append_page(self, page):
+        self.fetching = False
+        self.exhausted = len(page) < self.page_size
+        if page:
+            self.last_row = tuple(page[-1])
+            self.beginInsertRows(QModelIndex(), len(self.rows), len(self.rows) + len(page) - 1)
+            self.rows.extend(page)
+            self.endInsertRows()
+
+    def row_values(self, row):
+        return self.rows[row]
+
+    def patch(self, op, book_ids):
+        """
+        Apply a change notification: drop deleted rows, re-read updated ones
+        in place, and let new books page in. book_ids None means reload.
+        """
+        if book_ids is None:
+            self.reload()
+            return
+        if op == "DELETE":
+            gone = set(book_ids)
+            for i in reversed(range(len(self.rows))):
+                if self.rows[i][0] in gone:
+                    self.beginRemoveRows(QModelIndex(), i, i)
+                    del self.rows[i]
+                    self.endRemoveRows()
+        elif op == "INSERT":
+            if self.search_fn is None and self.exhausted:
+                self.exhausted = False   # rows sorting after the last one loaded page in
+                self.fetchMore()
+        else:
+            loaded = {r[0] for r in self.rows}
+            wanted = [b for b in book_ids if b in loaded]
+            if wanted and self.executor:
+                self.executor.submit(None, get_books_by_ids, wanted, on_done=self._apply_patch)
+
+    def _apply_patch(self, fresh):
+        by_id = {r[0]: r for r in fresh}
+        width = len(self.HEADERS)
+        for i, row in enumerate(self.rows):
+            new = by_id.get(row[0])
+            if new is not None and tuple(new) != tuple(row[:width]):
+                self.rows[i] = tuple(new)
+                self.dataChanged.emit(self.index(i, 0), self.index(i, width - 1))
+
+def make_book_view(model):
+    view = QTableView()
+    view.setModel(model)
+    view.setSelectionBehavior(QAbstractItemView.SelectRows)
+    return view
+
 # ---------------- Pages / Widgets ----------------
+def selected_ids(tbl):
+    """IDs (column 0) of every selected row, top to bottom"""
+    rows = sorted({idx.row() for idx in tbl.selectionModel().selectedRows()})
+    if not rows and tbl.currentIndex().row() >= 0:
+        rows = [tbl.currentIndex().row()]
+    model = tbl.model()
+    return [int(model.index(r,0).data()) for r in rows]
+
+def show_batch_result(widget, title, results, id_key, ok_status):
+    done = [str(r[id_key]) for r in results if r["status"] == ok_status]
+    lines = [f"{ok_status.capitalize()}: {len(done)} of {len(results)}"]
+    for r in results:
+        if r["status"] != ok_status:
+            lines.append(f"{id_key} {r[id_key]}: {r['status'].replace('_',' ')}")
+    box = QMessageBox.information if len(done) == len(results) else QMessageBox.warning
+    box(widget, title, "\n".join(lines))
+
 class LoginPage(QWidget):
     def __init__(self, parent):
         super().__init__()
@@ -220,32 +410,21 @@ class LoginPage(QWidget):
             QMessageBox.warning(self, "Login", "Enter username and password")
             return
 
-        # Prefer using backend.User if available (you said your previous login works)
-        if User:
-            try:
-                row = User(db_config).login(uname, pwd)
-            except Exception as e:
-                row = None
-        else:
-            # fallback: direct DB query using detected table
-            conn, cur = None, None
-            try:
-                conn = psycopg2.connect(**db_config)
-                cur = conn.cursor()
-                # Make safe query using detected table
-                # some user tables may have more columns; we select first three expected ones
-                query = f"SELECT user_id, full_name, role_id FROM {USER_TABLE_IDENTIFIER} WHERE username = %s AND password = %s;"
-                cur.execute(query, (uname, pwd))
-                row = cur.fetchone()
-            except Exception as e:
-                QMessageBox.critical(self, "Login error", f"Login query failed: {e}")
-                row = None
-            finally:
-                if cur:
-                    cur.close()
-                if conn:
-                    conn.close()
+        self.login_btn.setEnabled(False)
+        self.parent.db.submit("login", self.lookup_user, uname, pwd,
+                              on_done=self.finish_login, on_error=self.login_failed)
+
+    @staticmethod
+    def lookup_user(uname, pwd):
+        # hashed-password check (backend/auth.py); errors show as "Login query failed"
+        return User(db_config).login(uname, pwd)
+
+    def login_failed(self, message):
+        self.login_btn.setEnabled(True)
+        QMessageBox.critical(self, "Login error", f"Login query failed: {message}")
 
+    def finish_login(self, row):
+        self.login_btn.setEnabled(True)
         if not row:
             QMessageBox.critical(self, "Login Failed", "Invalid username or password")
             return
@@ -262,25 +441,12 @@ class LoginPage(QWidget):
         QMessageBox.information(self, "Welcome", f"Welcome {full_name}!")
 
         if role_id == 1:
-            self.parent.current_user = {'id': user_id, 'name': full_name, 'role': 'librarian'}
-            # use backend librarian if available
-            if Librarian:
-                try:
-                    self.parent.backend_user = Librarian(db_config, user_id, full_name)
-                except Exception:
-                    self.parent.backend_user = None
-            else:
-                self.parent.backend_user = None
+            self.parent.current_user = {'id': user_id, 'name': full_name, 'role': 'librarian', 'role_id': role_id}
+            self.parent.backend_user = Librarian(db_config, user_id, full_name)
             self.parent.setup_for_librarian()
         else:
-            self.parent.current_user = {'id': user_id, 'name': full_name, 'role': 'member'}
-            if Member:
-                try:
-                    self.parent.backend_user = Member(db_config, user_id, full_name)
-                except Exception:
-                    self.parent.backend_user = None
-            else:
-                self.parent.backend_user = None
+            self.parent.current_user = {'id': user_id, 'name': full_name, 'role': 'member', 'role_id': role_id}
+            self.parent.backend_user = Member(db_config, user_id, full_name, role_id)
             self.parent.setup_for_member()
 
         self.parent.switch_to_main()
@@ -338,19 +504,37 @@ class DashboardPage(QWidget):
 
         self.tbl_most = QTableWidget(0,3)
         self.tbl_most.setHorizontalHeaderLabels(["Book ID","Title","Borrowed Count"])
-        layout.addWidget(QLabel("Most Borrowed Books"))
+        self.cmb_window = QComboBox()
+        self.cmb_window.addItem("All time", "all")
+        self.cmb_window.addItem("Last 30 days", "30d")
+        self.cmb_window.addItem("Last 7 days", "7d")
+        self.cmb_window.currentIndexChanged.connect(self.refresh)
+        hl = QHBoxLayout()
+        hl.addWidget(QLabel("Most Borrowed Books"))
+        hl.addStretch()
+        hl.addWidget(self.cmb_window)
+        layout.addLayout(hl)
         layout.addWidget(self.tbl_most)
 
         layout.addStretch()
         self.setLayout(layout)
 
     def refresh(self):
-        books = get_books()
-        members = get_members_count()
-        active_loans = get_active_loans_count()
-        self.lbl_summary.setText(f"Books: {len(books)}    Members: {members}    Active Loans: {active_loans}")
+        window = self.cmb_window.currentData()
+        self.parent.db.submit("dashboard", self.fetch_stats, window, on_done=self.show_stats)
+
+    @staticmethod
+    def fetch_stats(window="all"):
+        s = LibraryStats(db_config).dashboard_stats()
+        stats = [s["books"], s["members"], s["active_loans"], s["most_borrowed"]]
+        if window != "all":
+            stats[3] = Leaderboard(db_config).top(window)
+        return stats
+
+    def show_stats(self, stats):
+        books, members, active_loans, rows = stats
+        self.lbl_summary.setText(f"Books: {books}    Members: {members}    Active Loans: {active_loans}")
 
-        rows = get_most_borrowed()
         self.tbl_most.setRowCount(0)
         for r in rows:
             row_idx = self.tbl_most.rowCount()
@@ -358,7 +542,18 @@ class DashboardPage(QWidget):
             for c, val in enumerate(r):
                 self.tbl_most.setItem(row_idx, c, QTableWidgetItem(str(val)))
 
+# Catalog sort choices -> Catalog.browse sort keys (backend/catalog.py COMMON_SORTS)
+SORT_PRESETS = [
+    ("Title A-Z", [("title", "asc")]),
+    ("Title Z-A", [("title", "desc")]),
+    ("Category, then title", [("category", "asc"), ("title", "asc")]),
+    ("Most copies available", [("available", "desc"), ("title", "asc")]),
+    ("Catalog order", [("book_id", "asc")]),
+]
+
 class CatalogPage(QWidget):
+    facets_loaded = pyqtSignal(object)   # emitted from the worker that loaded the first page
+
     def __init__(self, parent):
         super().__init__()
         self.parent = parent
@@ -368,7 +563,7 @@ class CatalogPage(QWidget):
         layout.addWidget(title)
 
         self.search_input = QLineEdit()
-        self.search_input.setPlaceholderText("Search by title or category")
+        self.search_input.setPlaceholderText("Search by title, category, author or ISBN")
         self.search_btn = QPushButton("Search")
         self.search_btn.clicked.connect(self.search)
         hl = QHBoxLayout()
@@ -376,104 +571,193 @@ class CatalogPage(QWidget):
         hl.addWidget(self.search_btn)
         layout.addLayout(hl)
 
-        self.tbl = QTableWidget(0,5)
-        self.tbl.setHorizontalHeaderLabels(["ID","Title","Category","ISBN","Available"])
+        # Filters and sort run in SQL (Catalog.browse); the counts next to each
+        # category come back with the first page
+        self.cmb_category = QComboBox()
+        self.cmb_category.addItem("All categories", None)
+        self.cmb_author = QComboBox()
+        self.cmb_author.addItem("All authors", None)
+        self.chk_available = QCheckBox("Available only")
+        self.cmb_sort = QComboBox()
+        for label, _ in SORT_PRESETS:
+            self.cmb_sort.addItem(label)
+        self.lbl_facets = QLabel("")
+        hl_filters = QHBoxLayout()
+        for w in (self.cmb_category, self.cmb_author, self.chk_available, self.cmb_sort, self.lbl_facets):
+            hl_filters.addWidget(w)
+        layout.addLayout(hl_filters)
+        self.cmb_category.currentIndexChanged.connect(self.apply_filters)
+        self.cmb_author.currentIndexChanged.connect(self.apply_filters)
+        self.chk_available.stateChanged.connect(self.apply_filters)
+        self.cmb_sort.currentIndexChanged.connect(self.apply_filters)
+        self.facets_loaded.connect(self.show_facets)
+        self.browse_generation = 0
+
+        self.model = BookTableModel(parent=self, executor=parent.db)
+        self.tbl = make_book_view(self.model)
+        self.tbl.setSelectionMode(QAbstractItemView.ExtendedSelection)
         layout.addWidget(self.tbl)
 
         self.btn_refresh = QPushButton("Refresh")
         self.btn_refresh.clicked.connect(self.load_all)
         self.btn_borrow = QPushButton("Borrow Selected")
         self.btn_borrow.clicked.connect(self.borrow_selected)
+        self.btn_hold = QPushButton("Place Hold")
+        self.btn_hold.clicked.connect(self.hold_selected)
         hl2 = QHBoxLayout()
         hl2.addWidget(self.btn_refresh)
         hl2.addWidget(self.btn_borrow)
+        hl2.addWidget(self.btn_hold)
         layout.addLayout(hl2)
 
         self.setLayout(layout)
-        self.load_all()
 
     def load_all(self):
-        rows = get_books()
-        self.tbl.setRowCount(0)
-        for r in rows:
-            i = self.tbl.rowCount()
-            self.tbl.insertRow(i)
-            for c, val in enumerate(r):
-                self.tbl.setItem(i,c,QTableWidgetItem(str(val)))
+        if self.cmb_author.count() == 1:
+            self.parent.db.submit("catalog_authors", get_authors, on_done=self.show_authors)
+        self.apply_filters()
+
+    def show_authors(self, rows):
+        self.cmb_author.blockSignals(True)
+        for author_id, full_name in rows:
+            self.cmb_author.addItem(full_name, author_id)
+        self.cmb_author.blockSignals(False)
+
+    def apply_filters(self):
+        if self.search_input.text().strip():
+            self.search()   # ranked search ignores the filters
+            return
+        category = self.cmb_category.currentData()
+        author_id = self.cmb_author.currentData()
+        available = self.chk_available.isChecked()
+        catalog = Catalog(db_config)
+        sort = SORT_PRESETS[max(self.cmb_sort.currentIndex(), 0)][1]
+        self.browse_generation += 1
+        generation = self.browse_generation
+
+        def browse(limit, after):
+            # runs on a worker thread; facets only with the first page
+            result = catalog.browse(category, author_id, available, sort, limit, after,
+                                    facets=after is None)
+            if result["facets"] is not None:
+                self.facets_loaded.emit((generation, result["facets"]))
+            return result["books"]
+
+        self.model.set_browse(browse)
+
+    def show_facets(self, loaded):
+        generation, facets = loaded
+        if generation != self.browse_generation:
+            return   # counts for filters that have since changed
+        selected = self.cmb_category.currentData()
+        categories = sorted(facets["categories"].items(), key=lambda kv: (-kv[1], kv[0]))
+        self.cmb_category.blockSignals(True)
+        self.cmb_category.clear()
+        self.cmb_category.addItem(f"All categories ({sum(n for _, n in categories)})", None)
+        for name, n in categories:
+            self.cmb_category.addItem(f"{name or '(none)'} ({n})", name)
+        index = self.cmb_category.findData(selected)
+        self.cmb_category.setCurrentIndex(index if index >= 0 else 0)
+        self.cmb_category.blockSignals(False)
+        counts = facets["availability"]
+        self.lbl_facets.setText(f"{counts['available']} available, {counts['unavailable']} out")
 
     def search(self):
         term = self.search_input.text().strip()
-        conn, cur = get_conn_cursor()
         try:
-            cur.execute("""
-                SELECT book_id, title, category, isbn, copies_available
-                FROM book
-                WHERE title ILIKE %s OR category ILIKE %s
-                ORDER BY book_id
-            """, (f"%{term}%", f"%{term}%"))
-            rows = cur.fetchall()
+            if not term:
+                self.apply_filters()
+            else:
+                catalog = Catalog(db_config)
+                self.model.set_search(lambda limit, offset: catalog.search_books(term, limit, offset))
         except Exception as e:
             QMessageBox.critical(self, "Search error", f"Failed to search books: {e}")
-            rows = []
-        finally:
-            cur.close(); conn.close()
-        self.tbl.setRowCount(0)
-        for r in rows:
-            i = self.tbl.rowCount()
-            self.tbl.insertRow(i)
-            for c, val in enumerate(r):
-                self.tbl.setItem(i,c,QTableWidgetItem(str(val)))
 
     def borrow_selected(self):
-        sel = self.tbl.currentRow()
-        if sel < 0:
+        book_ids = selected_ids(self.tbl)
+        if not book_ids:
             QMessageBox.warning(self,"Borrow","Select a row first")
             return
-        book_id = int(self.tbl.item(sel,0).text())
         if self.parent.current_user['role'] != 'member':
             QMessageBox.information(self,"Borrow","Only members can borrow")
             return
-        try:
-            # call backend if available
-            if self.parent.backend_user and hasattr(self.parent.backend_user, 'borrow_book'):
-                res = self.parent.backend_user.borrow_book(book_id)
-                # Expect backend to print/return status; we'll refresh regardless
+        self.parent.db.submit(None, self.borrow_books, book_ids,
+                              on_done=self.finish_borrow, on_error=self.borrow_failed)
+
+    def borrow_books(self, book_ids):
+        # runs on a worker thread: no widgets in here
+        member = self.parent.backend_user
+        if len(book_ids) > 1:
+            return "batch", member.borrow_books(book_ids)   # whole stack in one transaction
+        return "single", dict(member.borrow_book(book_ids[0]), book_id=book_ids[0])
+
+    def finish_borrow(self, outcome):
+        kind, res = outcome
+        if kind == "batch":
+            show_batch_result(self, "Borrow", res, "book_id", "borrowed")
+        else:
+            self.show_borrow_result(res)
+        self.after_borrow()
+
+    def borrow_failed(self, message):
+        QMessageBox.critical(self,"Borrow error", f"Failed to borrow book: {message}")
+        self.after_borrow()
+
+    def after_borrow(self):
+        self.parent.notify_write("books", "loans")
+
+    def show_borrow_result(self, res):
+        if not res:
+            return
+        status = res.get("status")
+        if status == "borrowed":
+            QMessageBox.information(self,"Borrow",f"Book borrowed successfully. Due: {res['due_date']:%Y-%m-%d}")
+        elif status == "limit_reached":
+            QMessageBox.warning(self,"Borrow",f"Cannot borrow more than {res['max_loans']} books.")
+        elif status == "not_found":
+            QMessageBox.warning(self,"Borrow","Book not found.")
+        elif status == "unavailable":
+            if self.can_hold():
+                answer = QMessageBox.question(self,"Borrow","Book not available. Join the hold queue for it?")
+                if answer == QMessageBox.Yes:
+                    self.place_hold(res["book_id"])
             else:
-                # Direct DB actions: enforce max 3 loans, copies_available, insert loan, decrement copies
-                conn, cur = get_conn_cursor()
-                try:
-                    # Check active loans
-                    cur.execute("SELECT COUNT(*) FROM loan WHERE member_id=%s AND returned=FALSE;", (self.parent.current_user['id'],))
-                    active_loans = cur.fetchone()[0]
-                    if active_loans >= 3:
-                        QMessageBox.warning(self, "Borrow", "Cannot borrow more than 3 books.")
-                        cur.close(); conn.close()
-                        return
-                    # Check stock
-                    cur.execute("SELECT copies_available FROM book WHERE book_id=%s;", (book_id,))
-                    s = cur.fetchone()
-                    if not s or s[0] <= 0:
-                        QMessageBox.warning(self,"Borrow","Book not available.")
-                        cur.close(); conn.close()
-                        return
-                    borrow_date = datetime.now()
-                    due_date = borrow_date + timedelta(days=7)  # 7 day loans
-                    cur.execute("INSERT INTO loan (book_id, member_id, borrow_date, due_date, returned) VALUES (%s, %s, %s, %s, FALSE)",
-                                (book_id, self.parent.current_user['id'], borrow_date, due_date))
-                    cur.execute("UPDATE book SET copies_available = copies_available - 1 WHERE book_id=%s;", (book_id,))
-                    conn.commit()
-                    QMessageBox.information(self,"Borrow","Book borrowed successfully.")
-                except Exception as e:
-                    conn.rollback()
-                    QMessageBox.critical(self,"Borrow error", f"Failed to borrow book: {e}")
-                finally:
-                    cur.close(); conn.close()
-        except Exception as e:
-            QMessageBox.critical(self,"Borrow error", f"Failed: {e}")
-        # refresh
-        self.load_all()
-        if hasattr(self.parent, 'dashboard') and self.parent.dashboard:
-            self.parent.dashboard.refresh()
+                QMessageBox.warning(self,"Borrow","Book not available.")
+        else:
+            QMessageBox.critical(self,"Borrow error","Failed to borrow book.")
+
+    def can_hold(self):
+        return self.parent.current_user['role'] == 'member'
+
+    def hold_selected(self):
+        book_ids = selected_ids(self.tbl)
+        if not book_ids:
+            QMessageBox.warning(self,"Hold","Select a row first")
+            return
+        if not self.can_hold():
+            QMessageBox.information(self,"Hold","Only members can place holds")
+            return
+        self.place_hold(book_ids[0])
+
+    def place_hold(self, book_id):
+        self.parent.db.submit(None, self.parent.backend_user.place_hold, book_id,
+                              on_done=self.show_hold_result,
+                              on_error=lambda msg: QMessageBox.critical(self,"Hold error",f"Failed to place hold: {msg}"))
+
+    def show_hold_result(self, res):
+        status = res.get("status")
+        if status == "queued":
+            QMessageBox.information(self,"Hold",f"Hold placed. You are number {res['position']} in the queue; "
+                                                "the next returned copy for you is kept at the desk.")
+            self.parent.notify_write("loans")
+        elif status == "available":
+            QMessageBox.information(self,"Hold","A copy is on the shelf, borrow it instead.")
+        elif status == "already_held":
+            QMessageBox.information(self,"Hold","You already hold this book.")
+        elif status == "not_found":
+            QMessageBox.warning(self,"Hold","Book not found.")
+        else:
+            QMessageBox.critical(self,"Hold error","Failed to place hold.")
 
 class LoansPage(QWidget):
     def __init__(self,parent):
@@ -486,24 +770,64 @@ class LoansPage(QWidget):
 
         self.tbl = QTableWidget(0,5)
         self.tbl.setHorizontalHeaderLabels(["Loan ID","Book ID","Title","Borrowed","Due"])
+        self.tbl.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.tbl.setSelectionMode(QAbstractItemView.ExtendedSelection)
         layout.addWidget(self.tbl)
 
         self.btn_refresh = QPushButton("Refresh")
         self.btn_refresh.clicked.connect(self.load_loans)
         self.btn_return = QPushButton("Return Selected")
         self.btn_return.clicked.connect(self.return_selected)
+        self.btn_renew = QPushButton("Renew Selected")
+        self.btn_renew.clicked.connect(self.renew_selected)
         hl = QHBoxLayout()
         hl.addWidget(self.btn_refresh)
         hl.addWidget(self.btn_return)
+        hl.addWidget(self.btn_renew)
         layout.addLayout(hl)
+
+        # Holds: a 'Ready' hold has a copy set aside, collected by borrowing the book
+        holds_title = QLabel("Holds")
+        holds_title.setStyleSheet("font-size:14px; font-weight:bold;")
+        layout.addWidget(holds_title)
+        self.holds_tbl = QTableWidget(0,4)
+        self.holds_tbl.setHorizontalHeaderLabels(["Hold ID","Book ID","Title","Status"])
+        self.holds_tbl.setSelectionBehavior(QAbstractItemView.SelectRows)
+        layout.addWidget(self.holds_tbl)
+        self.btn_cancel_hold = QPushButton("Cancel Hold")
+        self.btn_cancel_hold.clicked.connect(self.cancel_hold)
+        layout.addWidget(self.btn_cancel_hold)
         self.setLayout(layout)
 
     def load_loans(self):
         if self.parent.current_user['role'] != 'member':
             self.tbl.setRowCount(0)
+            self.holds_tbl.setRowCount(0)
             return
         member_id = self.parent.current_user['id']
-        rows = get_active_loans_for_member(member_id)
+        self.parent.db.submit("loans", get_active_loans_for_member, member_id, on_done=self.show_loans)
+        self.parent.db.submit("holds", self.parent.backend_user.view_holds, on_done=self.show_holds)
+
+    def show_holds(self, rows):
+        self.holds_tbl.setRowCount(0)
+        for hold_id, book_id, title, status, created_at, position in rows or []:
+            i = self.holds_tbl.rowCount()
+            self.holds_tbl.insertRow(i)
+            shown = "Ready to collect" if status == "ready" else f"Waiting (#{position})"
+            for c, val in enumerate([hold_id, book_id, title, shown]):
+                self.holds_tbl.setItem(i,c,QTableWidgetItem(str(val)))
+
+    def cancel_hold(self):
+        hold_ids = selected_ids(self.holds_tbl)
+        if not hold_ids:
+            QMessageBox.warning(self,"Hold","Select a hold first")
+            return
+        backend = self.parent.backend_user
+        self.parent.db.submit(None, backend.cancel_hold, hold_ids[0],
+                              on_done=lambda ok: self.parent.notify_write("books", "loans"),
+                              on_error=lambda msg: QMessageBox.critical(self,"Hold error",f"Failed to cancel hold: {msg}"))
+
+    def show_loans(self, rows):
         self.tbl.setRowCount(0)
         for r in rows:
             i = self.tbl.rowCount()
@@ -512,45 +836,50 @@ class LoansPage(QWidget):
                 self.tbl.setItem(i,c,QTableWidgetItem(str(val)))
 
     def return_selected(self):
-        sel = self.tbl.currentRow()
-        if sel < 0:
+        loan_ids = selected_ids(self.tbl)
+        if not loan_ids:
             QMessageBox.warning(self,"Return","Select a loan first")
             return
-        loan_id = int(self.tbl.item(sel,0).text())
         if self.parent.current_user['role'] != 'member':
             QMessageBox.information(self,"Return","Only members can return")
             return
-        try:
-            if self.parent.backend_user and hasattr(self.parent.backend_user, 'return_book'):
-                self.parent.backend_user.return_book(loan_id)
-            else:
-                conn, cur = get_conn_cursor()
-                try:
-                    # get book id
-                    cur.execute("SELECT book_id FROM loan WHERE loan_id=%s AND returned=FALSE;", (loan_id,))
-                    row = cur.fetchone()
-                    if not row:
-                        QMessageBox.warning(self,"Return","Loan not found or already returned")
-                        cur.close(); conn.close()
-                        return
-                    book_id = row[0]
-                    cur.execute("UPDATE loan SET returned=TRUE WHERE loan_id=%s;", (loan_id,))
-                    cur.execute("UPDATE book SET copies_available = copies_available + 1 WHERE book_id=%s;", (book_id,))
-                    conn.commit()
-                    QMessageBox.information(self,"Return","Book returned successfully.")
-                except Exception as e:
-                    conn.rollback()
-                    QMessageBox.critical(self,"Return error", f"Failed to return book: {e}")
-                finally:
-                    cur.close(); conn.close()
-        except Exception as e:
-            QMessageBox.critical(self,"Return error", f"Failed: {e}")
+        self.parent.db.submit(None, self.return_loans, loan_ids,
+                              on_done=self.finish_return, on_error=self.return_failed)
 
-        self.load_loans()
-        if hasattr(self.parent, 'catalog'):
-            self.parent.catalog.load_all()
-        if hasattr(self.parent, 'dashboard'):
-            self.parent.dashboard.refresh()
+    def return_loans(self, loan_ids):
+        # runs on a worker thread: no widgets in here
+        return self.parent.backend_user.return_books(loan_ids)   # one transaction
+
+    def finish_return(self, results):
+        show_batch_result(self, "Return", results, "loan_id", "returned")
+        self.after_return()
+
+    def return_failed(self, message):
+        QMessageBox.critical(self,"Return error", f"Failed to return book: {message}")
+        self.after_return()
+
+    def after_return(self):
+        self.parent.notify_write("books", "loans")
+
+    def renew_selected(self):
+        loan_ids = selected_ids(self.tbl)
+        if not loan_ids:
+            QMessageBox.warning(self,"Renew","Select a loan first")
+            return
+        if self.parent.current_user['role'] != 'member':
+            QMessageBox.information(self,"Renew","Renewals need a member login")
+            return
+        # one conditional UPDATE for the whole selection; the copy never leaves the member
+        self.parent.db.submit(None, self.parent.backend_user.renew_loans, loan_ids,
+                              on_done=self.finish_renew, on_error=self.renew_failed)
+
+    def finish_renew(self, results):
+        show_batch_result(self, "Renew", results, "loan_id", "renewed")
+        self.parent.notify_write("loans")
+
+    def renew_failed(self, message):
+        QMessageBox.critical(self,"Renew error", f"Failed to renew: {message}")
+        self.parent.notify_write("loans")
 
 # ---------------- Librarian CRUD Pages ----------------
 class BooksPage(QWidget):
@@ -562,8 +891,8 @@ class BooksPage(QWidget):
         title.setStyleSheet("font-size:18px;font-weight:bold;")
         layout.addWidget(title)
 
-        self.tbl = QTableWidget(0,5)
-        self.tbl.setHorizontalHeaderLabels(["ID","Title","Category","ISBN","Available"])
+        self.model = BookTableModel(parent=self, executor=parent.db)
+        self.tbl = make_book_view(self.model)
         layout.addWidget(self.tbl)
 
         form = QFormLayout()
@@ -588,30 +917,24 @@ class BooksPage(QWidget):
         layout.addLayout(hl)
 
         self.setLayout(layout)
-        self.load_books()
 
-        self.tbl.cellClicked.connect(self.on_select)
+        self.tbl.clicked.connect(lambda idx: self.on_select(idx.row(), idx.column()))
         self.btn_add.clicked.connect(self.add_book)
         self.btn_update.clicked.connect(self.update_book)
         self.btn_delete.clicked.connect(self.delete_book)
         self.selected_book_id = None
 
     def load_books(self):
-        rows = get_books()
-        self.tbl.setRowCount(0)
-        for r in rows:
-            i = self.tbl.rowCount()
-            self.tbl.insertRow(i)
-            for c, val in enumerate(r):
-                self.tbl.setItem(i,c,QTableWidgetItem(str(val)))
+        self.model.set_catalog()
 
     def on_select(self, row, col):
         try:
-            self.selected_book_id = int(self.tbl.item(row,0).text())
-            self.input_title.setText(self.tbl.item(row,1).text())
-            self.input_category.setText(self.tbl.item(row,2).text())
-            self.input_isbn.setText(self.tbl.item(row,3).text())
-            self.input_copies.setValue(int(self.tbl.item(row,4).text()))
+            book_id, title, category, isbn, copies = self.model.row_values(row)
+            self.selected_book_id = book_id
+            self.input_title.setText(str(title))
+            self.input_category.setText(str(category))
+            self.input_isbn.setText(str(isbn))
+            self.input_copies.setValue(int(copies))
         except Exception:
             pass
 
@@ -623,22 +946,8 @@ class BooksPage(QWidget):
         category = self.input_category.text().strip()
         isbn = self.input_isbn.text().strip()
         copies = self.input_copies.value()
-        conn, cur = get_conn_cursor()
-        try:
-            cur.execute("""
-                INSERT INTO book (title, category, isbn, copies_available)
-                VALUES (%s, %s, %s, %s)
-            """, (title, category, isbn, copies))
-            conn.commit()
-            QMessageBox.information(self,"Success","Book added")
-            self.load_books()
-            if hasattr(self.parent, 'dashboard'):
-                self.parent.dashboard.refresh()
-        except Exception as e:
-            conn.rollback()
-            QMessageBox.critical(self,"Error","Failed to add book: " + str(e))
-        finally:
-            cur.close(); conn.close()
+        submit_write(self, "Book added", "Failed to add book: ", "books",
+                     "create_book", (title, category, isbn, copies), "books")
 
     def update_book(self):
         if not self.selected_book_id:
@@ -648,40 +957,15 @@ class BooksPage(QWidget):
         category = self.input_category.text().strip()
         isbn = self.input_isbn.text().strip()
         copies = self.input_copies.value()
-        conn, cur = get_conn_cursor()
-        try:
-            cur.execute("""
-                UPDATE book SET title=%s, category=%s, isbn=%s, copies_available=%s
-                WHERE book_id=%s
-            """, (title, category, isbn, copies, self.selected_book_id))
-            conn.commit()
-            QMessageBox.information(self,"Success","Book updated")
-            self.load_books()
-            if hasattr(self.parent, 'dashboard'):
-                self.parent.dashboard.refresh()
-        except Exception as e:
-            conn.rollback()
-            QMessageBox.critical(self,"Error","Failed to update book: " + str(e))
-        finally:
-            cur.close(); conn.close()
+        submit_write(self, "Book updated", "Failed to update book: ", "books",
+                     "update_book", (title, category, isbn, copies, self.selected_book_id), "books")
 
     def delete_book(self):
         if not self.selected_book_id:
             QMessageBox.warning(self,"Error","Select a book first")
             return
-        conn, cur = get_conn_cursor()
-        try:
-            cur.execute("DELETE FROM book WHERE book_id=%s", (self.selected_book_id,))
-            conn.commit()
-            QMessageBox.information(self,"Success","Book deleted")
-            self.load_books()
-            if hasattr(self.parent, 'dashboard'):
-                self.parent.dashboard.refresh()
-        except Exception as e:
-            conn.rollback()
-            QMessageBox.critical(self,"Error","Failed to delete book: " + str(e))
-        finally:
-            cur.close(); conn.close()
+        submit_write(self, "Book deleted", "Failed to delete book: ", "books",
+                     "delete_book", (self.selected_book_id,), "books")
 
 class AuthorsPage(QWidget):
     def __init__(self, parent):
@@ -710,7 +994,6 @@ class AuthorsPage(QWidget):
         layout.addLayout(hl)
 
         self.setLayout(layout)
-        self.load_authors()
 
         self.tbl.cellClicked.connect(self.on_select)
         self.btn_add.clicked.connect(self.add_author)
@@ -719,7 +1002,9 @@ class AuthorsPage(QWidget):
         self.selected_author_id = None
 
     def load_authors(self):
-        rows = get_authors()
+        self.parent.db.submit("authors", get_authors, on_done=self.show_authors)
+
+    def show_authors(self, rows):
         self.tbl.setRowCount(0)
         for r in rows:
             i = self.tbl.rowCount()
@@ -739,50 +1024,23 @@ class AuthorsPage(QWidget):
         if not name:
             QMessageBox.warning(self,"Error","Name required")
             return
-        conn, cur = get_conn_cursor()
-        try:
-            cur.execute("INSERT INTO author (full_name) VALUES (%s)", (name,))
-            conn.commit()
-            QMessageBox.information(self,"Success","Author added")
-            self.load_authors()
-        except Exception as e:
-            conn.rollback()
-            QMessageBox.critical(self,"Error","Failed to add author: " + str(e))
-        finally:
-            cur.close(); conn.close()
+        submit_write(self, "Author added", "Failed to add author: ", "authors",
+                     "add_author", (name,), "authors")
 
     def update_author(self):
         if not self.selected_author_id:
             QMessageBox.warning(self,"Error","Select an author first")
             return
         name = self.input_name.text().strip()
-        conn, cur = get_conn_cursor()
-        try:
-            cur.execute("UPDATE author SET full_name=%s WHERE author_id=%s", (name, self.selected_author_id))
-            conn.commit()
-            QMessageBox.information(self,"Success","Author updated")
-            self.load_authors()
-        except Exception as e:
-            conn.rollback()
-            QMessageBox.critical(self,"Error","Failed to update author: " + str(e))
-        finally:
-            cur.close(); conn.close()
+        submit_write(self, "Author updated", "Failed to update author: ", "authors",
+                     "update_author", (name, self.selected_author_id), "authors")
 
     def delete_author(self):
         if not self.selected_author_id:
             QMessageBox.warning(self,"Error","Select an author first")
             return
-        conn, cur = get_conn_cursor()
-        try:
-            cur.execute("DELETE FROM author WHERE author_id=%s", (self.selected_author_id,))
-            conn.commit()
-            QMessageBox.information(self,"Success","Author deleted")
-            self.load_authors()
-        except Exception as e:
-            conn.rollback()
-            QMessageBox.critical(self,"Error","Failed to delete author: " + str(e))
-        finally:
-            cur.close(); conn.close()
+        submit_write(self, "Author deleted", "Failed to delete author: ", "authors",
+                     "delete_author", (self.selected_author_id,), "authors")
 
 class BookClubsPage(QWidget):
     def __init__(self, parent):
@@ -829,7 +1087,6 @@ class BookClubsPage(QWidget):
         layout.addLayout(hl2)
 
         self.setLayout(layout)
-        self.load_clubs()
 
         self.tbl.cellClicked.connect(self.load_members)
         self.btn_add.clicked.connect(self.add_club)
@@ -840,7 +1097,9 @@ class BookClubsPage(QWidget):
         self.selected_club_id = None
 
     def load_clubs(self):
-        rows = get_bookclubs()
+        self.parent.db.submit("clubs", get_bookclubs, on_done=self.show_clubs)
+
+    def show_clubs(self, rows):
         self.tbl.setRowCount(0)
         for r in rows:
             i = self.tbl.rowCount()
@@ -853,33 +1112,27 @@ class BookClubsPage(QWidget):
         try:
             club_id = int(self.tbl.item(row,0).text())
             self.selected_club_id = club_id
-            members = get_bookclub_members(club_id)
-            self.tbl_members.setRowCount(0)
-            for r in members:
-                i = self.tbl_members.rowCount()
-                self.tbl_members.insertRow(i)
-                for c,val in enumerate(r):
-                    self.tbl_members.setItem(i,c,QTableWidgetItem(str(val)))
+            self.parent.db.submit("club_members", get_bookclub_members, club_id, on_done=self.show_members)
         except Exception:
             pass
 
+    def show_members(self, members):
+        self.tbl_members.setRowCount(0)
+        for r in members:
+            i = self.tbl_members.rowCount()
+            self.tbl_members.insertRow(i)
+            for c,val in enumerate(r):
+                self.tbl_members.setItem(i,c,QTableWidgetItem(str(val)))
+
     def add_club(self):
         name = self.input_name.text().strip()
         mod = self.input_mod.value()
         if not name:
             QMessageBox.warning(self,"Error","Name required")
             return
-        conn, cur = get_conn_cursor()
-        try:
-            cur.execute("INSERT INTO bookclub(club_name, moderator_id) VALUES(%s,%s)",(name,mod))
-            conn.commit()
-            QMessageBox.information(self,"Success","Club added")
-            self.load_clubs()
-        except Exception as e:
-            conn.rollback()
-            QMessageBox.critical(self,"Error","Failed to add club: "+str(e))
-        finally:
-            cur.close(); conn.close()
+        submit_write(self, "Club added", "Failed to add club: ", "clubs",
+                     "create_book_club", (name, mod),
+                     "bookclubs", "bookclub_members")
 
     def delete_club(self):
         sel = self.tbl.currentRow()
@@ -887,34 +1140,18 @@ class BookClubsPage(QWidget):
             QMessageBox.warning(self,"Error","Select a club")
             return
         club_id = int(self.tbl.item(sel,0).text())
-        conn, cur = get_conn_cursor()
-        try:
-            cur.execute("DELETE FROM bookclub WHERE club_id=%s",(club_id,))
-            conn.commit()
-            QMessageBox.information(self,"Success","Club deleted")
-            self.load_clubs()
-        except Exception as e:
-            conn.rollback()
-            QMessageBox.critical(self,"Error","Failed to delete club: "+str(e))
-        finally:
-            cur.close(); conn.close()
+        submit_write(self, "Club deleted", "Failed to delete club: ", "clubs",
+                     "delete_book_club", (club_id,), "bookclubs", "bookclub_members")
 
     def add_member(self):
         if not self.selected_club_id:
             QMessageBox.warning(self,"Error","Select a club first")
             return
         member_id = self.input_member.value()
-        conn, cur = get_conn_cursor()
-        try:
-            cur.execute("INSERT INTO bookclubmembers(club_id, member_id) VALUES(%s,%s)",(self.selected_club_id,member_id))
-            conn.commit()
-            QMessageBox.information(self,"Success","Member added")
-            self.load_members(self.tbl.currentRow(),0)
-        except Exception as e:
-            conn.rollback()
-            QMessageBox.critical(self,"Error","Failed to add member: "+str(e))
-        finally:
-            cur.close(); conn.close()
+        row = self.tbl.currentRow()
+        submit_write(self, "Member added", "Failed to add member: ", None,
+                     "add_club_member", (self.selected_club_id, member_id), "bookclub_members",
+                     after=lambda: self.load_members(row, 0))
 
     def remove_member(self):
         if not self.selected_club_id:
@@ -925,19 +1162,24 @@ class BookClubsPage(QWidget):
             QMessageBox.warning(self,"Error","Select a member")
             return
         member_id = int(self.tbl_members.item(sel,0).text())
-        conn, cur = get_conn_cursor()
-        try:
-            cur.execute("DELETE FROM bookclubmembers WHERE club_id=%s AND member_id=%s",(self.selected_club_id,member_id))
-            conn.commit()
-            QMessageBox.information(self,"Success","Member removed")
-            self.load_members(self.tbl.currentRow(),0)
-        except Exception as e:
-            conn.rollback()
-            QMessageBox.critical(self,"Error","Failed to remove member: "+str(e))
-        finally:
-            cur.close(); conn.close()
+        row = self.tbl.currentRow()
+        submit_write(self, "Member removed", "Failed to remove member: ", None,
+                     "remove_club_member", (self.selected_club_id, member_id), "bookclub_members",
+                     after=lambda: self.load_members(row, 0))
 
 # ---------------- Main Window ----------------
+# page name -> (page class, method that (re)loads its data, data it shows)
+PAGES = {
+    "dashboard": (DashboardPage, "refresh", {"books", "loans"}),
+    "catalog": (CatalogPage, "load_all", {"books"}),
+    "loans": (LoansPage, "load_loans", {"loans"}),
+    "books": (BooksPage, "load_books", {"books"}),
+    "authors": (AuthorsPage, "load_authors", {"authors"}),
+    "clubs": (BookClubsPage, "load_clubs", {"clubs"}),
+}
+PAGE_TTL = 120   # seconds before a page reloads on visit even without a known write
+LIVE_TOPICS = {"books", "loans"}   # kept current by change notifications when listening
+
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -946,6 +1188,11 @@ class MainWindow(QMainWindow):
         self.current_user = None
         self.backend_user = None
 
+        # all page DB reads go through here so the window never waits on Postgres
+        self.db = QueryExecutor(self)
+        self.db.busy_changed.connect(
+            lambda busy: self.statusBar().showMessage("Loading...") if busy else self.statusBar().clearMessage())
+
         central = QWidget()
         layout = QHBoxLayout()
         central.setLayout(layout)
@@ -958,22 +1205,17 @@ class MainWindow(QMainWindow):
         self.pages = QStackedWidget()
         layout.addWidget(self.pages)
 
-        # Pages
+        # Pages are built on first visit; only the login page exists up front
+        self.page_objects = {}
+        self.loaded_at = {}     # page name -> when its data was last loaded
+        self.stale = set()      # pages whose data changed since they last loaded
         self.login_page = LoginPage(self)
-        self.dashboard = DashboardPage(self)
-        self.catalog = CatalogPage(self)
-        self.loans = LoansPage(self)
-        self.books_page = BooksPage(self)
-        self.authors_page = AuthorsPage(self)
-        self.bookclubs_page = BookClubsPage(self)
-
         self.pages.addWidget(self.login_page)
-        self.pages.addWidget(self.dashboard)
-        self.pages.addWidget(self.catalog)
-        self.pages.addWidget(self.loans)
-        self.pages.addWidget(self.books_page)
-        self.pages.addWidget(self.authors_page)
-        self.pages.addWidget(self.bookclubs_page)
+
+        # rows other desks change arrive here (started after login)
+        self.listener = None
+        self.change_signals = ChangeSignals()
+        self.change_signals.changed.connect(self.on_db_change)
 
         self.pages.setCurrentWidget(self.login_page)
         self.sidebar.hide()
@@ -981,36 +1223,79 @@ class MainWindow(QMainWindow):
     def switch_to_main(self):
         self.sidebar.lbl_user.setText(f"{self.current_user['name']} ({self.current_user['role']})")
         self.sidebar.show()
-        self.pages.setCurrentWidget(self.dashboard)
-        self.dashboard.refresh()
+        if self.listener is None:
+            self.listener = ChangeListener(db_config, self.change_signals.changed.emit).start()
+        self.show_page("dashboard")
+
+    def page(self, name):
+        page = self.page_objects.get(name)
+        if page is None:
+            page = PAGES[name][0](self)
+            self.pages.addWidget(page)
+            self.page_objects[name] = page
+        return page
 
     def show_page(self,name):
-        mapping = {
-            "dashboard": self.dashboard,
-            "catalog": self.catalog,
-            "loans": self.loans,
-            "books": self.books_page,
-            "authors": self.authors_page,
-            "clubs": self.bookclubs_page
-        }
-        page = mapping.get(name, self.dashboard)
+        if name not in PAGES:
+            name = "dashboard"
+        page = self.page(name)
         self.pages.setCurrentWidget(page)
-        if name=="dashboard":
-            self.dashboard.refresh()
-        if name=="catalog":
-            self.catalog.load_all()
-        if name=="loans":
-            self.loans.load_loans()
-        if name=="books":
-            self.books_page.load_books()
-        if name=="authors":
-            self.authors_page.load_authors()
-        if name=="clubs":
-            self.bookclubs_page.load_clubs()
+        loaded = self.loaded_at.get(name)
+        if loaded is None or name in self.stale or time.monotonic() - loaded > PAGE_TTL:
+            self.reload_page(name)
+
+    def reload_page(self, name):
+        getattr(self.page_objects[name], PAGES[name][1])()
+        self.loaded_at[name] = time.monotonic()
+        self.stale.discard(name)
+
+    def notify_write(self, *topics):
+        """
+        Data behind `topics` changed: the visible page reloads now if it shows
+        any of it, other pages that do are reloaded on their next visit.
+        """
+        topics = set(topics)
+        if self.listener:
+            topics -= LIVE_TOPICS   # the change notification will patch these
+        for name in self.page_objects:
+            if PAGES[name][2] & topics:
+                self.mark_stale(name)
+
+    def mark_stale(self, name):
+        if name not in self.page_objects:
+            return
+        if self.page_objects[name] is self.pages.currentWidget():
+            self.reload_page(name)
+        else:
+            self.stale.add(name)
+
+    def on_db_change(self, change):
+        """A write committed somewhere (this desk or another): patch what is on screen"""
+        table, op, ids, members = change.get("table"), change.get("op"), change.get("ids"), change.get("members")
+        if table == "book":
+            for name in ("catalog", "books"):
+                if name in self.page_objects:
+                    self.page_objects[name].model.patch(op, ids)
+            self.mark_stale("dashboard")
+        elif table == "loan":
+            user = self.current_user
+            if user and (members is None or user['id'] in members):
+                self.mark_stale("loans")
+            self.mark_stale("dashboard")
+        elif table == "bookclubmembers":
+            clubs = self.page_objects.get("clubs")
+            if clubs and clubs.selected_club_id and (ids is None or clubs.selected_club_id in ids):
+                clubs.load_members(clubs.tbl.currentRow(), 0)
+
+    def closeEvent(self, event):
+        if self.listener:
+            self.listener.stop()
+        super().closeEvent(event)
 
     def logout(self):
         self.current_user=None
         self.backend_user=None
+        self.loaded_at.clear()  # the next user sees fresh data
         self.sidebar.hide()
         self.pages.setCurrentWidget(self.login_page)
 
@@ -1033,6 +1318,9 @@ def main():
     app = QApplication(sys.argv)
     w = MainWindow()
     w.show()
+    # nothing touches the database before the window is up
+    w.db.submit(None, migrate, db_config,
+                on_error=lambda message: print("Error applying database migrations:", message))
     sys.exit(app.exec_())
 
 if __name__=="__main__":
@@ -0,0 +1,315 @@
+import asyncio
+import time
+import weakref
+from datetime import date
+from backend.auth import hash_password, verify_password, verify_unknown_user
+from backend.cache import invalidate
+from backend.member import MEMBER_ROLE, LOAN_LOCK_NS, renew_status
+from backend.policy import CirculationPolicy
+from backend.queries import QUERIES, bind, record, users_table
+
+try:
+    import asyncpg
+except ImportError:
+    asyncpg = None
+
+if asyncpg is not None:
+    class LibraryAsyncConnection(asyncpg.Connection):
+        """asyncpg connection that knows its database's users table (set by the pool)"""
+        users_table = None
+
+# asyncio versions of User, Member and Librarian for network-facing services.
+# They run the same named queries as the sync classes (backend/queries.py);
+# asyncpg prepares and caches each statement per connection by itself. Results
+# come back as dicts and lists rather than being printed, and errors are raised.
+
+_pools = {}
+_pool_locks = weakref.WeakKeyDictionary()   # event loop -> asyncio.Lock for pool creation
+
+
+async def get_async_pool(db_config, min_size=2, max_size=20):
+    """Return the pool for db_config on the running event loop, creating it on first use"""
+    if asyncpg is None:
+        raise RuntimeError("The async API needs asyncpg (pip install asyncpg)")
+    loop = asyncio.get_running_loop()
+    key = (tuple(sorted(db_config.items())), id(loop))
+    pool = _pools.get(key)
+    if pool is not None:
+        return pool
+    # the first requests after startup all miss at once; only one builds the pool
+    lock = _pool_locks.get(loop)
+    if lock is None:
+        lock = _pool_locks[loop] = asyncio.Lock()
+    async with lock:
+        pool = _pools.get(key)
+        if pool is None:
+            # resolved once per database by backend/queries.py, like the sync classes
+            users = await loop.run_in_executor(None, lambda: users_table(db_config=db_config))
+
+            async def init(conn):
+                conn.users_table = users
+
+            pool = await asyncpg.create_pool(min_size=min_size, max_size=max_size,
+                                             connection_class=LibraryAsyncConnection, init=init, **db_config)
+            _pools[key] = pool
+    return pool
+
+
+async def close_async_pools():
+    while _pools:
+        _, pool = _pools.popitem()
+        await pool.close()
+
+
+def _sql(conn, query):
+    text = query.prepared_sql
+    if "{users}" in text:
+        text = text.replace("{users}", conn.users_table)
+    return text
+
+
+async def fetch(conn, name, params=None):
+    """Run a named query on an asyncpg connection and return its rows"""
+    query = QUERIES[name]
+    text = _sql(conn, query)
+    started = time.perf_counter()
+    rows = await conn.fetch(text, *bind(query, params))
+    record(query, time.perf_counter() - started)
+    return rows
+
+
+async def fetchrow(conn, name, params=None):
+    rows = await fetch(conn, name, params)
+    return rows[0] if rows else None
+
+
+async def execute(conn, name, params=None):
+    """Run a named query that returns no rows; returns the affected row count"""
+    query = QUERIES[name]
+    text = _sql(conn, query)
+    started = time.perf_counter()
+    status = await conn.execute(text, *bind(query, params))
+    record(query, time.perf_counter() - started)
+    return int(status.split()[-1])
+
+
+class AsyncUser:
+    def __init__(self, db_config):
+        self.db_config = db_config
+
+    async def login(self, username, password):
+        """{'user_id', 'full_name', 'role_id'} or None"""
+        pool = await get_async_pool(self.db_config)
+        async with pool.acquire() as conn:
+            row = await fetchrow(conn, "login_lookup", (username,))
+            if row is None:
+                # as slow as a wrong password, so usernames can't be probed by timing
+                await asyncio.get_running_loop().run_in_executor(None, verify_unknown_user, password)
+                return None
+            # PBKDF2 is CPU-bound; keep it off the event loop
+            ok, stale = await asyncio.get_running_loop().run_in_executor(
+                None, verify_password, password, row["password"])
+            if not ok:
+                return None
+            if stale:
+                new_hash = await asyncio.get_running_loop().run_in_executor(None, hash_password, password)
+                await execute(conn, "set_password", (new_hash, row["user_id"]))
+        return {"user_id": row["user_id"], "full_name": row["full_name"], "role_id": row["role_id"]}
+
+
+class AsyncMember:
+    def __init__(self, db_config, member_id, full_name, role_id=MEMBER_ROLE):
+        self.db_config = db_config
+        self.member_id = member_id
+        self.full_name = full_name
+        self.role_id = role_id
+        self.policy = CirculationPolicy(db_config)
+
+    async def _loan_params(self, **params):
+        # the policy is cached; a reload (once per cache TTL) is a blocking query
+        rules = await asyncio.get_running_loop().run_in_executor(
+            None, self.policy.borrow_params, self.role_id)
+        return dict(rules, member_id=self.member_id, borrow_date=date.today(),
+                    lock_ns=LOAN_LOCK_NS, **params)
+
+    async def borrow_book(self, book_id):
+        """Same result dict as Member.borrow_book"""
+        params = await self._loan_params(book_id=book_id)
+        pool = await get_async_pool(self.db_config)
+        async with pool.acquire() as conn:
+            async with conn.transaction():
+                await fetch(conn, "member_lock", params)
+                loan_id, active_loans, stock, due_date = await fetchrow(conn, "borrow_one", params)
+        invalidate("books")  # copies_available changed
+
+        result = {"status": "borrowed", "loan_id": loan_id, "due_date": due_date,
+                  "active_loans": active_loans, "max_loans": params["max_loans"]}
+        if loan_id is None:
+            if active_loans >= params["max_loans"]:
+                result["status"] = "limit_reached"
+            elif stock is None:
+                result["status"] = "not_found"
+            else:
+                result["status"] = "unavailable"
+        return result
+
+    async def borrow_books(self, book_ids):
+        """Same per-book result dicts as Member.borrow_books"""
+        unique_ids = list(dict.fromkeys(book_ids))
+        params = await self._loan_params(book_ids=unique_ids)
+        pool = await get_async_pool(self.db_config)
+        async with pool.acquire() as conn:
+            async with conn.transaction():
+                await fetch(conn, "member_lock", params)
+                rows = await fetch(conn, "borrow_batch", params)
+        invalidate("books")
+
+        outcomes = {}
+        for book_id, loan_id, stock, candidate, due_date in rows:
+            if loan_id is not None:
+                status = "borrowed"
+            elif stock is None:
+                status = "not_found"
+            elif stock > 0 and not candidate:
+                status = "limit_reached"
+            else:
+                status = "unavailable"
+            outcomes[book_id] = {"book_id": book_id, "status": status, "loan_id": loan_id,
+                                 "due_date": due_date}
+
+        results, reported = [], set()
+        for book_id in book_ids:
+            if book_id in reported:
+                results.append({"book_id": book_id, "status": "duplicate", "loan_id": None, "due_date": None})
+                continue
+            reported.add(book_id)
+            results.append(outcomes[book_id])
+        return results
+
+    async def return_books(self, loan_ids):
+        """Same per-loan result dicts as Member.return_books"""
+        pool = await get_async_pool(self.db_config)
+        async with pool.acquire() as conn:
+            async with conn.transaction():
+                rows = await fetch(conn, "return_many", {"loan_ids": list(loan_ids)})
+        invalidate("books")
+        returned = {loan_id: book_id for loan_id, book_id in rows}
+        return [{"loan_id": loan_id, "book_id": returned.get(loan_id),
+                 "status": "returned" if returned.get(loan_id) is not None else "not_found"}
+                for loan_id in loan_ids]
+
+    async def return_book(self, loan_id):
+        return (await self.return_books([loan_id]))[0]["status"] == "returned"
+
+    async def active_loans(self):
+        """[{'loan_id', 'title', 'borrow_date', 'due_date'}, ...]"""
+        pool = await get_async_pool(self.db_config)
+        async with pool.acquire() as conn:
+            rows = await fetch(conn, "active_loans", (self.member_id,))
+        return [dict(r) for r in rows]
+
+
+    async def renew_loans(self, loan_ids=None):
+        """Same per-loan result dicts as Member.renew_loans; None renews every active loan"""
+        if loan_ids is None:
+            name, params = "renew_all", await self._loan_params(today=date.today())
+        else:
+            name, params = "renew_loans", await self._loan_params(today=date.today(), loan_ids=list(loan_ids))
+        pool = await get_async_pool(self.db_config)
+        async with pool.acquire() as conn:
+            rows = await fetch(conn, name, params)
+        return [{"loan_id": loan_id, "status": renew_status(due_date, active, overdue, held),
+                 "due_date": due_date}
+                for loan_id, due_date, active, overdue, held in rows]
+
+    async def place_hold(self, book_id):
+        """Same result dict as Member.place_hold"""
+        pool = await get_async_pool(self.db_config)
+        async with pool.acquire() as conn:
+            hold_id, stock, waiting = await fetchrow(
+                conn, "place_hold", {"book_id": book_id, "member_id": self.member_id})
+        if hold_id is not None:
+            return {"status": "queued", "hold_id": hold_id, "position": waiting + 1}
+        if stock is None:
+            status = "not_found"
+        elif stock > 0:
+            status = "available"
+        else:
+            status = "already_held"
+        return {"status": status, "hold_id": None, "position": None}
+
+    async def cancel_hold(self, hold_id):
+        pool = await get_async_pool(self.db_config)
+        async with pool.acquire() as conn:
+            row = await fetchrow(conn, "cancel_hold", {"hold_id": hold_id, "member_id": self.member_id})
+        invalidate("books")
+        return row is not None
+
+    async def holds(self):
+        """[{'hold_id', 'book_id', 'title', 'status', 'created_at', 'position'}, ...]"""
+        pool = await get_async_pool(self.db_config)
+        async with pool.acquire() as conn:
+            rows = await fetch(conn, "member_holds", (self.member_id,))
+        return [dict(r) for r in rows]
+
+
+class AsyncLibrarian:
+    def __init__(self, db_config, librarian_id, librarian_name):
+        self.db_config = db_config
+        self.librarian_id = librarian_id
+        self.librarian_name = librarian_name
+
+    async def _one(self, name, params, namespace):
+        pool = await get_async_pool(self.db_config)
+        async with pool.acquire() as conn:
+            row = await fetchrow(conn, name, params)
+        invalidate(namespace)
+        return row[0]
+
+    async def _write(self, name, params, namespace):
+        pool = await get_async_pool(self.db_config)
+        async with pool.acquire() as conn:
+            count = await execute(conn, name, params)
+        invalidate(namespace)
+        return count > 0
+
+    async def _rows(self, name, params=None):
+        pool = await get_async_pool(self.db_config)
+        async with pool.acquire() as conn:
+            rows = await fetch(conn, name, params)
+        return [dict(r) for r in rows]
+
+    # AUTHOR
+    async def add_author(self, full_name):
+        """New author_id"""
+        return await self._one("add_author", (full_name,), "authors")
+
+    # BOOK
+    async def add_book(self, title, category, isbn, copies_available, author_id):
+        """New book_id"""
+        return await self._one("add_book", (title, category, isbn, copies_available, author_id), "books")
+
+    async def update_book_stock(self, book_id, new_stock):
+        """True if the book exists"""
+        return await self._write("update_book_stock", (new_stock, book_id), "books")
+
+    async def delete_book(self, book_id):
+        """True if the book existed"""
+        return await self._write("delete_book", (book_id,), "books")
+
+    # MEMBERS
+    async def all_members(self):
+        """[{'user_id', 'full_name', 'username', 'email'}, ...]"""
+        return await self._rows("all_members")
+
+    # BOOK CLUB
+    async def create_book_club(self, club_name, moderator_id):
+        """New club_id"""
+        return await self._one("create_book_club", (club_name, moderator_id), "bookclubs")
+
+    async def add_member_to_club(self, club_id, member_id):
+        return await self._write("add_club_member", (club_id, member_id), "bookclub_members")
+
+    async def club_members(self, club_id):
+        """[{'user_id', 'full_name'}, ...]"""
+        return await self._rows("club_members", (club_id,))
@@ -0,0 +1,210 @@
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import threading
+import time
+from backend.config import session_secret
+from backend.db import get_pool
+from backend.queries import run_query
+from backend.role import Role
+
+# Passwords are stored as "pbkdf2_sha256$<iterations>$<salt>$<hash>" (base64 without
+# padding). Rows still holding the plaintext password from database.sql are accepted
+# once and rewritten as a hash on that login; so are hashes made with a different
+# iteration count, which is how raising the cost rolls out.
+HASH_PREFIX = "pbkdf2_sha256"
+DEFAULT_ITERATIONS = 200_000
+SESSION_TTL = 8 * 3600       # a desk shift
+
+
+def _b64(raw):
+    return base64.b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _unb64(text):
+    return base64.b64decode(text + "=" * (-len(text) % 4))
+
+
+def hash_password(password, iterations=DEFAULT_ITERATIONS, salt=None):
+    salt = salt or os.urandom(16)
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, iterations)
+    return f"{HASH_PREFIX}${iterations}${_b64(salt)}${_b64(digest)}"
+
+
+def verify_password(password, stored, iterations=DEFAULT_ITERATIONS):
+    """(matches, needs_rehash) for a stored hash or a legacy plaintext password"""
+    if not stored:
+        return False, False
+    parts = stored.split("$")
+    if len(parts) != 4 or parts[0] != HASH_PREFIX:
+        # legacy plaintext row
+        return hmac.compare_digest(password.encode("utf-8"), stored.encode("utf-8")), True
+    rounds, salt, expected = int(parts[1]), _unb64(parts[2]), _unb64(parts[3])
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, rounds)
+    return hmac.compare_digest(digest, expected), rounds != iterations
+
+
+_dummy_hashes = {}
+
+
+def _dummy_hash(iterations):
+    # checked when the username does not exist, so a miss costs as much as a wrong password
+    if iterations not in _dummy_hashes:
+        _dummy_hashes[iterations] = hash_password(secrets.token_hex(8), iterations)
+    return _dummy_hashes[iterations]
+
+
+def verify_unknown_user(password, iterations=DEFAULT_ITERATIONS):
+    """Check password against a throwaway hash; always False, in the time a real check takes"""
+    verify_password(password, _dummy_hash(iterations), iterations)
+    return False
+
+
+def check_credentials(conn, username, password, iterations=DEFAULT_ITERATIONS):
+    """
+    (user_id, full_name, role_id) if the password matches, else None.
+    Upgrades the stored password to the current hash format in the same call.
+    """
+    cur = conn.cursor()
+    try:
+        row = run_query(cur, "login_lookup", (username,)).fetchone()
+        if row is None:
+            verify_unknown_user(password, iterations)
+            return None
+        user_id, full_name, role_id, stored = row
+        ok, stale = verify_password(password, stored, iterations)
+        if not ok:
+            return None
+        if stale:
+            run_query(cur, "set_password", (hash_password(password, iterations), user_id))
+            conn.commit()
+        return user_id, full_name, role_id
+    finally:
+        cur.close()
+
+
+class SessionTokens:
+    """
+    Stateless login sessions: the session dict travels in the token itself,
+    signed with HMAC-SHA256, so any instance holding the same secret can
+    check a token without a database or a shared session store. Tokens
+    expire `ttl` seconds after login.
+
+    Revoked tokens (logout) are remembered in this process until they would
+    have expired anyway; other instances honour a logout only through expiry.
+    """
+
+    def __init__(self, secret=None, ttl=SESSION_TTL):
+        if not secret:
+            # tokens then only verify in this process and die with it
+            print("SMARTLIBRARY_SECRET is not set; using a per-process session secret")
+            secret = secrets.token_bytes(32)
+        self.secret = secret.encode("utf-8") if isinstance(secret, str) else secret
+        self.ttl = ttl
+        self._revoked = {}   # token id -> expires_at
+        self._lock = threading.Lock()
+
+    def _sign(self, payload):
+        return _b64(hmac.new(self.secret, payload.encode("ascii"), hashlib.sha256).digest())
+
+    def issue(self, session):
+        claims = dict(session, exp=int(time.time()) + self.ttl, jti=secrets.token_urlsafe(12))
+        payload = _b64(json.dumps(claims, separators=(",", ":")).encode("utf-8"))
+        return f"{payload}.{self._sign(payload)}"
+
+    def _claims(self, token):
+        """Verified, unexpired claims of token, or None"""
+        if not token or token.count(".") != 1:
+            return None
+        payload, signature = token.split(".")
+        try:
+            if not hmac.compare_digest(signature.encode("ascii"), self._sign(payload).encode("ascii")):
+                return None
+            claims = json.loads(_unb64(payload))
+        except ValueError:   # not ASCII, not base64 or not JSON
+            return None
+        if claims.get("exp", 0) <= time.time():
+            return None
+        return claims
+
+    def get(self, token):
+        claims = self._claims(token)
+        if claims is None:
+            return None
+        with self._lock:
+            if claims["jti"] in self._revoked:
+                return None
+        return {k: v for k, v in claims.items() if k not in ("exp", "jti")}
+
+    def revoke(self, token):
+        claims = self._claims(token)
+        if claims is None:
+            return False
+        self.purge()
+        with self._lock:
+            self._revoked[claims["jti"]] = claims["exp"]
+        return True
+
+    def purge(self):
+        """Forget revoked tokens that have expired anyway; returns how many went"""
+        now = time.time()
+        with self._lock:
+            expired = [jti for jti, exp in self._revoked.items() if exp <= now]
+            for jti in expired:
+                del self._revoked[jti]
+            return len(expired)
+
+    def __len__(self):
+        """Revoked tokens still remembered"""
+        with self._lock:
+            return len(self._revoked)
+
+
+class Authenticator:
+    def __init__(self, db_config, iterations=DEFAULT_ITERATIONS, sessions=None):
+        """
+        iterations PBKDF2 rounds for new hashes; stored hashes with another count
+                   are rewritten at their next successful login
+        sessions   a SessionTokens (one signing with SMARTLIBRARY_SECRET is
+                   created if not given)
+        """
+        self.db_config = db_config
+        self.iterations = iterations
+        self.sessions = sessions if sessions is not None else SessionTokens(session_secret)
+
+    def login(self, username, password):
+        """
+        Session dict {'token', 'user_id', 'full_name', 'role_id', 'role_name'}
+        or None if the credentials are wrong.
+        """
+        conn = get_pool(self.db_config).getconn()
+        try:
+            row = check_credentials(conn, username, password, self.iterations)
+            if row is None:
+                return None
+            user_id, full_name, role_id = row
+            role = Role(conn)
+            try:
+                role_name = role.get_role_name(role_id)
+            finally:
+                role.cursor.close()   # conn itself goes back to the pool below
+        finally:
+            conn.close()
+        session = {"user_id": user_id, "full_name": full_name,
+                   "role_id": role_id, "role_name": role_name}
+        token = self.sessions.issue(session)
+        return dict(session, token=token)
+
+    def authorize(self, token, role_id=None):
+        """The session for token (no database access), or None if it is forged,
+        expired, revoked or lacks role_id."""
+        session = self.sessions.get(token)
+        if session is None or (role_id is not None and session["role_id"] != role_id):
+            return None
+        return session
+
+    def logout(self, token):
+        return self.sessions.revoke(token)
@@ -0,0 +1,100 @@
+import functools
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """
+    Size-bounded LRU cache whose entries also expire after `ttl` seconds.
+    Keys are tuples whose first element is a namespace ("authors", "books", ...)
+    so every entry of one kind can be invalidated at once after a write.
+    """
+
+    def __init__(self, maxsize=512, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()   # key -> (expires_at, value)
+        self._generation = {}        # namespace -> bumped on every invalidate
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0, "invalidations": 0}
+
+    def get_or_load(self, key, loader):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._data.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return entry[1]
+                del self._data[key]
+                self._stats["expired"] += 1
+            self._stats["misses"] += 1
+            generation = self._generation.get(key[0], 0)
+
+        # load outside the lock so one slow query doesn't stall every other lookup
+        value = loader()
+
+        with self._lock:
+            if self._generation.get(key[0], 0) != generation:
+                # a write landed while we were loading; don't cache what may be stale
+                return value
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self._stats["evictions"] += 1
+        return value
+
+    def invalidate(self, *namespaces):
+        with self._lock:
+            for ns in namespaces:
+                self._generation[ns] = self._generation.get(ns, 0) + 1
+            stale = [k for k in self._data if k[0] in namespaces]
+            for k in stale:
+                del self._data[k]
+            self._stats["invalidations"] += len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            s = dict(self._stats)
+            s["size"] = len(self._data)
+            lookups = s["hits"] + s["misses"]
+            s["hit_rate"] = s["hits"] / lookups if lookups else 0.0
+            return s
+
+
+# Catalog pages, searches and browse results ("books") are keyed by what users
+# type, so there are many of them and each is read a few times; they get their
+# own LRU so a burst of searches can't evict authors, roles or the policy.
+PAGE_NAMESPACES = {"books"}
+
+_reference = TTLCache()
+_pages = TTLCache(maxsize=256, ttl=60)
+
+
+def get_cache(namespace=None):
+    """The process-wide cache for namespace: catalog pages for "books", reference data otherwise"""
+    return _pages if namespace in PAGE_NAMESPACES else _reference
+
+
+def cached(namespace):
+    """Read-through decorator: results are keyed by (namespace, function name, *args)"""
+    cache = get_cache(namespace)
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args):
+            return cache.get_or_load((namespace, fn.__name__, *args), lambda: fn(*args))
+        return wrapper
+    return decorator
+
+
+def invalidate(*namespaces):
+    _reference.invalidate(*namespaces)
+    _pages.invalidate(*namespaces)
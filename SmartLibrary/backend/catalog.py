@@ -0,0 +1,256 @@
+import re
+from contextlib import closing
+from backend.db import get_pool
+from backend.queries import run_query, register
+
+
+def build_prefix_tsquery(text):
+    """'harry pot' -> 'harry:* & pot:*' (only word characters survive)"""
+    words = re.findall(r"\w+", text.lower())
+    return " & ".join(f"{w}:*" for w in words)
+
+
+# Browse filters and sort keys, keyed by the short code used in query names.
+# Only these fragments ever reach the SQL; values travel as parameters.
+BROWSE_FILTERS = {
+    "category": ("c", "b.category = %(category)s"),
+    "author_id": ("a", "EXISTS (SELECT 1 FROM bookauthors ba WHERE ba.book_id = b.book_id AND ba.author_id = %(author_id)s)"),
+    "available": ("v", "b.copies_available > 0"),
+}
+
+SORT_KEYS = {
+    "title": ("t", "title"),
+    "category": ("c", "category"),
+    "available": ("v", "copies_available"),
+    "isbn": ("i", "isbn"),
+    "book_id": ("n", "book_id"),
+}
+
+MAX_SORT_KEYS = 3
+
+# SQLSTATEs meaning the search schema from 0001 is missing: undefined_table,
+# undefined_column, undefined_function (pg_trgm's similarity, say)
+SEARCH_SCHEMA_MISSING = {"42P01", "42703", "42883"}
+
+# Sorts offered by the catalog page. Browse shapes using them are prepared on
+# every pooled connection; any other sort runs as plain SQL, so a client trying
+# combinations can't leave hundreds of prepared plans on each connection.
+COMMON_SORTS = {
+    (("title", "asc"),),
+    (("title", "desc"),),
+    (("category", "asc"), ("title", "asc")),
+    (("available", "desc"), ("title", "asc")),
+    (("book_id", "asc"),),
+}
+
+# Row layout of browse results, and the columns that may be NULL
+BROWSE_FIELDS = ["book_id", "title", "category", "isbn", "copies_available"]
+NULLABLE = {"category", "isbn"}
+BROWSE_COLUMNS = ", ".join("b." + f for f in BROWSE_FIELDS)
+
+# One page of books plus, with facets, the books per category (ignoring the
+# category filter) and per availability (ignoring the availability filter)
+# under the other filters, so the counts show what picking a value would give.
+# Each part is its own scan of book so each can use its own index
+# (migrations/0012_catalog_browse.sql, 0017_browse_indexes_without_stock.sql,
+# 0018_in_stock_browse_indexes.sql).
+# Pages are keyset pages: {page_where} adds "after the previous page's last
+# row" in sort order, so rows inserted or deleted meanwhile don't shift them.
+BROWSE_FACETS_SQL = """
+    SELECT
+        (SELECT COALESCE(json_agg(json_build_array(book_id, title, category, isbn, copies_available) ORDER BY {order}), '[]')
+         FROM (
+             SELECT {columns} FROM book b WHERE {page_where}
+             ORDER BY {order} LIMIT %(limit)s
+         ) page),
+        (SELECT COALESCE(json_object_agg(COALESCE(category, ''), n), '{{}}')
+         FROM (SELECT b.category, COUNT(*) AS n FROM book b WHERE {where_no_category} GROUP BY b.category) c),
+        (SELECT json_build_object('available', COUNT(*) FILTER (WHERE b.copies_available > 0),
+                                  'unavailable', COUNT(*) FILTER (WHERE b.copies_available <= 0))
+         FROM book b WHERE {where_no_available});
+"""
+
+BROWSE_SQL = """
+    SELECT {columns} FROM book b WHERE {page_where}
+    ORDER BY {order} LIMIT %(limit)s;
+"""
+
+
+def parse_sort(text):
+    """'category,-title' -> [('category', 'asc'), ('title', 'desc')]; unknown keys are an error"""
+    sort = []
+    for part in filter(None, (p.strip() for p in text.split(","))):
+        key, direction = (part[1:], "desc") if part.startswith("-") else (part, "asc")
+        sort.append((key, direction))
+    return check_sort(sort)
+
+
+def check_sort(sort):
+    """
+    sort as a list of (key, 'asc'|'desc'); raises ValueError for unknown or
+    repeated keys and for more than MAX_SORT_KEYS of them.
+    """
+    checked, seen = [], set()
+    for key, direction in sort:
+        if key not in SORT_KEYS:
+            raise ValueError(f"Unknown sort key: {key}")
+        if key in seen:
+            raise ValueError(f"Sort key given twice: {key}")
+        seen.add(key)
+        checked.append((key, "desc" if str(direction).lower() == "desc" else "asc"))
+    if len(checked) > MAX_SORT_KEYS:
+        raise ValueError(f"At most {MAX_SORT_KEYS} sort keys")
+    return checked
+
+
+def order_keys(sort):
+    """
+    [(column, descending), ...] that browse pages are ordered by: the sort,
+    cut at book_id, then book_id in the direction of the last key so ties are
+    stable and a (title, book_id) style index can be walked either way.
+    """
+    keys = []
+    for key, direction in sort:
+        keys.append((SORT_KEYS[key][1], direction == "desc"))
+        if key == "book_id":
+            return keys
+    keys.append(("book_id", keys[-1][1] if keys else False))
+    return keys
+
+
+def keyset_predicate(keys):
+    """
+    SQL for "comes after the cursor" under ORDER BY keys (NULLs last ascending,
+    first descending, as Postgres sorts them). The cursor values are
+    %(after_0)s, %(after_1)s, ... in key order. The trailing run of NOT NULL
+    keys sorted the same way is a single row comparison, which the planner
+    can use as an index bound.
+    """
+    params = [f"%(after_{i})s" for i in range(len(keys))]
+    descending = keys[-1][1]
+    start = len(keys) - 1
+    while start > 0 and keys[start - 1][0] not in NULLABLE and keys[start - 1][1] == descending:
+        start -= 1
+    predicate = "({}) {} ({})".format(", ".join("b." + c for c, _ in keys[start:]),
+                                      "<" if descending else ">", ", ".join(params[start:]))
+    for i in reversed(range(start)):
+        column, desc = keys[i]
+        col, p = "b." + column, params[i]
+        if column not in NULLABLE:
+            after, same = f"{col} {'<' if desc else '>'} {p}", f"{col} = {p}"
+        elif desc:
+            after = f"({col} < {p} OR ({p} IS NULL AND {col} IS NOT NULL))"
+            same = f"{col} IS NOT DISTINCT FROM {p}"
+        else:
+            after = f"({col} > {p} OR ({p} IS NOT NULL AND {col} IS NULL))"
+            same = f"{col} IS NOT DISTINCT FROM {p}"
+        predicate = f"({after} OR ({same} AND {predicate}))"
+    return predicate
+
+
+def browse_query(filters, sort, facets, after=False):
+    """
+    Name of the registered query for this combination of filters (names from
+    BROWSE_FILTERS), sort [(key, 'asc'|'desc'), ...], facets flag and whether
+    it continues after a previous page, registering it on first use. Shapes
+    with a COMMON_SORTS sort are prepared once per connection like any other
+    query; the rest are sent as text.
+    """
+    sort = check_sort(sort)
+    filters = [f for f in BROWSE_FILTERS if f in filters]
+    keys = order_keys(sort)
+    order = [f"{column} {'DESC' if desc else 'ASC'}" for column, desc in keys]
+    codes = [SORT_KEYS[key][0] + direction[0] for key, direction in sort]
+
+    def where(skip=None):
+        parts = [BROWSE_FILTERS[f][1] for f in filters if f != skip]
+        return " AND ".join(parts) or "TRUE"
+
+    page_where = where()
+    if after:
+        page_where = f"{page_where} AND {keyset_predicate(keys)}"
+
+    name = "catalog_browse_{}_{}{}{}".format(
+        "".join(BROWSE_FILTERS[f][0] for f in filters) or "all",
+        "".join(codes) or "id",
+        "_facets" if facets else "",
+        "_after" if after else "")
+    template = BROWSE_FACETS_SQL if facets else BROWSE_SQL
+    sql = template.format(columns=BROWSE_COLUMNS, order=", ".join(order), page_where=page_where,
+                          where_no_category=where("category"), where_no_available=where("available"))
+    register(name, sql, prepare=tuple(sort) in COMMON_SORTS)
+    return name
+
+
+def browse_cursor(sort, row):
+    """Keyset parameters {after_0: ..., ...} for the page after row (a browse result row)"""
+    return {f"after_{i}": row[BROWSE_FIELDS.index(column)]
+            for i, (column, _) in enumerate(order_keys(check_sort(sort)))}
+
+
+class Catalog:
+    def __init__(self, db_config):
+        self.db_config = db_config
+
+    def connect(self):
+        return get_pool(self.db_config).getconn()
+
+    def search_books(self, query, limit=50, offset=0):
+        """
+        Ranked search over title, category, author name and ISBN, with prefix
+        matching on every word. Returns rows of
+        (book_id, title, category, isbn, copies_available, rank), best first.
+        If the database lacks what the ranked query needs (the 0001 migration
+        was never applied) it falls back to a substring match on title,
+        category and ISBN; any other error reaches the caller.
+        """
+        tsquery = build_prefix_tsquery(query)
+        if not tsquery:
+            return []
+        isbn = re.sub(r"[-\s]", "", query)
+        isbn_prefix = isbn + "%" if re.fullmatch(r"\d[\dXx]{2,}", isbn) else None
+        try:
+            return self._search("catalog_search", {
+                "tsquery": tsquery,
+                "term": query.strip(),
+                "isbn_prefix": isbn_prefix,
+                "limit": limit,
+                "offset": offset,
+            })
+        except Exception as e:
+            if getattr(e, "pgcode", None) not in SEARCH_SCHEMA_MISSING:
+                raise
+            print("Ranked search needs migration 0001, falling back to ILIKE:", e)
+        # errors from the fallback reach the caller, so nobody caches them as "no results"
+        pattern = "%" + re.sub(r"([%_\\])", r"\\\1", query.strip()) + "%"
+        return self._search("catalog_search_ilike", {"pattern": pattern, "limit": limit, "offset": offset})
+
+    def _search(self, name, params):
+        with closing(self.connect()) as conn, closing(conn.cursor()) as cur:
+            run_query(cur, name, params)
+            return cur.fetchall()
+
+    def browse(self, category=None, author_id=None, available=False, sort=(("title", "asc"),),
+               limit=50, after=None, facets=False):
+        """
+        Filtered, sorted catalog page, all in one query. `after` is the last
+        row of the previous page (None for the first one); pages continue from
+        it in sort order rather than by offset. Returns
+        {'books': [(book_id, title, category, isbn, copies_available), ...],
+         'facets': {'categories': {category: count}, 'availability': {'available': n, 'unavailable': n}}
+                   or None unless facets=True}.
+        """
+        params = {"category": category, "author_id": author_id, "limit": limit}
+        if after is not None:
+            params.update(browse_cursor(sort, after))
+        filters = [f for f, on in (("category", category is not None),
+                                   ("author_id", author_id is not None),
+                                   ("available", available)) if on]
+        name = browse_query(filters, sort, facets, after is not None)
+        with closing(self.connect()) as conn, closing(conn.cursor()) as cur:
+            run_query(cur, name, params)
+            if not facets:
+                return {"books": cur.fetchall(), "facets": None}
+            books, categories, availability = cur.fetchone()
+            return {"books": [tuple(b) for b in books],
+                    "facets": {"categories": categories, "availability": availability}}
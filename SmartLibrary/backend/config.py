@@ -0,0 +1,15 @@
+import os
+
+# Database settings shared by main.py, the GUI, serve.py and the command-line
+# jobs. Each one can be overridden from the environment, e.g.
+#   SMARTLIBRARY_DB_HOST=db.internal python serve.py
+db_config = {
+    "host": os.environ.get("SMARTLIBRARY_DB_HOST", "localhost"),
+    "database": os.environ.get("SMARTLIBRARY_DB_NAME", "smartlibrary"),
+    "user": os.environ.get("SMARTLIBRARY_DB_USER", "postgres"),
+    "password": os.environ.get("SMARTLIBRARY_DB_PASSWORD", "Pes@2022"),
+}
+
+# Key that signs login session tokens (backend/auth.py). Give every service
+# instance the same value so a token issued by one is accepted by the others.
+session_secret = os.environ.get("SMARTLIBRARY_SECRET", "")
@@ -0,0 +1,222 @@
+import threading
+import time
+import psycopg2
+import psycopg2.extensions
+
+
+class PoolError(Exception):
+    pass
+
+
+class LibraryConnection(psycopg2.extensions.connection):
+    """psycopg2 connection that remembers which named queries it has PREPAREd"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared = set()
+
+
+class PooledConnection:
+    """Wraps a psycopg2 connection so that close() hands it back to the pool"""
+
+    def __init__(self, pool, conn):
+        self._pool = pool
+        self._conn = conn
+
+    def __getattr__(self, name):
+        if self._conn is None:
+            raise PoolError("Connection already returned to the pool")
+        return getattr(self._conn, name)
+
+    def __enter__(self):
+        self._conn.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return self._conn.__exit__(exc_type, exc, tb)
+
+    def close(self):
+        if self._conn is not None:
+            conn, self._conn = self._conn, None
+            self._pool.putconn(conn)
+
+    def __del__(self):
+        # last resort only: callers close() in a finally block (or use closing())
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+class ConnectionPool:
+    def __init__(self, db_config, minconn=1, maxconn=10, max_idle=300,
+                 check_after=30, timeout=30):
+        """
+        minconn     connections kept open even when idle
+        maxconn     hard cap on open connections; getconn() waits when reached
+        max_idle    seconds an idle connection may live before it is reaped
+        check_after idle seconds after which a connection is pinged on checkout
+        timeout     seconds getconn() waits for a free connection
+        """
+        self.db_config = db_config
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.max_idle = max_idle
+        self.check_after = check_after
+        self.timeout = timeout
+
+        self._idle = []        # list of (conn, returned_at)
+        self._in_use = 0
+        self._cond = threading.Condition()
+        self._stats = {"connects": 0, "checkouts": 0, "waits": 0,
+                       "health_failures": 0, "reaped": 0}
+
+        for _ in range(minconn):
+            self._idle.append((self._new_conn(), time.monotonic()))
+
+    def _new_conn(self):
+        conn = psycopg2.connect(connection_factory=LibraryConnection, **self.db_config)
+        with self._cond:
+            self._stats["connects"] += 1
+        return conn
+
+    def _is_healthy(self, conn, idle_for):
+        if conn.closed:
+            return False
+        if idle_for < self.check_after:
+            return True
+        try:
+            cur = conn.cursor()
+            cur.execute("SELECT 1;")
+            cur.close()
+            conn.rollback()
+            return True
+        except Exception:
+            return False
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _reap(self, now):
+        """
+        Take connections idle longer than max_idle out of the pool, keeping
+        minconn around. Returns them for the caller to close outside the lock.
+        """
+        keep, expired = [], []
+        for conn, since in self._idle:
+            total = len(keep) + self._in_use
+            if now - since > self.max_idle and total >= self.minconn:
+                expired.append(conn)
+                self._stats["reaped"] += 1
+            else:
+                keep.append((conn, since))
+        self._idle = keep
+        return expired
+
+    def getconn(self):
+        """
+        A connection from the pool. Only the bookkeeping happens under the lock:
+        the slot is reserved first, then the ping or the new connect runs
+        outside it, so a slow server doesn't stall every other checkout.
+        """
+        deadline = time.monotonic() + self.timeout
+        while True:
+            conn, idle_for = self._reserve(deadline)
+            try:
+                if conn is not None:
+                    if self._is_healthy(conn, idle_for):
+                        return PooledConnection(self, conn)
+                    with self._cond:
+                        self._stats["health_failures"] += 1
+                    self._discard(conn)
+                conn = self._new_conn()
+                return PooledConnection(self, conn)
+            except BaseException:
+                self._release()
+                raise
+
+    def _reserve(self, deadline):
+        """
+        Take a slot: (idle conn, seconds idle) or (None, 0) when the caller
+        should open a new connection. Waits while maxconn are in use.
+        """
+        expired = []
+        try:
+            with self._cond:
+                while True:
+                    now = time.monotonic()
+                    expired += self._reap(now)
+                    if self._idle or self._in_use < self.maxconn:
+                        self._in_use += 1
+                        self._stats["checkouts"] += 1
+                        if self._idle:
+                            conn, since = self._idle.pop()
+                            return conn, now - since
+                        return None, 0
+
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        raise PoolError(f"No free connection after {self.timeout}s (max {self.maxconn})")
+                    self._stats["waits"] += 1
+                    self._cond.wait(remaining)
+        finally:
+            for conn in expired:
+                self._discard(conn)
+
+    def _release(self):
+        """Give back a slot reserved by _reserve() whose connection never materialised"""
+        with self._cond:
+            self._in_use -= 1
+            self._cond.notify()
+
+    def putconn(self, conn):
+        if not conn.closed:
+            try:
+                # never hand out a connection with an open transaction
+                conn.rollback()
+            except Exception:
+                self._discard(conn)
+        with self._cond:
+            self._in_use -= 1
+            if not conn.closed:
+                self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    def stats(self):
+        with self._cond:
+            s = dict(self._stats)
+            s["idle"] = len(self._idle)
+            s["in_use"] = self._in_use
+            s["checkouts_per_connect"] = s["checkouts"] / s["connects"] if s["connects"] else 0.0
+            return s
+
+    def closeall(self):
+        with self._cond:
+            for conn, _ in self._idle:
+                self._discard(conn)
+            self._idle = []
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_config, **kwargs):
+    """Return the process-wide pool for db_config, creating it on first use"""
+    key = tuple(sorted(db_config.items()))
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = ConnectionPool(db_config, **kwargs)
+            _pools[key] = pool
+        return pool
+
+
+def close_all_pools():
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.closeall()
+        _pools.clear()
@@ -0,0 +1,162 @@
+import json
+from backend.db import get_pool
+from backend.queries import users_table
+
+# What each exportable table selects. {users} is resolved at run time because
+# the users table is "User" in database.sql and plain user in some deployments.
+# Passwords are never exported. "loan" is the whole loan history: the loans
+# still in loan plus the returned ones backend/maintenance.py moved to
+# loan_archive, told apart by the archived column.
+EXPORTS = {
+    "book": "SELECT book_id, title, category, isbn, copies_available FROM book",
+    "author": "SELECT author_id, full_name FROM author",
+    "loan": (
+        "SELECT * FROM ("
+        "SELECT loan_id, book_id, member_id, borrow_date, due_date, returned, FALSE AS archived FROM loan "
+        "UNION ALL "
+        "SELECT loan_id, book_id, member_id, borrow_date, due_date, returned, TRUE FROM loan_archive"
+        ") loans"
+    ),
+    "user": "SELECT user_id, username, full_name, email, role_id FROM {users}",
+    "bookclub": "SELECT club_id, club_name, moderator_id FROM bookclub",
+    "bookclubmembers": "SELECT club_id, member_id FROM bookclubmembers",
+}
+
+ORDER_BY = {
+    "book": "book_id", "author": "author_id", "loan": "loan_id", "user": "user_id",
+    "bookclub": "club_id", "bookclubmembers": "club_id, member_id",
+}
+
+# Postgres type OID -> pyarrow type name for the Parquet schema. Types not
+# listed (text, varchar, json, unconstrained numeric, ...) are written as strings.
+PARQUET_TYPES = {
+    16: "bool", 20: "int64", 21: "int16", 23: "int32", 700: "float32", 701: "float64",
+    1082: "date32", 1114: "timestamp", 1184: "timestamptz",
+}
+
+class DataExporter:
+    def __init__(self, db_config, batch_size=10000):
+        self.db_config = db_config
+        self.batch_size = batch_size
+
+    def connect(self):
+        return get_pool(self.db_config).getconn()
+
+    def build_query(self, cur, table, category=None, since=None, until=None):
+        """SELECT for one table with the optional filters bound in"""
+        if table not in EXPORTS:
+            raise ValueError(f"Unknown table '{table}' (choose from {', '.join(EXPORTS)})")
+        sql = EXPORTS[table]
+        if "{users}" in sql:
+            sql = sql.format(users=users_table(cur))
+
+        where, params = [], []
+        if category is not None and table == "book":
+            where.append("category = %s")
+            params.append(category)
+        if since is not None and table == "loan":
+            where.append("borrow_date >= %s")
+            params.append(since)
+        if until is not None and table == "loan":
+            where.append("borrow_date < %s")
+            params.append(until)
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += f" ORDER BY {ORDER_BY[table]}"
+        return cur.mogrify(sql, params).decode()
+
+    def export(self, table, out, fmt="csv", **filters):
+        """
+        Stream one table to `out` (a text file object, or a path for parquet)
+        without holding the result in memory. Returns the number of rows written
+        (None for csv, where COPY does the counting on the server).
+        """
+        conn = self.connect()
+        try:
+            cur = conn.cursor()
+            query = self.build_query(cur, table, **filters)
+            cur.close()
+            if fmt == "csv":
+                cur = conn.cursor()
+                cur.copy_expert(f"COPY ({query}) TO STDOUT WITH (FORMAT csv, HEADER)", out)
+                cur.close()
+                return None
+            if fmt == "jsonl":
+                return self._export_jsonl(conn, query, out)
+            if fmt == "parquet":
+                return self._export_parquet(conn, query, out)
+            raise ValueError(f"Unknown format '{fmt}'")
+        finally:
+            conn.rollback()
+            conn.close()
+
+    def _batches(self, conn, query):
+        """Server-side (named) cursor: (cursor.description, rows) batch_size rows at a time"""
+        cur = conn.cursor(name="export_cursor")
+        cur.itersize = self.batch_size
+        cur.execute(query)
+        try:
+            first = cur.fetchmany(self.batch_size)
+            yield cur.description, first
+            while True:
+                rows = cur.fetchmany(self.batch_size)
+                if not rows:
+                    break
+                yield cur.description, rows
+        finally:
+            cur.close()
+
+    def _export_jsonl(self, conn, query, out):
+        count = 0
+        for description, rows in self._batches(conn, query):
+            columns = [d.name for d in description]
+            for row in rows:
+                out.write(json.dumps(dict(zip(columns, row)), default=str) + "\n")
+            count += len(rows)
+        return count
+
+    def _export_parquet(self, conn, query, path):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow)")
+        count, writer = 0, None
+        try:
+            for description, rows in self._batches(conn, query):
+                if writer is None:
+                    # from the column types, not the first batch: a column that
+                    # happens to be all NULL there must not become type null
+                    writer = pq.ParquetWriter(path, parquet_schema(pa, description))
+                if rows:
+                    columns = {}
+                    for i, field in enumerate(writer.schema):
+                        values = [r[i] for r in rows]
+                        if pa.types.is_string(field.type):
+                            values = [v if v is None or isinstance(v, str) else str(v) for v in values]
+                        columns[field.name] = values
+                    writer.write_table(pa.Table.from_pydict(columns, schema=writer.schema))
+                count += len(rows)
+        finally:
+            if writer is not None:
+                writer.close()
+        return count
+
+
+def parquet_schema(pa, description):
+    """pyarrow schema for a psycopg2 cursor.description"""
+    fields = []
+    for d in description:
+        kind = PARQUET_TYPES.get(d.type_code)
+        if kind == "timestamp":
+            t = pa.timestamp("us")
+        elif kind == "timestamptz":
+            t = pa.timestamp("us", tz="UTC")
+        elif kind is not None:
+            t = getattr(pa, kind)()
+        elif d.type_code == 1700 and d.precision:   # numeric(p, s)
+            t = pa.decimal128(d.precision, d.scale or 0)
+        else:
+            t = pa.string()
+        fields.append(pa.field(d.name, t))
+    return pa.schema(fields)
@@ -0,0 +1,145 @@
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from backend.db import get_pool
+from backend.queries import register, run_query
+
+# Where the last run's overdue scan stopped (migrations/0015_fine_run_cutoff.sql),
+# and the last as_of for runs recorded before cutoffs were stored
+LAST_RUN_SQL = "SELECT max(due_cutoff), max(as_of) FROM fine_runs;"
+
+# Loans that became overdue since the last run: due_date in [the last run's
+# cutoff, as_of - grace). A range scan on loan_active_due_date_idx, so the cost
+# follows the number of newly overdue loans, not the size of loan. Starting
+# from the stored cutoff rather than last as_of - grace keeps the ranges
+# contiguous when grace_days changes between runs.
+NEW_OVERDUE_SQL = """
+    INSERT INTO loan_fines (loan_id, member_id, book_id, due_date, assessed_on)
+    SELECT loan_id, member_id, book_id, due_date, DATE '-infinity'
+    FROM loan
+    WHERE returned = FALSE
+      AND due_date < %(cutoff)s
+      AND due_date >= %(since)s
+    ON CONFLICT (loan_id) DO NOTHING;
+"""
+register("new_overdue_fines", NEW_OVERDUE_SQL)
+
+# One batch of open fines not yet assessed for as_of: still-active loans get
+# their days and amount recomputed, returned or archived ones are closed with
+# the amount they had reached.
+REASSESS_BATCH_SQL = """
+    WITH batch AS (
+        SELECT f.loan_id, l.loan_id IS NOT NULL AND l.returned = FALSE AS active
+        FROM loan_fines f
+        LEFT JOIN loan l ON l.loan_id = f.loan_id
+        WHERE f.closed = FALSE AND f.assessed_on < %(as_of)s
+        LIMIT %(batch_size)s
+        FOR UPDATE OF f SKIP LOCKED
+    )
+    UPDATE loan_fines f SET
+        days_overdue = CASE WHEN b.active
+                            THEN GREATEST(%(as_of)s - f.due_date - %(grace)s, 0)
+                            ELSE f.days_overdue END,
+        amount = CASE WHEN b.active
+                      THEN LEAST(GREATEST(%(as_of)s - f.due_date - %(grace)s, 0) * %(rate)s, %(max_fine)s)
+                      ELSE f.amount END,
+        closed = NOT b.active,
+        assessed_on = %(as_of)s
+    FROM batch b
+    WHERE f.loan_id = b.loan_id
+    RETURNING f.closed;
+"""
+
+RECORD_RUN_SQL = """
+    INSERT INTO fine_runs (as_of, due_cutoff, new_fines, reassessed, closed)
+    VALUES (%s, %s, %s, %s, %s);
+"""
+
+MEMBER_FINES_SQL = """
+    SELECT loan_id, book_id, due_date, days_overdue, amount, closed
+    FROM loan_fines
+    WHERE member_id = %s AND paid = FALSE
+    ORDER BY due_date;
+"""
+
+
+class FineEngine:
+    def __init__(self, db_config, daily_rate=Decimal("0.50"), grace_days=2,
+                 max_fine=Decimal("20.00"), batch_size=5000, pause=0.05):
+        """
+        daily_rate  fine per day past the grace period
+        grace_days  days after due_date before a loan counts as overdue
+        max_fine    cap per loan
+        batch_size  fines reassessed per transaction
+        pause       seconds between batches so desk traffic gets through
+        """
+        self.db_config = db_config
+        self.daily_rate = Decimal(daily_rate)
+        self.grace_days = grace_days
+        self.max_fine = Decimal(max_fine)
+        self.batch_size = batch_size
+        self.pause = pause
+
+    def connect(self):
+        return get_pool(self.db_config).getconn()
+
+    def run(self, as_of=None):
+        """
+        Pick up loans that went overdue since the last run, then bring every
+        open fine up to date for as_of (default today). Safe to re-run; a run
+        for a date already assessed only adds loans that are new since then.
+        Returns {'new_fines', 'reassessed', 'closed'}.
+        """
+        as_of = as_of or date.today()
+        cutoff = as_of - timedelta(days=self.grace_days)   # due before this is overdue
+        params = {"as_of": as_of, "grace": self.grace_days, "rate": self.daily_rate,
+                  "max_fine": self.max_fine, "batch_size": self.batch_size}
+        result = {"new_fines": 0, "reassessed": 0, "closed": 0}
+        conn = self.connect()
+        cur = conn.cursor()
+        try:
+            cur.execute(LAST_RUN_SQL)
+            last_cutoff, last_as_of = cur.fetchone()
+            if last_cutoff is not None:
+                since = last_cutoff
+            elif last_as_of is not None:
+                since = last_as_of - timedelta(days=self.grace_days)
+            else:
+                since = date.min
+            run_query(cur, "new_overdue_fines", dict(params, since=since, cutoff=cutoff))
+            result["new_fines"] = cur.rowcount
+            conn.commit()
+
+            while True:
+                cur.execute(REASSESS_BATCH_SQL, params)
+                closed_flags = [r[0] for r in cur.fetchall()]
+                conn.commit()
+                result["reassessed"] += len(closed_flags)
+                result["closed"] += sum(closed_flags)
+                if len(closed_flags) < self.batch_size:
+                    break
+                time.sleep(self.pause)
+
+            cur.execute(RECORD_RUN_SQL, (as_of, cutoff, result["new_fines"],
+                                         result["reassessed"], result["closed"]))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cur.close()
+            conn.close()
+        print(f"Fines as of {as_of}: {result['new_fines']} new, "
+              f"{result['reassessed']} reassessed, {result['closed']} closed.")
+        return result
+
+    def member_fines(self, member_id):
+        """Unpaid fines of one member: [(loan_id, book_id, due_date, days_overdue, amount, closed), ...]"""
+        conn = self.connect()
+        cur = conn.cursor()
+        try:
+            cur.execute(MEMBER_FINES_SQL, (member_id,))
+            return cur.fetchall()
+        finally:
+            cur.close()
+            conn.close()
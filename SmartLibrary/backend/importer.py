@@ -0,0 +1,174 @@
+import csv
+import io
+import json
+import time
+from backend.db import get_pool
+from backend.cache import invalidate
+
+IMPORT_LOCK_KEY = 1002  # advisory lock: one catalog import at a time
+
+# Column widths from migrations/0000_base_schema.sql
+MAX_LENGTHS = {"title": 200, "category": 100, "isbn": 20, "author": 100}
+
+# Rows of one chunk land here via COPY; ON COMMIT DELETE ROWS empties it after
+# every chunk while the table itself lives for the pooled session.
+STAGE_SQL = """
+    CREATE TEMP TABLE IF NOT EXISTS import_stage (
+        line_no  BIGINT,
+        title    TEXT,
+        category TEXT,
+        isbn     TEXT,
+        copies   INT,
+        authors  TEXT
+    ) ON COMMIT DELETE ROWS;
+"""
+
+COPY_SQL = "COPY import_stage (line_no, title, category, isbn, copies, authors) FROM STDIN WITH (FORMAT csv)"
+
+# Authors listed as "A; B" that don't exist yet are created in one INSERT.
+AUTHORS_SQL = """
+    INSERT INTO author (full_name)
+    SELECT DISTINCT trim(n.name)
+    FROM import_stage s, unnest(string_to_array(s.authors, ';')) AS n(name)
+    WHERE trim(n.name) <> ''
+      AND NOT EXISTS (SELECT 1 FROM author a WHERE a.full_name = trim(n.name));
+"""
+
+# One row per ISBN (first occurrence wins; rows without ISBN are kept as-is).
+# Book ids are drawn up front so the author links can be joined back by id,
+# and ISBNs already in the catalog are skipped by ON CONFLICT.
+MERGE_SQL = """
+    WITH picked AS (
+        SELECT DISTINCT ON (coalesce(s.isbn, 'line:' || s.line_no))
+               s.*, nextval(pg_get_serial_sequence('book', 'book_id')) AS new_id
+        FROM import_stage s
+        ORDER BY coalesce(s.isbn, 'line:' || s.line_no), s.line_no
+    ), new_books AS (
+        INSERT INTO book (book_id, title, category, isbn, copies_available)
+        SELECT new_id, title, category, isbn, copies FROM picked
+        ON CONFLICT (isbn) DO NOTHING
+        RETURNING book_id
+    ), links AS (
+        INSERT INTO bookauthors (book_id, author_id)
+        SELECT DISTINCT p.new_id,
+               (SELECT min(a.author_id) FROM author a WHERE a.full_name = trim(n.name))
+        FROM picked p
+        JOIN new_books nb ON nb.book_id = p.new_id
+        CROSS JOIN LATERAL unnest(string_to_array(p.authors, ';')) AS n(name)
+        WHERE trim(n.name) <> ''
+        RETURNING 1
+    )
+    SELECT (SELECT COUNT(*) FROM import_stage),
+           (SELECT COUNT(*) FROM new_books),
+           (SELECT COUNT(*) FROM links);
+"""
+
+
+def read_records(path, fmt=None):
+    """Yield dicts from a CSV (with header) or JSON Lines file, one at a time"""
+    fmt = fmt or ("jsonl" if path.endswith((".jsonl", ".ndjson", ".json")) else "csv")
+    with open(path, newline="", encoding="utf-8") as f:
+        if fmt == "csv":
+            yield from csv.DictReader(f)
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def normalize(record):
+    """
+    Map an input record onto the staging columns, or None if it can't be a book.
+    Values longer than their book/author column are rejected here, one row at a
+    time, so a single bad row can't fail the whole chunk's MERGE.
+    """
+    title = (record.get("title") or "").strip()
+    if not title or len(title) > MAX_LENGTHS["title"]:
+        return None
+    isbn = str(record.get("isbn") or "").replace("-", "").strip() or None
+    if isbn and len(isbn) > MAX_LENGTHS["isbn"]:
+        return None
+    category = (record.get("category") or "").strip() or None
+    if category and len(category) > MAX_LENGTHS["category"]:
+        return None
+    copies = record.get("copies_available", record.get("copies", 1))
+    try:
+        copies = max(int(copies), 0)
+    except (TypeError, ValueError):
+        copies = 1
+    authors = record.get("authors", record.get("author", ""))
+    if isinstance(authors, list):
+        authors = "; ".join(authors)
+    authors = authors or ""
+    if any(len(name.strip()) > MAX_LENGTHS["author"] for name in authors.split(";")):
+        return None
+    return title, category, isbn, copies, authors
+
+
+class CatalogImporter:
+    def __init__(self, db_config, chunk_size=5000, progress=None):
+        """progress(stats) is called after every committed chunk"""
+        self.db_config = db_config
+        self.chunk_size = chunk_size
+        self.progress = progress
+
+    def connect(self):
+        return get_pool(self.db_config).getconn()
+
+    def import_file(self, path, fmt=None):
+        return self.import_records(read_records(path, fmt))
+
+    def import_records(self, records):
+        """
+        Load records in chunks: COPY into a staging table, then create missing
+        authors and merge into book/bookauthors with set-based statements.
+        Each chunk is its own transaction. Returns the running totals.
+        """
+        stats = {"read": 0, "rejected": 0, "books_added": 0, "duplicates": 0,
+                 "author_links": 0, "chunks": 0, "seconds": 0.0}
+        started = time.monotonic()
+        conn = self.connect()
+        cur = conn.cursor()
+        try:
+            chunk = []
+            for record in records:
+                stats["read"] += 1
+                row = normalize(record)
+                if row is None:
+                    stats["rejected"] += 1
+                    continue
+                chunk.append((stats["read"],) + row)
+                if len(chunk) >= self.chunk_size:
+                    self._load_chunk(conn, cur, chunk, stats, started)
+                    chunk = []
+            if chunk:
+                self._load_chunk(conn, cur, chunk, stats, started)
+        finally:
+            cur.close()
+            conn.close()
+            invalidate("books", "authors")
+        stats["seconds"] = time.monotonic() - started
+        return stats
+
+    def _load_chunk(self, conn, cur, chunk, stats, started):
+        buf = io.StringIO()
+        csv.writer(buf).writerows(chunk)
+        buf.seek(0)
+        try:
+            cur.execute("SELECT pg_advisory_xact_lock(%s);", (IMPORT_LOCK_KEY,))
+            cur.execute(STAGE_SQL)
+            cur.copy_expert(COPY_SQL, buf)
+            cur.execute(AUTHORS_SQL)
+            cur.execute(MERGE_SQL)
+            staged, added, links = cur.fetchone()
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        stats["books_added"] += added
+        stats["duplicates"] += staged - added
+        stats["author_links"] += links
+        stats["chunks"] += 1
+        stats["seconds"] = time.monotonic() - started
+        if self.progress:
+            self.progress(dict(stats))
@@ -0,0 +1,62 @@
+from backend.db import get_pool
+from backend.queries import run_query
+
+WINDOWS = {"7d": 7, "30d": 30}   # plus "all", served straight from book_borrow_counts
+LEADERBOARD_LOCK_KEY = 1003      # one refresh per window at a time
+
+
+class Leaderboard:
+    def __init__(self, db_config, keep=100, max_age_minutes=15):
+        """
+        keep            rows precomputed per window (the largest N top() can serve)
+        max_age_minutes a window older than this is recomputed on the next read
+        """
+        self.db_config = db_config
+        self.keep = keep
+        self.max_age_minutes = max_age_minutes
+
+    def connect(self):
+        return get_pool(self.db_config).getconn()
+
+    def top(self, window="all", limit=5):
+        """[(book_id, title, borrow_count), ...] for 'all', '7d' or '30d'"""
+        conn = self.connect()
+        cur = conn.cursor()
+        try:
+            if window == "all":
+                run_query(cur, "leaderboard_all_time", {"limit": limit})
+                return cur.fetchall()
+            if window not in WINDOWS:
+                raise ValueError(f"Unknown window '{window}'")
+
+            run_query(cur, "leaderboard_fresh", {"window": window, "max_age": self.max_age_minutes})
+            fresh = cur.fetchone()
+            if fresh is None or not fresh[0]:
+                self._refresh(conn, cur, window)
+            run_query(cur, "leaderboard_window", {"window": window, "limit": limit})
+            rows = cur.fetchall()
+            conn.commit()
+            return rows
+        finally:
+            cur.close()
+            conn.close()
+
+    def refresh(self):
+        """Recompute every window and drop daily buckets no window needs any more"""
+        conn = self.connect()
+        cur = conn.cursor()
+        try:
+            for window in WINDOWS:
+                self._refresh(conn, cur, window)
+            run_query(cur, "leaderboard_prune", {"days": max(WINDOWS.values())})
+            conn.commit()
+        finally:
+            cur.close()
+            conn.close()
+
+    def _refresh(self, conn, cur, window):
+        cur.execute("SELECT pg_try_advisory_xact_lock(%s, %s);", (LEADERBOARD_LOCK_KEY, WINDOWS[window]))
+        if not cur.fetchone()[0]:
+            return  # another desk is refreshing this window right now
+        run_query(cur, "leaderboard_refresh", {"window": window, "days": WINDOWS[window], "keep": self.keep})
+        conn.commit()
@@ -1,4 +1,7 @@
-import psycopg2
+from contextlib import closing
+from backend.db import get_pool
+from backend.cache import invalidate
+from backend.queries import run_query
 
 class Librarian:
     def __init__(self, db_config, librarian_id, librarian_name):
@@ -7,121 +10,108 @@ class Librarian:
         self.librarian_name = librarian_name
 
     def connect(self):
-        return psycopg2.connect(**self.db_config)
+        return get_pool(self.db_config).getconn()
 
     # AUTHOR
     def add_author(self, full_name):
         try:
-            conn = self.connect()
-            cur = conn.cursor()
-            cur.execute("INSERT INTO author (full_name) VALUES (%s) RETURNING author_id;", (full_name,))
-            author_id = cur.fetchone()[0]
-            conn.commit()
-            cur.close()
-            conn.close()
+            with closing(self.connect()) as conn, closing(conn.cursor()) as cur:
+                run_query(cur, "add_author", (full_name,))
+                author_id = cur.fetchone()[0]
+                conn.commit()
+                invalidate("authors")
             print(f"Author '{full_name}' added with ID = {author_id}")
+            return author_id
         except Exception as e:
             print("Error adding author:", e)
 
     # BOOK
     def add_book(self, title, category, isbn, copies_available, author_id):
         try:
-            conn = self.connect()
-            cur = conn.cursor()
-            cur.execute("""
-                INSERT INTO book (title, category, isbn, copies_available, author_id)
-                VALUES (%s, %s, %s, %s, %s) RETURNING book_id;
-            """, (title, category, isbn, copies_available, author_id))
-            book_id = cur.fetchone()[0]
-            conn.commit()
-            cur.close()
-            conn.close()
+            with closing(self.connect()) as conn, closing(conn.cursor()) as cur:
+                run_query(cur, "add_book", (title, category, isbn, copies_available, author_id))
+                book_id = cur.fetchone()[0]
+                conn.commit()
+                invalidate("books")
             print(f"Book '{title}' added with ID = {book_id}")
+            return book_id
         except Exception as e:
             print("Error adding book:", e)
 
     def update_book_stock(self, book_id, new_stock):
         try:
-            conn = self.connect()
-            cur = conn.cursor()
-            cur.execute("UPDATE book SET copies_available=%s WHERE book_id=%s;", (new_stock, book_id))
-            conn.commit()
-            cur.close()
-            conn.close()
-            print("Book stock updated successfully!")
+            with closing(self.connect()) as conn, closing(conn.cursor()) as cur:
+                run_query(cur, "update_book_stock", (new_stock, book_id))
+                updated = cur.rowcount > 0
+                conn.commit()
+                invalidate("books")
+            print("Book stock updated successfully!" if updated else "Book not found.")
+            return updated
         except Exception as e:
             print("Error updating book stock:", e)
+            return False
 
     def delete_book(self, book_id):
         try:
-            conn = self.connect()
-            cur = conn.cursor()
-            cur.execute("DELETE FROM book WHERE book_id=%s;", (book_id,))
-            conn.commit()
-            cur.close()
-            conn.close()
-            print("Book deleted successfully.")
+            with closing(self.connect()) as conn, closing(conn.cursor()) as cur:
+                run_query(cur, "delete_book", (book_id,))
+                deleted = cur.rowcount > 0
+                conn.commit()
+                invalidate("books")
+            print("Book deleted successfully." if deleted else "Book not found.")
+            return deleted
         except Exception as e:
             print("Error deleting book:", e)
+            return False
 
     # MEMBERS
     def view_all_members(self):
         try:
-            conn = self.connect()
-            cur = conn.cursor()
-            cur.execute('SELECT user_id, full_name, username, email FROM "user" WHERE role_id=2;')
-            rows = cur.fetchall()
-            cur.close()
-            conn.close()
+            with closing(self.connect()) as conn, closing(conn.cursor()) as cur:
+                run_query(cur, "all_members")
+                rows = cur.fetchall()
 
             print("\n--- Members ---")
             for row in rows:
                 print(f"ID: {row[0]}, Name: {row[1]}, Username: {row[2]}, Email: {row[3]}")
+            return rows
         except Exception as e:
             print("Error loading members:", e)
 
     # BOOK CLUB
     def create_book_club(self, club_name, moderator_id):
         try:
-            conn = self.connect()
-            cur = conn.cursor()
-            cur.execute("INSERT INTO bookclub (club_name, moderator_id) VALUES (%s, %s) RETURNING club_id;", (club_name, moderator_id))
-            club_id = cur.fetchone()[0]
-            conn.commit()
-            cur.close()
-            conn.close()
+            with closing(self.connect()) as conn, closing(conn.cursor()) as cur:
+                run_query(cur, "create_book_club", (club_name, moderator_id))
+                club_id = cur.fetchone()[0]
+                conn.commit()
+                invalidate("bookclubs")
             print(f"Book Club '{club_name}' created with ID = {club_id}")
+            return club_id
         except Exception as e:
             print("Error creating book club:", e)
 
     def add_member_to_club(self, club_id, member_id):
         try:
-            conn = self.connect()
-            cur = conn.cursor()
-            cur.execute("INSERT INTO bookclubmembers (club_id, member_id) VALUES (%s, %s);", (club_id, member_id))
-            conn.commit()
-            cur.close()
-            conn.close()
+            with closing(self.connect()) as conn, closing(conn.cursor()) as cur:
+                run_query(cur, "add_club_member", (club_id, member_id))
+                conn.commit()
+                invalidate("bookclub_members")
             print(f"Member {member_id} added to club {club_id}")
+            return True
         except Exception as e:
             print("Error adding member to club:", e)
+            return False
 
     def view_club_members(self, club_id):
         try:
-            conn = self.connect()
-            cur = conn.cursor()
-            cur.execute("""
-                SELECT u.user_id, u.full_name
-                FROM bookclubmembers bcm
-                JOIN "user" u ON bcm.member_id = u.user_id
-                WHERE bcm.club_id = %s;
-            """, (club_id,))
-            members = cur.fetchall()
-            cur.close()
-            conn.close()
+            with closing(self.connect()) as conn, closing(conn.cursor()) as cur:
+                run_query(cur, "club_members", (club_id,))
+                members = cur.fetchall()
 
             print(f"\n--- Members in Club {club_id} ---")
             for m in members:
                 print(f"ID: {m[0]}, Name: {m[1]}")
+            return members
         except Exception as e:
             print("Error viewing club members:", e)
\ No newline at end of file
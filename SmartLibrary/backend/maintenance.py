@@ -0,0 +1,114 @@
+import time
+from datetime import date
+from backend.db import get_pool
+from backend.queries import ALLOCATE_COPIES_SQL
+
+# One batch: lock up to batch_size old returned loans (skipping any a desk is
+# touching right now), delete them from loan and insert them into loan_archive.
+# A loan_id already in the archive (left by an earlier copy of the data, say)
+# is overwritten with the row being moved, so nothing is deleted without being
+# archived and the row count is the number of loans moved.
+ARCHIVE_BATCH_SQL = """
+    WITH moved AS (
+        DELETE FROM loan
+        WHERE loan_id IN (
+            SELECT loan_id FROM loan
+            WHERE returned = TRUE AND borrow_date < %(cutoff)s
+            ORDER BY borrow_date
+            LIMIT %(batch_size)s
+            FOR UPDATE SKIP LOCKED
+        )
+        RETURNING loan_id, book_id, member_id, borrow_date, due_date, returned, renewals
+    )
+    INSERT INTO loan_archive (loan_id, book_id, member_id, borrow_date, due_date, returned, renewals)
+    SELECT loan_id, book_id, member_id, borrow_date, due_date, returned, renewals FROM moved
+    ON CONFLICT (loan_id) DO UPDATE SET
+        book_id = EXCLUDED.book_id, member_id = EXCLUDED.member_id,
+        borrow_date = EXCLUDED.borrow_date, due_date = EXCLUDED.due_date,
+        returned = EXCLUDED.returned, renewals = EXCLUDED.renewals,
+        archived_at = now();
+"""
+
+# Copies set aside for a hold but not collected within the pickup window go to
+# the next member in the queue, or back on the shelf.
+EXPIRE_HOLDS_SQL = """
+    WITH expired AS (
+        UPDATE book_hold SET status='expired'
+        WHERE status='ready' AND ready_at < now() - make_interval(days => %(days)s)
+        RETURNING book_id
+    ), counts AS (
+        SELECT book_id, COUNT(*) AS cnt FROM expired GROUP BY book_id
+    ),""" + ALLOCATE_COPIES_SQL + """
+    SELECT (SELECT COUNT(*) FROM expired), (SELECT COUNT(*) FROM allocated);
+"""
+
+
+def months_ago(months, today=None):
+    today = today or date.today()
+    year, month = divmod(today.year * 12 + today.month - 1 - months, 12)
+    return date(year, month + 1, 1)
+
+
+class LoanArchiver:
+    def __init__(self, db_config, batch_size=1000, lock_timeout_ms=2000, pause=0.05):
+        """
+        batch_size      loans moved per transaction (keeps each lock short)
+        lock_timeout_ms give up on a batch rather than queue behind a long lock
+        pause           seconds between batches so desk traffic gets through
+        """
+        self.db_config = db_config
+        self.batch_size = batch_size
+        self.lock_timeout_ms = lock_timeout_ms
+        self.pause = pause
+
+    def connect(self):
+        return get_pool(self.db_config).getconn()
+
+    def archive_returned_loans(self, older_than_months=12, max_batches=None):
+        """
+        Move returned loans borrowed before the first day of the month
+        `older_than_months` ago into loan_archive. Returns the number moved.
+        """
+        cutoff = months_ago(older_than_months)
+        moved, batches = 0, 0
+        conn = self.connect()
+        cur = conn.cursor()
+        try:
+            while max_batches is None or batches < max_batches:
+                try:
+                    cur.execute("SET LOCAL lock_timeout = %s;", (f"{self.lock_timeout_ms}ms",))
+                    cur.execute(ARCHIVE_BATCH_SQL, {"cutoff": cutoff, "batch_size": self.batch_size})
+                    count = cur.rowcount
+                    conn.commit()
+                except Exception as e:
+                    conn.rollback()
+                    print("Archive batch skipped:", e)
+                    break
+                moved += count
+                batches += 1
+                if count < self.batch_size:
+                    break
+                time.sleep(self.pause)
+        finally:
+            cur.close()
+            conn.close()
+        print(f"Archived {moved} loans borrowed before {cutoff} in {batches} batches.")
+        return moved
+
+
+def expire_holds(db_config, pickup_days=3):
+    """Expire holds whose copy waited more than pickup_days; returns (expired, passed on)"""
+    conn = get_pool(db_config).getconn()
+    cur = conn.cursor()
+    try:
+        cur.execute(EXPIRE_HOLDS_SQL, {"days": pickup_days})
+        expired, passed_on = cur.fetchone()
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+        conn.close()
+    print(f"Expired {expired} uncollected holds, {passed_on} copies passed to the next in line.")
+    return expired, passed_on
@@ -1,98 +1,289 @@
-import psycopg2
-from datetime import datetime, timedelta
+from contextlib import closing
+from backend.db import get_pool
+from backend.cache import invalidate
+from backend.queries import run_query
+from backend.policy import CirculationPolicy
+from datetime import date
+
+MEMBER_ROLE = 2
+LOAN_LOCK_NS = 1001  # advisory lock namespace for per-member loan changes
+
+
+def renew_status(due_date, active, overdue, held):
+    """Why a renew_loans/renew_all row came out the way it did"""
+    if due_date is not None:
+        return "renewed"
+    if not active:
+        return "not_found"
+    if overdue:
+        return "overdue"
+    if held:
+        return "hold_pending"
+    return "limit_reached"
+
 
 class Member:
-    def __init__(self, db_config, member_id, full_name):
+    def __init__(self, db_config, member_id, full_name, role_id=MEMBER_ROLE):
+        """Loan limits and periods come from the circulation policy for role_id"""
         self.db_config = db_config
         self.member_id = member_id
         self.full_name = full_name
+        self.role_id = role_id
+        self.policy = CirculationPolicy(db_config)
 
     def connect(self):
-        return psycopg2.connect(**self.db_config)
+        return get_pool(self.db_config).getconn()
 
     def borrow_book(self, book_id):
+        """
+        Borrow a book in one round trip. Returns a dict with
+        status ('borrowed', 'limit_reached', 'unavailable', 'not_found' or 'error'),
+        loan_id, due_date, active_loans and max_loans.
+        """
+        result = {"status": "error", "loan_id": None, "due_date": None, "active_loans": None,
+                  "max_loans": None}
         try:
-            conn = self.connect()
-            cur = conn.cursor()
-
-            # Check active loans
-            cur.execute("SELECT COUNT(*) FROM loan WHERE member_id=%s AND returned=FALSE;", (self.member_id,))
-            active_loans = cur.fetchone()[0]
-            if active_loans >= 3:
-                print("Cannot borrow more than 3 books at a time.")
-                cur.close()
-                conn.close()
-                return
-
-            # Check stock
-            cur.execute("SELECT copies_available FROM book WHERE book_id=%s;", (book_id,))
-            stock = cur.fetchone()
-            if stock is None or stock[0] <= 0:
-                print("Book not available.")
-                cur.close()
-                conn.close()
-                return
-
-            # Borrow book
-            borrow_date = datetime.now()
-            due_date = borrow_date + timedelta(days=7)
-            cur.execute("""
-                INSERT INTO loan (book_id, member_id, borrow_date, due_date, returned)
-                VALUES (%s, %s, %s, %s, FALSE);
-            """, (book_id, self.member_id, borrow_date, due_date))
-
-            # Update book stock
-            cur.execute("UPDATE book SET copies_available = copies_available - 1 WHERE book_id=%s;", (book_id,))
-            conn.commit()
-            cur.close()
-            conn.close()
-            print("Book borrowed successfully! Due date:", due_date.strftime("%Y-%m-%d"))
+            params = self.policy.borrow_params(self.role_id)
+            max_loans = result["max_loans"] = params["max_loans"]
+            with closing(self.connect()) as conn, closing(conn.cursor()) as cur:
+                run_query(cur, "borrow", dict(
+                    params,
+                    member_id=self.member_id,
+                    book_id=book_id,
+                    borrow_date=date.today(),
+                    lock_ns=LOAN_LOCK_NS,
+                ))
+                loan_id, active_loans, stock, due_date = cur.fetchone()
+                conn.commit()
+                invalidate("books")  # copies_available changed
+
+            result["active_loans"] = active_loans
+            if loan_id is not None:
+                result.update(status="borrowed", loan_id=loan_id, due_date=due_date)
+                print("Book borrowed successfully! Due date:", due_date.strftime("%Y-%m-%d"))
+            elif active_loans >= max_loans:
+                result["status"] = "limit_reached"
+                print(f"Cannot borrow more than {max_loans} books at a time.")
+            elif stock is None:
+                result["status"] = "not_found"
+                print("Book not found.")
+            else:
+                result["status"] = "unavailable"
+                print("Book not available. Place a hold to get the next returned copy.")
 
         except Exception as e:
             print("Error borrowing book:", e)
+        return result
 
     def return_book(self, loan_id):
         try:
-            conn = self.connect()
-            cur = conn.cursor()
+            with closing(self.connect()) as conn, closing(conn.cursor()) as cur:
+                run_query(cur, "return_many", {"loan_ids": [loan_id]})
+                book_id = cur.fetchone()[1]
+                conn.commit()
+                invalidate("books")  # copies_available changed
 
-            cur.execute("SELECT book_id FROM loan WHERE loan_id=%s AND returned=FALSE;", (loan_id,))
-            loan = cur.fetchone()
-            if loan is None:
+            if book_id is None:
                 print("Loan not found or already returned.")
-                cur.close()
-                conn.close()
-                return
-
-            book_id = loan[0]
-
-            cur.execute("UPDATE loan SET returned=TRUE WHERE loan_id=%s;", (loan_id,))
-            cur.execute("UPDATE book SET copies_available = copies_available + 1 WHERE book_id=%s;", (book_id,))
-            conn.commit()
-            cur.close()
-            conn.close()
+                return False
             print("Book returned successfully!")
+            return True
 
         except Exception as e:
             print("Error returning book:", e)
+            return False
+
+    def borrow_books(self, book_ids):
+        """
+        Borrow a stack of books in one transaction. Returns one dict per requested
+        book_id, in order, with book_id, status, loan_id and due_date.
+        Repeated ids are reported as 'duplicate'.
+        """
+        unique_ids, seen = [], set()
+        for book_id in book_ids:
+            if book_id not in seen:
+                seen.add(book_id)
+                unique_ids.append(book_id)
+
+        outcomes = {}
+        try:
+            with closing(self.connect()) as conn, closing(conn.cursor()) as cur:
+                run_query(cur, "borrow_many", dict(
+                    self.policy.borrow_params(self.role_id),
+                    member_id=self.member_id,
+                    book_ids=unique_ids,
+                    borrow_date=date.today(),
+                    lock_ns=LOAN_LOCK_NS,
+                ))
+                rows = cur.fetchall()
+                conn.commit()
+                invalidate("books")  # copies_available changed
+
+            for book_id, loan_id, stock, candidate, due_date in rows:
+                if loan_id is not None:
+                    status = "borrowed"
+                elif stock is None:
+                    status = "not_found"
+                elif stock > 0 and not candidate:
+                    status = "limit_reached"
+                else:
+                    status = "unavailable"
+                outcomes[book_id] = {"book_id": book_id, "status": status, "loan_id": loan_id,
+                                     "due_date": due_date}
+        except Exception as e:
+            print("Error borrowing books:", e)
+
+        results, reported = [], set()
+        for book_id in book_ids:
+            if book_id in reported:
+                results.append({"book_id": book_id, "status": "duplicate", "loan_id": None, "due_date": None})
+                continue
+            reported.add(book_id)
+            results.append(outcomes.get(book_id, {"book_id": book_id, "status": "error",
+                                                  "loan_id": None, "due_date": None}))
+
+        borrowed = sum(1 for r in results if r["status"] == "borrowed")
+        print(f"Borrowed {borrowed} of {len(book_ids)} books.")
+        return results
+
+    def return_books(self, loan_ids):
+        """
+        Return a stack of loans in one transaction. Returns one dict per loan_id
+        with loan_id, book_id and status ('returned', 'not_found' or 'error').
+        """
+        outcomes = {}
+        try:
+            with closing(self.connect()) as conn, closing(conn.cursor()) as cur:
+                run_query(cur, "return_many", {"loan_ids": list(loan_ids)})
+                for loan_id, book_id in cur.fetchall():
+                    outcomes[loan_id] = {"loan_id": loan_id, "book_id": book_id,
+                                         "status": "returned" if book_id is not None else "not_found"}
+                conn.commit()
+                invalidate("books")  # copies_available changed
+        except Exception as e:
+            print("Error returning books:", e)
+
+        results = [outcomes.get(loan_id, {"loan_id": loan_id, "book_id": None, "status": "error"})
+                   for loan_id in loan_ids]
+        returned = sum(1 for r in results if r["status"] == "returned")
+        print(f"Returned {returned} of {len(loan_ids)} books.")
+        return results
+
+    def renew_loan(self, loan_id):
+        """
+        Extend one loan by its loan period. Returns a dict with loan_id, due_date
+        and status ('renewed', 'hold_pending', 'limit_reached', 'overdue',
+        'not_found' or 'error').
+        """
+        return self.renew_loans([loan_id])[0]
+
+    def renew_loans(self, loan_ids):
+        """Renew several loans in one statement; one result dict per loan_id, in order"""
+        results = self._renew("renew_loans", {"loan_ids": list(loan_ids)})
+        if results is None:
+            results = [{"loan_id": loan_id, "status": "error", "due_date": None} for loan_id in loan_ids]
+        return results
+
+    def renew_all(self):
+        """Renew every active loan that can be renewed; one result dict per active loan"""
+        return self._renew("renew_all", {}) or []
+
+    def _renew(self, name, params):
+        try:
+            with closing(self.connect()) as conn, closing(conn.cursor()) as cur:
+                run_query(cur, name, dict(
+                    self.policy.borrow_params(self.role_id),
+                    member_id=self.member_id,
+                    today=date.today(),
+                    **params,
+                ))
+                rows = cur.fetchall()
+                conn.commit()
+        except Exception as e:
+            print("Error renewing loans:", e)
+            return None
+
+        results = [{"loan_id": loan_id, "status": renew_status(due_date, active, overdue, held),
+                    "due_date": due_date}
+                   for loan_id, due_date, active, overdue, held in rows]
+        renewed = sum(1 for r in results if r["status"] == "renewed")
+        print(f"Renewed {renewed} of {len(results)} loans.")
+        return results
 
     def view_active_loans(self):
         try:
-            conn = self.connect()
-            cur = conn.cursor()
-            cur.execute("""
-                SELECT l.loan_id, b.title, l.borrow_date, l.due_date
-                FROM loan l
-                JOIN book b ON l.book_id = b.book_id
-                WHERE l.member_id=%s AND l.returned=FALSE;
-            """, (self.member_id,))
-            loans = cur.fetchall()
-            cur.close()
-            conn.close()
+            with closing(self.connect()) as conn, closing(conn.cursor()) as cur:
+                run_query(cur, "active_loans", (self.member_id,))
+                loans = cur.fetchall()
 
             print("\n--- Active Loans ---")
             for l in loans:
                 print(f"Loan ID: {l[0]}, Book: {l[1]}, Borrowed: {l[2]}, Due: {l[3]}")
+            return loans
+
+        except Exception as e:
+            print("Error fetching active loans:", e)
+
+    def place_hold(self, book_id):
+        """
+        Join the queue for a book with no copies on the shelf. The next returned
+        copy is set aside for the member at the head of the queue and taken by
+        their next borrow_book. Returns a dict with status ('queued',
+        'already_held', 'available', 'not_found' or 'error'), hold_id and position.
+        """
+        result = {"status": "error", "hold_id": None, "position": None}
+        try:
+            with closing(self.connect()) as conn, closing(conn.cursor()) as cur:
+                run_query(cur, "place_hold", {"book_id": book_id, "member_id": self.member_id})
+                hold_id, stock, waiting = cur.fetchone()
+                conn.commit()
+
+            if hold_id is not None:
+                result.update(status="queued", hold_id=hold_id, position=waiting + 1)
+                print(f"Hold placed. Position in queue: {waiting + 1}")
+            elif stock is None:
+                result["status"] = "not_found"
+                print("Book not found.")
+            elif stock > 0:
+                result["status"] = "available"
+                print("Book is available, borrow it instead.")
+            else:
+                result["status"] = "already_held"
+                print("You already hold this book.")
+
+        except Exception as e:
+            print("Error placing hold:", e)
+        return result
+
+    def cancel_hold(self, hold_id):
+        try:
+            with closing(self.connect()) as conn, closing(conn.cursor()) as cur:
+                run_query(cur, "cancel_hold", {"hold_id": hold_id, "member_id": self.member_id})
+                row = cur.fetchone()
+                conn.commit()
+                invalidate("books")  # a set-aside copy may have gone back on the shelf
+
+            if row is None:
+                print("Hold not found.")
+                return False
+            print("Hold cancelled.")
+            return True
+
+        except Exception as e:
+            print("Error cancelling hold:", e)
+            return False
+
+    def view_holds(self):
+        try:
+            with closing(self.connect()) as conn, closing(conn.cursor()) as cur:
+                run_query(cur, "member_holds", (self.member_id,))
+                holds = cur.fetchall()
+
+            print("\n--- Holds ---")
+            for h in holds:
+                where = "ready to collect" if h[3] == "ready" else f"position {h[5]}"
+                print(f"Hold ID: {h[0]}, Book: {h[2]}, {where}")
+            return holds
 
         except Exception as e:
-            print("Error fetching active loans:", e)
\ No newline at end of file
+            print("Error fetching holds:", e)
\ No newline at end of file
@@ -0,0 +1,148 @@
+import hashlib
+import json
+import os
+from datetime import date
+import backend.fines  # noqa: F401  registers new_overdue_fines
+from backend.catalog import browse_query
+from backend.db import get_pool
+from backend.queries import QUERIES, users_table
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+MIGRATION_LOCK_KEY = 1000  # advisory lock: desks starting together migrate one at a time
+
+CREATE_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        version    VARCHAR(20) PRIMARY KEY,
+        name       VARCHAR(200) NOT NULL,
+        checksum   VARCHAR(64) NOT NULL,
+        applied_at TIMESTAMP NOT NULL DEFAULT now()
+    );
+"""
+
+# The statements the app runs constantly, by their registered name, with
+# sample parameters and the indexes the plan must use. An entry that is a
+# tuple accepts any of its names (unique constraints are named differently
+# by different schema scripts). check_hot_queries() EXPLAINs the registered
+# text and tests/test_hot_queries.py fails when a plan misses an index.
+TITLE_ORDER = (("title", "asc"),)
+BORROW_SAMPLE = {"member_id": 1, "book_id": 1, "max_loans": 3, "borrow_date": date(2024, 1, 15),
+                 "categories": [], "category_days": [], "loan_days": 14}
+USERNAME_INDEXES = ("User_username_key", "user_username_key", "user_username_idx")
+
+HOT_QUERIES = {
+    "login_lookup": (("member1",), [USERNAME_INDEXES]),
+    "borrow_one": (BORROW_SAMPLE, ["member_loan_counts_pkey", "book_pkey"]),
+    "borrow_batch": (dict(BORROW_SAMPLE, book_ids=[1, 2]), ["member_loan_counts_pkey", "book_pkey"]),
+    "return_many": ({"loan_ids": [1, 2]}, ["loan_pkey"]),
+    "member_loans": ((1,), ["loan_member_active_idx"]),
+    "renew_all": (dict(BORROW_SAMPLE, today=date(2024, 1, 15), category_renewals=[], max_renewals=2),
+                  ["loan_member_active_idx"]),
+    "catalog_page": ((0, 50), ["book_pkey"]),
+    "catalog_search": ({"tsquery": "zq:*", "term": "zq", "isbn_prefix": "978045%", "limit": 50, "offset": 0},
+                       ["book_search_vector_idx", "book_title_trgm_idx", "author_name_tsv_idx",
+                        "book_isbn_prefix_idx"]),
+    browse_query([], TITLE_ORDER, False, after=True): (
+        {"after_0": "M", "after_1": 0, "limit": 50}, ["book_title_idx"]),
+    browse_query(["category"], TITLE_ORDER, False): (
+        {"category": "Fiction", "limit": 50}, ["book_category_title_idx"]),
+    browse_query(["available"], TITLE_ORDER, False): (
+        {"limit": 50}, ["book_in_stock_title_idx"]),
+    browse_query(["author_id"], TITLE_ORDER, False): (
+        {"author_id": 1, "limit": 50}, ["bookauthors_author_idx"]),
+    "leaderboard_all_time": ({"limit": 5}, ["book_borrow_counts_rank_idx"]),
+    "new_overdue_fines": ({"cutoff": date(2024, 1, 13), "since": date(2024, 1, 12)}, ["loan_active_due_date_idx"]),
+}
+
+
+def available_migrations():
+    """(version, name, sql) for every NNNN_name.sql file, in version order"""
+    found = []
+    for filename in sorted(os.listdir(MIGRATIONS_DIR)):
+        if not filename.endswith(".sql"):
+            continue
+        version, _, name = filename[:-4].partition("_")
+        with open(os.path.join(MIGRATIONS_DIR, filename), encoding="utf-8") as f:
+            found.append((version, name, f.read()))
+    return found
+
+
+def migrate(db_config, verbose=True):
+    """
+    Apply every migration not yet recorded in schema_migrations, each in its
+    own transaction. Safe to call on every startup. Returns the versions applied.
+    """
+    conn = get_pool(db_config).getconn()
+    cur = conn.cursor()
+    applied_now = []
+    try:
+        cur.execute("SELECT pg_advisory_lock(%s);", (MIGRATION_LOCK_KEY,))
+        cur.execute(CREATE_TABLE_SQL)
+        conn.commit()
+
+        cur.execute("SELECT version, checksum FROM schema_migrations;")
+        applied = dict(cur.fetchall())
+        conn.commit()
+
+        for version, name, sql in available_migrations():
+            checksum = hashlib.sha256(sql.encode("utf-8")).hexdigest()
+            if version in applied:
+                if applied[version] != checksum and verbose:
+                    print(f"Warning: migration {version}_{name} changed after it was applied")
+                continue
+            try:
+                cur.execute(sql)
+                cur.execute(
+                    "INSERT INTO schema_migrations (version, name, checksum) VALUES (%s, %s, %s);",
+                    (version, name, checksum))
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            applied_now.append(version)
+            if verbose:
+                print(f"Applied migration {version}_{name}")
+    finally:
+        conn.rollback()
+        cur.execute("SELECT pg_advisory_unlock(%s);", (MIGRATION_LOCK_KEY,))
+        conn.commit()
+        cur.close()
+        conn.close()
+    return applied_now
+
+
+def _index_names(plan):
+    """Every index an EXPLAIN (FORMAT JSON) plan node or its children read"""
+    if "Index Name" in plan:
+        yield plan["Index Name"]
+    for child in plan.get("Plans", []):
+        yield from _index_names(child)
+
+
+def check_hot_queries(db_config):
+    """
+    EXPLAIN each hot query's registered SQL with its sample parameters, under
+    the normal planner settings, and report {name: (missing, used)}: the
+    expected indexes the plan does not use and the indexes it does use. The
+    plans depend on the table statistics, so run it on a database of
+    realistic size (tests/test_hot_queries.py fills its scratch database).
+    """
+    conn = get_pool(db_config).getconn()
+    cur = conn.cursor()
+    results = {}
+    try:
+        users = users_table(cur)
+        for name, (params, expected) in HOT_QUERIES.items():
+            sql = QUERIES[name].sql.replace("{users}", users)
+            cur.execute("EXPLAIN (FORMAT JSON) " + sql, params)
+            plan = cur.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            used = sorted(set(_index_names(plan[0]["Plan"])))
+            missing = [index for index in expected
+                       if not set((index,) if isinstance(index, str) else index) & set(used)]
+            results[name] = (missing, used)
+    finally:
+        conn.rollback()
+        cur.close()
+        conn.close()
+    return results
@@ -0,0 +1,77 @@
+-- =====================
+-- Base schema (same tables as GUI/database.sql, safe to run on an existing database)
+-- =====================
+CREATE TABLE IF NOT EXISTS Role (
+    role_id SERIAL PRIMARY KEY,
+    role_name VARCHAR(50) UNIQUE NOT NULL
+);
+
+INSERT INTO Role (role_name) VALUES ('Librarian'), ('Member')
+ON CONFLICT (role_name) DO NOTHING;
+
+-- Deployments that already have a plain user table keep it
+DO $$
+BEGIN
+    IF to_regclass('public."user"') IS NULL THEN
+        CREATE TABLE IF NOT EXISTS "User" (
+            user_id SERIAL PRIMARY KEY,
+            username VARCHAR(50) UNIQUE NOT NULL,
+            password VARCHAR(255) NOT NULL,
+            role_id INT NOT NULL REFERENCES Role(role_id),
+            full_name VARCHAR(100) NOT NULL,
+            email VARCHAR(100) UNIQUE
+        );
+    END IF;
+END $$;
+
+CREATE TABLE IF NOT EXISTS Book (
+    book_id SERIAL PRIMARY KEY,
+    title VARCHAR(200) NOT NULL,
+    category VARCHAR(100),
+    isbn VARCHAR(20) UNIQUE,
+    copies_available INT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS Author (
+    author_id SERIAL PRIMARY KEY,
+    full_name VARCHAR(100) NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS BookAuthors (
+    book_id INT REFERENCES Book(book_id) ON DELETE CASCADE,
+    author_id INT REFERENCES Author(author_id) ON DELETE CASCADE,
+    PRIMARY KEY (book_id, author_id)
+);
+
+DO $$
+DECLARE
+    users regclass := coalesce(to_regclass('public."user"'), to_regclass('public."User"'));
+BEGIN
+    EXECUTE format('CREATE TABLE IF NOT EXISTS Member (
+        member_id SERIAL PRIMARY KEY,
+        user_id INT REFERENCES %s(user_id) ON DELETE CASCADE,
+        membership_date DATE DEFAULT CURRENT_DATE,
+        active BOOLEAN DEFAULT TRUE
+    )', users);
+END $$;
+
+CREATE TABLE IF NOT EXISTS Loan (
+    loan_id SERIAL PRIMARY KEY,
+    book_id INT REFERENCES Book(book_id),
+    member_id INT REFERENCES Member(member_id),
+    borrow_date DATE DEFAULT CURRENT_DATE,
+    due_date DATE NOT NULL,
+    returned BOOLEAN DEFAULT FALSE
+);
+
+CREATE TABLE IF NOT EXISTS BookClub (
+    club_id SERIAL PRIMARY KEY,
+    club_name VARCHAR(100) NOT NULL,
+    moderator_id INT REFERENCES Member(member_id)
+);
+
+CREATE TABLE IF NOT EXISTS BookClubMembers (
+    club_id INT REFERENCES BookClub(club_id) ON DELETE CASCADE,
+    member_id INT REFERENCES Member(member_id) ON DELETE CASCADE,
+    PRIMARY KEY (club_id, member_id)
+);
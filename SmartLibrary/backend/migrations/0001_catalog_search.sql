@@ -0,0 +1,24 @@
+-- =====================
+-- Catalog search indexes
+-- =====================
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- Word search over title + category (prefix queries use title:* style tsqueries)
+ALTER TABLE book ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        to_tsvector('simple', coalesce(title, '') || ' ' || coalesce(category, ''))
+    ) STORED;
+
+CREATE INDEX IF NOT EXISTS book_search_vector_idx ON book USING GIN (search_vector);
+
+-- Fuzzy / substring matching on title and category
+CREATE INDEX IF NOT EXISTS book_title_trgm_idx ON book USING GIN (title gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS book_category_trgm_idx ON book USING GIN (category gin_trgm_ops);
+
+-- Author names, reached through bookauthors
+CREATE INDEX IF NOT EXISTS author_name_tsv_idx ON author USING GIN (to_tsvector('simple', full_name));
+CREATE INDEX IF NOT EXISTS author_name_trgm_idx ON author USING GIN (full_name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS bookauthors_author_idx ON bookauthors (author_id);
+
+-- ISBN prefix lookups (isbn LIKE '978045%')
+CREATE INDEX IF NOT EXISTS book_isbn_prefix_idx ON book (isbn text_pattern_ops);
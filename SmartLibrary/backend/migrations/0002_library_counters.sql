@@ -0,0 +1,111 @@
+-- =====================
+-- Dashboard counters, kept current by statement-level triggers
+-- =====================
+CREATE TABLE IF NOT EXISTS library_counters (
+    name  VARCHAR(50) PRIMARY KEY,
+    value BIGINT NOT NULL
+);
+
+-- ---------- books ----------
+CREATE OR REPLACE FUNCTION library_counters_books() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        UPDATE library_counters SET value = value + (SELECT COUNT(*) FROM new_rows) WHERE name = 'books';
+    ELSE
+        UPDATE library_counters SET value = value - (SELECT COUNT(*) FROM old_rows) WHERE name = 'books';
+    END IF;
+    RETURN NULL;
+END $$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS book_counters_ins ON book;
+CREATE TRIGGER book_counters_ins AFTER INSERT ON book
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION library_counters_books();
+
+DROP TRIGGER IF EXISTS book_counters_del ON book;
+CREATE TRIGGER book_counters_del AFTER DELETE ON book
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION library_counters_books();
+
+-- ---------- active loans ----------
+CREATE OR REPLACE FUNCTION library_counters_loans() RETURNS trigger AS $$
+DECLARE
+    delta BIGINT := 0;
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        delta := delta + (SELECT COUNT(*) FROM new_rows WHERE returned = FALSE);
+    END IF;
+    IF TG_OP IN ('DELETE', 'UPDATE') THEN
+        delta := delta - (SELECT COUNT(*) FROM old_rows WHERE returned = FALSE);
+    END IF;
+    IF delta <> 0 THEN
+        UPDATE library_counters SET value = value + delta WHERE name = 'active_loans';
+    END IF;
+    RETURN NULL;
+END $$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS loan_counters_ins ON loan;
+CREATE TRIGGER loan_counters_ins AFTER INSERT ON loan
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION library_counters_loans();
+
+DROP TRIGGER IF EXISTS loan_counters_upd ON loan;
+CREATE TRIGGER loan_counters_upd AFTER UPDATE ON loan
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION library_counters_loans();
+
+DROP TRIGGER IF EXISTS loan_counters_del ON loan;
+CREATE TRIGGER loan_counters_del AFTER DELETE ON loan
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION library_counters_loans();
+
+-- ---------- members (role_id = 2) ----------
+CREATE OR REPLACE FUNCTION library_counters_members() RETURNS trigger AS $$
+DECLARE
+    delta BIGINT := 0;
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        delta := delta + (SELECT COUNT(*) FROM new_rows WHERE role_id = 2);
+    END IF;
+    IF TG_OP IN ('DELETE', 'UPDATE') THEN
+        delta := delta - (SELECT COUNT(*) FROM old_rows WHERE role_id = 2);
+    END IF;
+    IF delta <> 0 THEN
+        UPDATE library_counters SET value = value + delta WHERE name = 'members';
+    END IF;
+    RETURN NULL;
+END $$ LANGUAGE plpgsql;
+
+-- The users table is "User" in database.sql but plain user in some deployments
+DO $$
+DECLARE
+    users regclass := coalesce(to_regclass('public."user"'), to_regclass('public."User"'));
+BEGIN
+    IF users IS NULL THEN
+        RETURN;
+    END IF;
+    EXECUTE format('DROP TRIGGER IF EXISTS user_counters_ins ON %s', users);
+    EXECUTE format('CREATE TRIGGER user_counters_ins AFTER INSERT ON %s
+        REFERENCING NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION library_counters_members()', users);
+    EXECUTE format('DROP TRIGGER IF EXISTS user_counters_upd ON %s', users);
+    EXECUTE format('CREATE TRIGGER user_counters_upd AFTER UPDATE ON %s
+        REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION library_counters_members()', users);
+    EXECUTE format('DROP TRIGGER IF EXISTS user_counters_del ON %s', users);
+    EXECUTE format('CREATE TRIGGER user_counters_del AFTER DELETE ON %s
+        REFERENCING OLD TABLE AS old_rows
+        FOR EACH STATEMENT EXECUTE FUNCTION library_counters_members()', users);
+    EXECUTE format('INSERT INTO library_counters (name, value)
+        SELECT ''members'', COUNT(*) FROM %s WHERE role_id = 2
+        ON CONFLICT (name) DO UPDATE SET value = EXCLUDED.value', users);
+END $$;
+
+-- ---------- seed from the current data ----------
+INSERT INTO library_counters (name, value)
+SELECT 'books', COUNT(*) FROM book
+ON CONFLICT (name) DO UPDATE SET value = EXCLUDED.value;
+
+INSERT INTO library_counters (name, value)
+SELECT 'active_loans', COUNT(*) FROM loan WHERE returned = FALSE
+ON CONFLICT (name) DO UPDATE SET value = EXCLUDED.value;
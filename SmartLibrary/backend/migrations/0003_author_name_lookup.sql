@@ -0,0 +1,4 @@
+-- =====================
+-- Exact author-name lookups (bulk import resolves authors by name)
+-- =====================
+CREATE INDEX IF NOT EXISTS author_full_name_idx ON author (full_name);
@@ -0,0 +1,41 @@
+-- =====================
+-- Indexes behind the hot queries
+-- =====================
+
+-- Active loans of one member: borrow limit check, view_active_loans,
+-- get_active_loans_for_member. Partial, so returned loans never bloat it.
+CREATE INDEX IF NOT EXISTS loan_member_active_idx ON loan (member_id) WHERE returned = FALSE;
+
+-- get_most_borrowed groups loans by book
+CREATE INDEX IF NOT EXISTS loan_book_idx ON loan (book_id);
+
+-- Club member lists by member (the primary key already covers club_id first)
+CREATE INDEX IF NOT EXISTS bookclubmembers_member_idx ON bookclubmembers (member_id);
+
+-- Members by role, and a unique username for the login lookup
+DO $$
+DECLARE
+    users regclass := coalesce(to_regclass('public."user"'), to_regclass('public."User"'));
+BEGIN
+    IF users IS NULL THEN
+        RETURN;
+    END IF;
+    EXECUTE format('CREATE INDEX IF NOT EXISTS user_role_idx ON %s (role_id)', users);
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_index i JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = i.indkey[0]
+        WHERE i.indrelid = users AND i.indisunique AND i.indnatts = 1 AND a.attname = 'username'
+    ) THEN
+        EXECUTE format('CREATE UNIQUE INDEX user_username_idx ON %s (username)', users);
+    END IF;
+END $$;
+
+-- Unique ISBN (the base schema declares it; older databases may not have it)
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_index i JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = i.indkey[0]
+        WHERE i.indrelid = 'book'::regclass AND i.indisunique AND i.indnatts = 1 AND a.attname = 'isbn'
+    ) THEN
+        CREATE UNIQUE INDEX book_isbn_idx ON book (isbn);
+    END IF;
+END $$;
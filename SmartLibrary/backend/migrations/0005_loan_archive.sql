@@ -0,0 +1,55 @@
+-- =====================
+-- Loan archival + all-time borrow counts per book
+-- =====================
+
+-- Returned loans past the retention window move here in batches (backend/maintenance.py)
+CREATE TABLE IF NOT EXISTS loan_archive (
+    loan_id     INT PRIMARY KEY,
+    book_id     INT,
+    member_id   INT,
+    borrow_date DATE,
+    due_date    DATE,
+    returned    BOOLEAN,
+    archived_at TIMESTAMP NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS loan_archive_member_idx ON loan_archive (member_id);
+CREATE INDEX IF NOT EXISTS loan_archive_borrow_date_idx ON loan_archive (borrow_date);
+
+-- Finds archival candidates without touching active loans
+CREATE INDEX IF NOT EXISTS loan_returned_borrow_date_idx ON loan (borrow_date) WHERE returned = TRUE;
+
+-- Every borrow ever made, per book. Incremented when loans are inserted and never
+-- decremented, so archiving (deleting) old loans leaves the most-borrowed ranking intact.
+CREATE TABLE IF NOT EXISTS book_borrow_counts (
+    book_id      INT PRIMARY KEY REFERENCES book(book_id) ON DELETE CASCADE,
+    borrow_count BIGINT NOT NULL DEFAULT 0
+);
+
+CREATE INDEX IF NOT EXISTS book_borrow_counts_rank_idx ON book_borrow_counts (borrow_count DESC, book_id);
+
+CREATE OR REPLACE FUNCTION book_borrow_counts_bump() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO book_borrow_counts (book_id, borrow_count)
+    SELECT book_id, COUNT(*) FROM new_rows WHERE book_id IS NOT NULL GROUP BY book_id
+    ON CONFLICT (book_id) DO UPDATE
+        SET borrow_count = book_borrow_counts.borrow_count + EXCLUDED.borrow_count;
+    RETURN NULL;
+END $$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS loan_borrow_counts_ins ON loan;
+CREATE TRIGGER loan_borrow_counts_ins AFTER INSERT ON loan
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION book_borrow_counts_bump();
+
+-- Seed from live and already-archived loans
+INSERT INTO book_borrow_counts (book_id, borrow_count)
+SELECT t.book_id, COUNT(*)
+FROM (
+    SELECT book_id FROM loan
+    UNION ALL
+    SELECT book_id FROM loan_archive
+) t
+JOIN book b ON b.book_id = t.book_id
+GROUP BY t.book_id
+ON CONFLICT (book_id) DO UPDATE SET borrow_count = EXCLUDED.borrow_count;
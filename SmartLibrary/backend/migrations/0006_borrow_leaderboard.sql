@@ -0,0 +1,46 @@
+-- =====================
+-- Windowed most-borrowed leaderboard
+-- =====================
+
+-- Borrows per book per day, bumped as loans are inserted. Windowed rankings
+-- sum at most (days x books borrowed that day) rows instead of scanning loan.
+CREATE TABLE IF NOT EXISTS book_borrow_daily (
+    day          DATE NOT NULL,
+    book_id      INT NOT NULL REFERENCES book(book_id) ON DELETE CASCADE,
+    borrow_count INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, book_id)
+);
+
+CREATE OR REPLACE FUNCTION book_borrow_daily_bump() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO book_borrow_daily (day, book_id, borrow_count)
+    SELECT coalesce(borrow_date, CURRENT_DATE)::date, book_id, COUNT(*)
+    FROM new_rows WHERE book_id IS NOT NULL
+    GROUP BY 1, 2
+    ON CONFLICT (day, book_id) DO UPDATE
+        SET borrow_count = book_borrow_daily.borrow_count + EXCLUDED.borrow_count;
+    RETURN NULL;
+END $$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS loan_borrow_daily_ins ON loan;
+CREATE TRIGGER loan_borrow_daily_ins AFTER INSERT ON loan
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION book_borrow_daily_bump();
+
+INSERT INTO book_borrow_daily (day, book_id, borrow_count)
+SELECT l.borrow_date, l.book_id, COUNT(*)
+FROM loan l JOIN book b ON b.book_id = l.book_id
+WHERE l.borrow_date >= CURRENT_DATE - 30
+GROUP BY 1, 2
+ON CONFLICT (day, book_id) DO UPDATE SET borrow_count = EXCLUDED.borrow_count;
+
+-- Precomputed top-K per window (backend/leaderboard.py refreshes it);
+-- reading the top N is an index range scan over N rows.
+CREATE TABLE IF NOT EXISTS borrow_leaderboard (
+    window_name  VARCHAR(10) NOT NULL,
+    rank         INT NOT NULL,
+    book_id      INT NOT NULL REFERENCES book(book_id) ON DELETE CASCADE,
+    borrow_count BIGINT NOT NULL,
+    computed_at  TIMESTAMP NOT NULL DEFAULT now(),
+    PRIMARY KEY (window_name, rank)
+);
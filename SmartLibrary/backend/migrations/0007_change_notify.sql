@@ -0,0 +1,76 @@
+-- =====================
+-- Change notifications: NOTIFY library_changes after writes to book, loan
+-- and bookclubmembers so open desks can patch just the rows that changed
+-- =====================
+
+-- Payload: {"table": ..., "op": "INSERT|UPDATE|DELETE", "ids": [...], "members": [...]}
+-- ids come from the column named by the first trigger argument, members from
+-- the optional second one. Delivered on commit; a rolled-back write sends nothing.
+CREATE OR REPLACE FUNCTION library_notify_change() RETURNS trigger AS $$
+DECLARE
+    src     TEXT := CASE WHEN TG_OP = 'DELETE' THEN 'old_rows' ELSE 'new_rows' END;
+    ids     JSON;
+    members JSON;
+    payload TEXT;
+BEGIN
+    EXECUTE format('SELECT json_agg(DISTINCT %I) FROM %I', TG_ARGV[0], src) INTO ids;
+    IF ids IS NULL THEN
+        RETURN NULL;   -- the statement touched no rows
+    END IF;
+    IF TG_NARGS > 1 THEN
+        EXECUTE format('SELECT json_agg(DISTINCT %I) FROM %I', TG_ARGV[1], src) INTO members;
+    END IF;
+    payload := json_build_object('table', TG_TABLE_NAME, 'op', TG_OP, 'ids', ids, 'members', members)::text;
+    IF octet_length(payload) > 7900 THEN
+        -- NOTIFY payloads stop at 8000 bytes; null ids mean "reload the whole table"
+        payload := json_build_object('table', TG_TABLE_NAME, 'op', TG_OP, 'ids', NULL, 'members', NULL)::text;
+    END IF;
+    PERFORM pg_notify('library_changes', payload);
+    RETURN NULL;
+END $$ LANGUAGE plpgsql;
+
+-- Transition tables need one trigger per event
+DROP TRIGGER IF EXISTS book_notify_ins ON book;
+CREATE TRIGGER book_notify_ins AFTER INSERT ON book
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION library_notify_change('book_id');
+
+DROP TRIGGER IF EXISTS book_notify_upd ON book;
+CREATE TRIGGER book_notify_upd AFTER UPDATE ON book
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION library_notify_change('book_id');
+
+DROP TRIGGER IF EXISTS book_notify_del ON book;
+CREATE TRIGGER book_notify_del AFTER DELETE ON book
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION library_notify_change('book_id');
+
+DROP TRIGGER IF EXISTS loan_notify_ins ON loan;
+CREATE TRIGGER loan_notify_ins AFTER INSERT ON loan
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION library_notify_change('loan_id', 'member_id');
+
+DROP TRIGGER IF EXISTS loan_notify_upd ON loan;
+CREATE TRIGGER loan_notify_upd AFTER UPDATE ON loan
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION library_notify_change('loan_id', 'member_id');
+
+DROP TRIGGER IF EXISTS loan_notify_del ON loan;
+CREATE TRIGGER loan_notify_del AFTER DELETE ON loan
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION library_notify_change('loan_id', 'member_id');
+
+DROP TRIGGER IF EXISTS bookclubmembers_notify_ins ON bookclubmembers;
+CREATE TRIGGER bookclubmembers_notify_ins AFTER INSERT ON bookclubmembers
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION library_notify_change('club_id', 'member_id');
+
+DROP TRIGGER IF EXISTS bookclubmembers_notify_upd ON bookclubmembers;
+CREATE TRIGGER bookclubmembers_notify_upd AFTER UPDATE ON bookclubmembers
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION library_notify_change('club_id', 'member_id');
+
+DROP TRIGGER IF EXISTS bookclubmembers_notify_del ON bookclubmembers;
+CREATE TRIGGER bookclubmembers_notify_del AFTER DELETE ON bookclubmembers
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION library_notify_change('club_id', 'member_id');
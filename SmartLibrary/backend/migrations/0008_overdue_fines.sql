@@ -0,0 +1,33 @@
+-- =====================
+-- Overdue loans and fines (backend/fines.py)
+-- =====================
+
+-- Overdue scan: active loans by due date, without touching returned history
+CREATE INDEX IF NOT EXISTS loan_active_due_date_idx ON loan (due_date) WHERE returned = FALSE;
+
+-- One row per loan that went overdue. No foreign key to loan: returned loans
+-- are archived (deleted from loan) while their fines must stay.
+CREATE TABLE IF NOT EXISTS loan_fines (
+    loan_id      INT PRIMARY KEY,
+    member_id    INT,
+    book_id      INT,
+    due_date     DATE NOT NULL,
+    days_overdue INT NOT NULL DEFAULT 0,
+    amount       NUMERIC(10, 2) NOT NULL DEFAULT 0,
+    assessed_on  DATE NOT NULL,
+    closed       BOOLEAN NOT NULL DEFAULT FALSE,   -- loan returned: amount is final
+    paid         BOOLEAN NOT NULL DEFAULT FALSE
+);
+
+CREATE INDEX IF NOT EXISTS loan_fines_member_idx ON loan_fines (member_id) WHERE paid = FALSE;
+CREATE INDEX IF NOT EXISTS loan_fines_open_idx ON loan_fines (assessed_on) WHERE closed = FALSE;
+
+-- One row per engine run; the latest as_of bounds the next incremental scan
+CREATE TABLE IF NOT EXISTS fine_runs (
+    run_id     SERIAL PRIMARY KEY,
+    as_of      DATE NOT NULL,
+    new_fines  INT NOT NULL,
+    reassessed INT NOT NULL,
+    closed     INT NOT NULL,
+    ran_at     TIMESTAMP NOT NULL DEFAULT now()
+);
@@ -0,0 +1,28 @@
+-- =====================
+-- Holds: per-book FIFO queue for books with no copies on the shelf
+-- =====================
+
+-- waiting   in the queue
+-- ready     a returned copy is set aside for the member (not counted in copies_available)
+-- collected the member borrowed the book
+-- cancelled / expired
+CREATE TABLE IF NOT EXISTS book_hold (
+    hold_id    SERIAL PRIMARY KEY,
+    book_id    INT NOT NULL REFERENCES book(book_id) ON DELETE CASCADE,
+    member_id  INT NOT NULL,
+    status     VARCHAR(10) NOT NULL DEFAULT 'waiting',
+    created_at TIMESTAMP NOT NULL DEFAULT clock_timestamp(),
+    ready_at   TIMESTAMP
+);
+
+-- Head of a book's queue on return: one index probe
+CREATE INDEX IF NOT EXISTS book_hold_queue_idx ON book_hold (book_id, created_at) WHERE status = 'waiting';
+
+-- One open hold per member and book
+CREATE UNIQUE INDEX IF NOT EXISTS book_hold_open_uniq ON book_hold (book_id, member_id)
+    WHERE status IN ('waiting', 'ready');
+
+CREATE INDEX IF NOT EXISTS book_hold_member_idx ON book_hold (member_id) WHERE status IN ('waiting', 'ready');
+
+-- Uncollected copies, for expiry (backend/maintenance.py)
+CREATE INDEX IF NOT EXISTS book_hold_ready_idx ON book_hold (ready_at) WHERE status = 'ready';
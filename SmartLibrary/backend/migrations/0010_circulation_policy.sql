@@ -0,0 +1,81 @@
+-- =====================
+-- Circulation policy + per-member active-loan counter
+-- =====================
+
+-- Rules by role and book category; NULL matches any and the most specific rule
+-- wins (backend/policy.py). max_loans caps all of a member's active loans and is
+-- taken from the role's rule for any category; loan_days and max_renewals may
+-- differ per category.
+CREATE TABLE IF NOT EXISTS circulation_policy (
+    policy_id    SERIAL PRIMARY KEY,
+    role_id      INT,
+    category     VARCHAR(50),
+    max_loans    INT NOT NULL,
+    loan_days    INT NOT NULL,
+    max_renewals INT NOT NULL DEFAULT 0
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS circulation_policy_rule_uniq
+    ON circulation_policy ((coalesce(role_id, 0)), (coalesce(category, '')));
+
+-- The limits that used to be hard-coded in member.py
+INSERT INTO circulation_policy (role_id, category, max_loans, loan_days, max_renewals)
+VALUES (NULL, NULL, 3, 7, 2)
+ON CONFLICT DO NOTHING;
+
+-- Active loans per member, so the borrow limit check is a primary-key lookup
+-- instead of a COUNT(*) over loan. Kept current by statement-level triggers.
+CREATE TABLE IF NOT EXISTS member_loan_counts (
+    member_id    INT PRIMARY KEY,
+    active_loans INT NOT NULL DEFAULT 0
+);
+
+CREATE OR REPLACE FUNCTION member_loan_counts_apply() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO member_loan_counts AS c (member_id, active_loans)
+        SELECT member_id, COUNT(*) FROM new_rows
+        WHERE returned = FALSE AND member_id IS NOT NULL
+        GROUP BY member_id
+        ON CONFLICT (member_id) DO UPDATE SET active_loans = c.active_loans + EXCLUDED.active_loans;
+    ELSIF TG_OP = 'DELETE' THEN
+        UPDATE member_loan_counts c SET active_loans = GREATEST(c.active_loans - o.n, 0)
+        FROM (SELECT member_id, COUNT(*) AS n FROM old_rows WHERE returned = FALSE GROUP BY member_id) o
+        WHERE c.member_id = o.member_id;
+    ELSE
+        -- net change only: updates that leave a loan active (renewals) write nothing
+        INSERT INTO member_loan_counts AS c (member_id, active_loans)
+        SELECT member_id, SUM(n) FROM (
+            SELECT member_id, 1 AS n FROM new_rows WHERE returned = FALSE
+            UNION ALL
+            SELECT member_id, -1 FROM old_rows WHERE returned = FALSE
+        ) d
+        WHERE member_id IS NOT NULL
+        GROUP BY member_id
+        HAVING SUM(n) <> 0
+        ON CONFLICT (member_id) DO UPDATE SET active_loans = GREATEST(c.active_loans + EXCLUDED.active_loans, 0);
+    END IF;
+    RETURN NULL;
+END $$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS loan_member_counts_ins ON loan;
+CREATE TRIGGER loan_member_counts_ins AFTER INSERT ON loan
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION member_loan_counts_apply();
+
+DROP TRIGGER IF EXISTS loan_member_counts_upd ON loan;
+CREATE TRIGGER loan_member_counts_upd AFTER UPDATE ON loan
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION member_loan_counts_apply();
+
+DROP TRIGGER IF EXISTS loan_member_counts_del ON loan;
+CREATE TRIGGER loan_member_counts_del AFTER DELETE ON loan
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION member_loan_counts_apply();
+
+-- Seed from the current data
+INSERT INTO member_loan_counts (member_id, active_loans)
+SELECT member_id, COUNT(*) FROM loan
+WHERE returned = FALSE AND member_id IS NOT NULL
+GROUP BY member_id
+ON CONFLICT (member_id) DO UPDATE SET active_loans = EXCLUDED.active_loans;
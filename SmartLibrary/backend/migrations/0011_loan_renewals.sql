@@ -0,0 +1,6 @@
+-- =====================
+-- Loan renewals
+-- =====================
+
+-- Times a loan has been renewed, checked against circulation_policy.max_renewals
+ALTER TABLE loan ADD COLUMN IF NOT EXISTS renewals INT NOT NULL DEFAULT 0;
@@ -0,0 +1,17 @@
+-- =====================
+-- Catalog browsing: filters, sort and facets (Catalog.browse)
+-- =====================
+
+-- Default order (title): the first page is the head of the index
+CREATE INDEX IF NOT EXISTS book_title_idx ON book (title, book_id);
+
+-- Category filter in title order; with copies_available included, the category
+-- and availability facets are index-only scans
+CREATE INDEX IF NOT EXISTS book_category_title_idx ON book (category, title, book_id)
+    INCLUDE (copies_available);
+
+-- "Available only" in title order, and per-category counts of available books
+CREATE INDEX IF NOT EXISTS book_available_title_idx ON book (title, book_id) WHERE copies_available > 0;
+CREATE INDEX IF NOT EXISTS book_available_category_idx ON book (category) WHERE copies_available > 0;
+
+-- The author filter uses bookauthors_author_idx (0001_catalog_search.sql)
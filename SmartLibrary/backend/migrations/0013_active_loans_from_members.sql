@@ -0,0 +1,13 @@
+-- =====================
+-- Active-loan total from member_loan_counts instead of one shared counter row
+-- =====================
+-- Every borrow and return used to update the single 'active_loans' row of
+-- library_counters, so all circulation in the library queued on that row lock.
+-- member_loan_counts (0010) already keeps the same figure per member, where
+-- concurrent desks touch different rows; the dashboard now sums it instead.
+DROP TRIGGER IF EXISTS loan_counters_ins ON loan;
+DROP TRIGGER IF EXISTS loan_counters_upd ON loan;
+DROP TRIGGER IF EXISTS loan_counters_del ON loan;
+DROP FUNCTION IF EXISTS library_counters_loans();
+
+DELETE FROM library_counters WHERE name = 'active_loans';
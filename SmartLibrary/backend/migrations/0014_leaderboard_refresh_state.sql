@@ -0,0 +1,18 @@
+-- =====================
+-- When each leaderboard window was last computed
+-- =====================
+-- Staleness used to be read off the first borrow_leaderboard row: a window with
+-- no borrows had no rows, so it was recomputed on every read, and the naive
+-- computed_at was compared against an aware timestamp in Python. One row per
+-- window here, written by every refresh, answers "fresh?" in SQL even when the
+-- window is empty.
+ALTER TABLE borrow_leaderboard ALTER COLUMN computed_at TYPE TIMESTAMPTZ;
+
+CREATE TABLE IF NOT EXISTS leaderboard_refresh (
+    window_name VARCHAR(10) PRIMARY KEY,
+    computed_at TIMESTAMPTZ NOT NULL
+);
+
+INSERT INTO leaderboard_refresh (window_name, computed_at)
+SELECT window_name, max(computed_at) FROM borrow_leaderboard GROUP BY window_name
+ON CONFLICT (window_name) DO NOTHING;
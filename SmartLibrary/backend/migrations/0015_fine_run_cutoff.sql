@@ -0,0 +1,10 @@
+-- =====================
+-- Due-date cutoff of each fine run (backend/fines.py)
+-- =====================
+-- The incremental overdue scan used to start at the last run's as_of minus the
+-- current grace period, so changing grace_days between runs skipped or
+-- re-scanned a band of due dates. Each run now records the due date it scanned
+-- up to (as_of - grace, exclusive) and the next run starts exactly there.
+-- Runs from before this migration have no cutoff; the engine falls back to
+-- their as_of for those.
+ALTER TABLE fine_runs ADD COLUMN IF NOT EXISTS due_cutoff DATE;
@@ -0,0 +1,6 @@
+-- =====================
+-- Renewal counts survive archiving
+-- =====================
+-- loan.renewals (0011) was dropped when returned loans moved to loan_archive
+-- (backend/maintenance.py); keep it so renewal history stays reportable.
+ALTER TABLE loan_archive ADD COLUMN IF NOT EXISTS renewals INT NOT NULL DEFAULT 0;
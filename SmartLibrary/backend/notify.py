@@ -0,0 +1,92 @@
+import json
+import select
+import threading
+import psycopg2
+import psycopg2.extensions
+from backend.cache import invalidate
+
+# Writes to book, loan and bookclubmembers NOTIFY this channel
+# (migrations/0007_change_notify.sql).
+CHANNEL = "library_changes"
+
+NOTIFYING_TABLES = ("book", "loan", "bookclubmembers")
+
+# cache namespaces that hold rows of each notifying table
+CACHE_NAMESPACES = {
+    "book": ("books",),
+    "bookclubmembers": ("bookclub_members",),
+}
+
+
+class ChangeListener:
+    """
+    LISTENs for change notifications on its own connection (a LISTEN has to
+    stay on one session, so it can't use the pool) in a background thread.
+    Each change drops the matching cache namespaces and is then passed to
+    `callback` as {'table', 'op', 'ids', 'members'}; ids is None when the
+    write touched too many rows to list. The callback runs on the listener
+    thread. Lost connections are retried every `retry` seconds; after a
+    reconnect every table is reported with ids None ("op": "RESYNC") since
+    notifications sent while disconnected are gone.
+    """
+
+    def __init__(self, db_config, callback=None, retry=5, poll=1.0):
+        self.db_config = db_config
+        self.callback = callback
+        self.retry = retry
+        self.poll = poll
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="change-listener", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(self.poll + 1)
+            self._thread = None
+
+    def _run(self):
+        connected_before = False
+        while not self._stop.is_set():
+            conn = None
+            try:
+                conn = psycopg2.connect(**self.db_config)
+                conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+                cur = conn.cursor()
+                cur.execute(f"LISTEN {CHANNEL};")
+                if connected_before:
+                    for table in NOTIFYING_TABLES:
+                        self._dispatch(json.dumps({"table": table, "op": "RESYNC", "ids": None, "members": None}))
+                connected_before = True
+                while not self._stop.is_set():
+                    if select.select([conn], [], [], self.poll) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        self._dispatch(conn.notifies.pop(0).payload)
+            except Exception as e:
+                print("Change listener disconnected:", e)
+                self._stop.wait(self.retry)
+            finally:
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+
+    def _dispatch(self, payload):
+        try:
+            change = json.loads(payload)
+        except ValueError:
+            return
+        invalidate(*CACHE_NAMESPACES.get(change.get("table"), ()))
+        if self.callback:
+            try:
+                self.callback(change)
+            except Exception as e:
+                print("Error handling change notification:", e)
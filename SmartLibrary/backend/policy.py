@@ -0,0 +1,92 @@
+from collections import namedtuple
+from backend.db import get_pool
+from backend.cache import get_cache, invalidate
+
+# Circulation rules (migrations/0010_circulation_policy.sql) are read once into
+# the shared cache and resolved in Python, so a borrow costs no policy queries.
+# Editing a rule through set_rule() drops the cached copy; edits made elsewhere
+# show up within the cache TTL.
+Rule = namedtuple("Rule", "max_loans loan_days max_renewals")
+
+# Used when the policy table has no matching row (or does not exist yet)
+DEFAULT_RULE = Rule(max_loans=3, loan_days=7, max_renewals=2)
+
+POLICY_SQL = "SELECT role_id, category, max_loans, loan_days, max_renewals FROM circulation_policy;"
+
+SET_RULE_SQL = """
+    INSERT INTO circulation_policy (role_id, category, max_loans, loan_days, max_renewals)
+    VALUES (%s, %s, %s, %s, %s)
+    ON CONFLICT ((coalesce(role_id, 0)), (coalesce(category, ''))) DO UPDATE
+        SET max_loans = EXCLUDED.max_loans,
+            loan_days = EXCLUDED.loan_days,
+            max_renewals = EXCLUDED.max_renewals;
+"""
+
+
+class CirculationPolicy:
+    def __init__(self, db_config):
+        self.db_config = db_config
+
+    def rules(self):
+        """{(role_id, category): Rule}; None in a key matches any"""
+        return get_cache().get_or_load(("policy", "rules"), self._load)
+
+    def _load(self):
+        conn = get_pool(self.db_config).getconn()
+        cur = conn.cursor()
+        try:
+            cur.execute(POLICY_SQL)
+            return {(r[0], r[1]): Rule(*r[2:]) for r in cur.fetchall()}
+        except Exception as e:
+            conn.rollback()
+            print("Could not load circulation policy, using defaults:", e)
+            return {}
+        finally:
+            cur.close()
+            conn.close()
+
+    def rule(self, role_id, category=None):
+        """
+        The most specific rule for a role and book category, tried in the order
+        (role, category), (role, any), (any, category), (any, any).
+        """
+        rules = self.rules()
+        for key in ((role_id, category), (role_id, None), (None, category), (None, None)):
+            if key in rules:
+                return rules[key]
+        return DEFAULT_RULE
+
+    def borrow_params(self, role_id):
+        """
+        Query parameters for the borrow and renew statements: the role's loan
+        cap, default loan period and renewal limit, and the categories whose
+        period or renewal limit differs from them (three parallel lists).
+        """
+        default = self.rule(role_id)
+        categories = {c for (_, c) in self.rules() if c is not None}
+        special = {c: self.rule(role_id, c) for c in categories}
+        special = {c: r for c, r in special.items()
+                   if (r.loan_days, r.max_renewals) != (default.loan_days, default.max_renewals)}
+        return {
+            "max_loans": default.max_loans,
+            "loan_days": default.loan_days,
+            "max_renewals": default.max_renewals,
+            "categories": list(special),
+            "category_days": [r.loan_days for r in special.values()],
+            "category_renewals": [r.max_renewals for r in special.values()],
+        }
+
+    def set_rule(self, role_id, category, max_loans, loan_days, max_renewals=0):
+        """Create or replace the rule for (role_id, category); None means any"""
+        conn = get_pool(self.db_config).getconn()
+        cur = conn.cursor()
+        try:
+            cur.execute(SET_RULE_SQL, (role_id, category, max_loans, loan_days, max_renewals))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cur.close()
+            conn.close()
+        invalidate("policy")
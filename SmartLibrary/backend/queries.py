@@ -0,0 +1,603 @@
+import hashlib
+import re
+import threading
+import time
+from backend.schema import SchemaCache
+
+# Every named query the backend and the GUI run. Each one is PREPAREd once per pooled
+# connection (the pool's connections remember what they have prepared, see
+# backend/db.py) and afterwards sent as `EXECUTE name (args)`, so the server
+# parses and plans it once per connection instead of once per call.
+#
+# SQL is written with ordinary psycopg2 placeholders (%s or %(name)s, not
+# mixed) and may use {users} for the users table, which is "user" or "User"
+# depending on which schema script created the database.
+#
+# Statements that cannot be prepared (several statements in one string, or
+# parameters whose type the server cannot infer) are registered with
+# prepare=False: they are still named and timed, just sent as plain text.
+
+_PLACEHOLDER = re.compile(r"%%|%\((\w+)\)s|%s")
+
+MAX_IDENTIFIER = 63   # Postgres truncates longer names, which could make two queries collide
+
+
+def statement_name(name):
+    """Server-side prepared statement name for a query: name itself, or a hash of it if too long"""
+    if len(name) <= MAX_IDENTIFIER:
+        return name
+    return "q_" + hashlib.sha1(name.encode("utf-8")).hexdigest()
+
+class NamedQuery:
+    def __init__(self, name, sql, prepare=True):
+        self.name = name
+        self.statement = statement_name(name)
+        self.sql = sql
+        self.prepare = prepare
+        self.param_names, self.prepared_sql = _to_positional(sql)
+        self.calls = 0
+        self.prepares = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+
+
+def _to_positional(sql):
+    """
+    'WHERE a=%(x)s AND b=%(y)s OR c=%(x)s' -> (['x', 'y'], 'WHERE a=$1 AND b=$2 OR c=$1')
+    Plain %s placeholders give a list of None, one per parameter.
+    """
+    names = []
+
+    def sub(m):
+        if m.group(0) == "%%":
+            return "%"
+        key = m.group(1)
+        if key is None:
+            names.append(None)
+            return f"${len(names)}"
+        if key not in names:
+            names.append(key)
+        return f"${names.index(key) + 1}"
+
+    return names, _PLACEHOLDER.sub(sub, sql).strip().rstrip(";")
+
+
+QUERIES = {}
+_lock = threading.Lock()
+
+
+def register(name, sql, prepare=True):
+    """Declare a named query. Re-declaring a name with different SQL is an error."""
+    with _lock:
+        existing = QUERIES.get(name)
+        if existing is not None:
+            if existing.sql != sql:
+                raise ValueError(f"Query '{name}' is already registered with different SQL")
+            return existing
+        query = NamedQuery(name, sql, prepare)
+        QUERIES[name] = query
+        return query
+
+
+def users_table(cur=None, db_config=None):
+    """
+    Quoted name of the users table, the one place it is resolved: probed once
+    per database by backend/schema.py and remembered across runs. Pass the
+    cursor about to use it, or db_config to probe on a pooled connection.
+    """
+    if cur is not None:
+        return SchemaCache.for_connection(cur.connection).table("users", cur)
+    return SchemaCache(db_config).table("users")
+
+
+def run_query(cur, name, params=None):
+    """
+    Execute the named query on cur and return cur for fetching.
+    params is a tuple for %s queries or a dict for %(name)s queries.
+    """
+    query = QUERIES[name]
+    conn = cur.connection
+    prepared = getattr(conn, "prepared", None)   # None: not a pooled connection
+    needs_text = not (query.prepare and prepared is not None and name in prepared)
+    users = users_table(cur) if needs_text and "{users}" in query.sql else None
+
+    started = time.perf_counter()
+    if query.prepare and prepared is not None:
+        if name not in prepared:
+            text = query.prepared_sql
+            if users:
+                text = text.replace("{users}", users)
+            cur.execute(f"PREPARE {query.statement} AS {text}")
+            prepared.add(name)
+            with _lock:
+                query.prepares += 1
+        args = bind(query, params)
+        if args:
+            cur.execute(f"EXECUTE {query.statement} ({', '.join(['%s'] * len(args))})", args)
+        else:
+            cur.execute(f"EXECUTE {query.statement}")
+    else:
+        sql = query.sql.replace("{users}", users) if users else query.sql
+        cur.execute(sql, params)
+    record(query, time.perf_counter() - started)
+    return cur
+
+
+def bind(query, params):
+    """Arguments for query's $1..$n, in order"""
+    if isinstance(params, dict):
+        return [params[key] for key in query.param_names]
+    return list(params or ())
+
+
+def record(query, elapsed):
+    with _lock:
+        query.calls += 1
+        query.total_time += elapsed
+        query.max_time = max(query.max_time, elapsed)
+
+
+def query_stats():
+    """{name: {'calls', 'prepares', 'total_ms', 'avg_ms', 'max_ms', 'prepared'}} for every registered query"""
+    with _lock:
+        return {
+            q.name: {
+                "calls": q.calls,
+                "prepares": q.prepares,
+                "total_ms": q.total_time * 1000,
+                "avg_ms": q.total_time * 1000 / q.calls if q.calls else 0.0,
+                "max_ms": q.max_time * 1000,
+                "prepared": q.prepare,
+            }
+            for q in QUERIES.values()
+        }
+
+
+def reset_stats():
+    with _lock:
+        for q in QUERIES.values():
+            q.calls = q.prepares = 0
+            q.total_time = q.max_time = 0.0
+
+
+# ---------------- Users ----------------
+# The password is checked in Python (backend/auth.py), never compared in SQL
+register("login_lookup", """
+    SELECT user_id, full_name, role_id, password
+    FROM {users}
+    WHERE username = %s;
+""")
+
+register("set_password", "UPDATE {users} SET password = %s WHERE user_id = %s;")
+
+register("all_members", "SELECT user_id, full_name, username, email FROM {users} WHERE role_id=2;")
+
+# ---------------- Loans ----------------
+# Serialises loan changes by one member (lock_ns is LOAN_LOCK_NS in member.py)
+# so their active-loan count can't race.
+MEMBER_LOCK_SQL = "SELECT pg_advisory_xact_lock(%(lock_ns)s, %(member_id)s);"
+
+# The member's active loans, from the trigger-maintained counter
+# (migrations/0010_circulation_policy.sql): one primary-key lookup.
+ACTIVE_COUNT_SQL = """active AS (
+        SELECT COALESCE((SELECT active_loans FROM member_loan_counts WHERE member_id=%(member_id)s), 0) AS n
+    )"""
+
+# Due date from the circulation policy (backend/policy.py): the book's category
+# period if it has one, else the role's default loan_days.
+DUE_DATE_SQL = """%(borrow_date)s::date + COALESCE(
+            (SELECT p.days FROM unnest(%(categories)s::text[], %(category_days)s::int[]) AS p(category, days)
+             WHERE p.category = b.category), %(loan_days)s::int)"""
+
+# The conditional UPDATE only decrements stock that is still there (concurrent
+# borrowers re-check copies_available after the row lock), so the last copy
+# can't be oversold. A copy a return set aside for this member (a 'ready'
+# hold) is taken instead of shelf stock. The trailing SELECT says why nothing
+# happened.
+BORROW_ONE_SQL = """
+    WITH """ + ACTIVE_COUNT_SQL + """, claimed AS (
+        UPDATE book_hold SET status='collected'
+        WHERE book_id=%(book_id)s AND member_id=%(member_id)s AND status='ready'
+          AND (SELECT n FROM active) < %(max_loans)s
+        RETURNING book_id
+    ), stock AS (
+        UPDATE book SET copies_available = copies_available - 1
+        WHERE book_id=%(book_id)s AND copies_available > 0
+          AND (SELECT n FROM active) < %(max_loans)s
+          AND NOT EXISTS (SELECT 1 FROM claimed)
+        RETURNING book_id
+    ), dequeued AS (
+        UPDATE book_hold SET status='collected'
+        WHERE book_id=%(book_id)s AND member_id=%(member_id)s AND status='waiting'
+          AND EXISTS (SELECT 1 FROM stock)
+    ), new_loan AS (
+        INSERT INTO loan (book_id, member_id, borrow_date, due_date, returned)
+        SELECT b.book_id, %(member_id)s::int, %(borrow_date)s::date, """ + DUE_DATE_SQL + """, FALSE
+        FROM (SELECT book_id FROM stock UNION ALL SELECT book_id FROM claimed) s
+        JOIN book b ON b.book_id = s.book_id
+        RETURNING loan_id, due_date
+    )
+    SELECT (SELECT loan_id FROM new_loan),
+           (SELECT n FROM active),
+           (SELECT copies_available FROM book WHERE book_id=%(book_id)s),
+           (SELECT due_date FROM new_loan);
+"""
+
+# Batch borrow: take up to the remaining loan allowance from the requested
+# books (in request order) that are set aside for the member or still have
+# stock, all in one statement.
+BORROW_BATCH_SQL = """
+    WITH req AS (
+        SELECT book_id, ord FROM unnest(%(book_ids)s::int[]) WITH ORDINALITY AS r(book_id, ord)
+    ), """ + ACTIVE_COUNT_SQL + """, ready AS (
+        SELECT book_id FROM book_hold
+        WHERE member_id=%(member_id)s AND status='ready' AND book_id = ANY(%(book_ids)s::int[])
+    ), candidates AS (
+        SELECT r.book_id, rd.book_id IS NOT NULL AS reserved
+        FROM req r
+        JOIN book b ON b.book_id = r.book_id
+        LEFT JOIN ready rd ON rd.book_id = r.book_id
+        WHERE b.copies_available > 0 OR rd.book_id IS NOT NULL
+        ORDER BY r.ord
+        LIMIT GREATEST(%(max_loans)s::int - (SELECT n FROM active), 0)
+    ), claimed AS (
+        UPDATE book_hold h SET status='collected'
+        FROM candidates c
+        WHERE c.reserved AND h.book_id = c.book_id
+          AND h.member_id=%(member_id)s AND h.status='ready'
+        RETURNING h.book_id
+    ), stock AS (
+        UPDATE book b SET copies_available = b.copies_available - 1
+        FROM candidates c
+        WHERE NOT c.reserved AND b.book_id = c.book_id AND b.copies_available > 0
+        RETURNING b.book_id
+    ), dequeued AS (
+        UPDATE book_hold h SET status='collected'
+        FROM stock s
+        WHERE h.book_id = s.book_id AND h.member_id=%(member_id)s AND h.status='waiting'
+    ), new_loans AS (
+        INSERT INTO loan (book_id, member_id, borrow_date, due_date, returned)
+        SELECT b.book_id, %(member_id)s::int, %(borrow_date)s::date, """ + DUE_DATE_SQL + """, FALSE
+        FROM (SELECT book_id FROM stock UNION ALL SELECT book_id FROM claimed) s
+        JOIN book b ON b.book_id = s.book_id
+        RETURNING loan_id, book_id, due_date
+    )
+    SELECT r.book_id, nl.loan_id, b.copies_available, c.book_id IS NOT NULL, nl.due_date
+    FROM req r
+    LEFT JOIN new_loans nl ON nl.book_id = r.book_id
+    LEFT JOIN candidates c ON c.book_id = r.book_id
+    LEFT JOIN book b ON b.book_id = r.book_id
+    ORDER BY r.ord;
+"""
+
+register("member_lock", MEMBER_LOCK_SQL)
+register("borrow_one", BORROW_ONE_SQL)
+register("borrow_batch", BORROW_BATCH_SQL)
+
+# The sync classes send lock + borrow as one string: a single round trip.
+register("borrow", MEMBER_LOCK_SQL + BORROW_ONE_SQL, prepare=False)
+register("borrow_many", MEMBER_LOCK_SQL + BORROW_BATCH_SQL, prepare=False)
+
+# Tail shared by everything that frees copies. Given a CTE counts(book_id, cnt)
+# of freed copies per book, hand each copy to the oldest waiting hold on its
+# book (one probe of book_hold_queue_idx per book; holds locked by a concurrent
+# cancel are skipped) and put the rest back on the shelf.
+ALLOCATE_COPIES_SQL = """
+    allocated AS (
+        UPDATE book_hold h SET status='ready', ready_at=now()
+        FROM (
+            SELECT q.hold_id FROM counts c
+            CROSS JOIN LATERAL (
+                SELECT hold_id FROM book_hold
+                WHERE book_id = c.book_id AND status='waiting'
+                ORDER BY created_at
+                LIMIT c.cnt
+                FOR UPDATE SKIP LOCKED
+            ) q
+        ) head
+        WHERE h.hold_id = head.hold_id
+        RETURNING h.book_id
+    ), restock AS (
+        UPDATE book b SET copies_available = b.copies_available + r.n
+        FROM (
+            SELECT c.book_id, c.cnt - COUNT(a.book_id) AS n
+            FROM counts c LEFT JOIN allocated a ON a.book_id = c.book_id
+            GROUP BY c.book_id, c.cnt
+        ) r
+        WHERE b.book_id = r.book_id AND r.n > 0
+    )
+"""
+
+# Flip every still-open loan in the list and pass each book's returned copies
+# to its hold queue, restocking what is left over. Loans already returned are
+# left alone, so a double return can't inflate stock.
+register("return_many", """
+    WITH returned AS (
+        UPDATE loan SET returned=TRUE
+        WHERE loan_id = ANY(%(loan_ids)s::int[]) AND returned=FALSE
+        RETURNING loan_id, book_id
+    ), counts AS (
+        SELECT book_id, COUNT(*) AS cnt FROM returned GROUP BY book_id
+    ),""" + ALLOCATE_COPIES_SQL + """
+    SELECT l.loan_id, r.book_id
+    FROM unnest(%(loan_ids)s::int[]) AS l(loan_id)
+    LEFT JOIN returned r ON r.loan_id = l.loan_id;
+""")
+
+register("active_loans", """
+    SELECT l.loan_id, b.title, l.borrow_date, l.due_date
+    FROM loan l
+    JOIN book b ON l.book_id = b.book_id
+    WHERE l.member_id=%s AND l.returned=FALSE;
+""")
+
+# Same with the book id, for the GUI loans table (returns and renewals by row)
+register("member_loans", """
+    SELECT l.loan_id, b.book_id, b.title, l.borrow_date, l.due_date
+    FROM loan l
+    JOIN book b ON l.book_id = b.book_id
+    WHERE l.member_id=%s AND l.returned=FALSE;
+""")
+
+# Renewal: one conditional UPDATE per call. A loan is extended only if it is
+# the member's, still out, not overdue, under its category's renewal limit and
+# nobody is waiting for the book. The WHERE is re-checked against the latest
+# row version when a concurrent return or renewal got there first, so neither
+# update is lost. The extension counts from the later of today and the current
+# due date. {loans} is the set of loans to try, with an order for the results.
+RENEW_SQL = """
+    WITH req AS ({loans}), renewed AS (
+        UPDATE loan l SET
+            due_date = GREATEST(l.due_date, %(today)s::date) + COALESCE(
+                (SELECT p.days FROM unnest(%(categories)s::text[], %(category_days)s::int[]) AS p(category, days)
+                 WHERE p.category = b.category), %(loan_days)s::int),
+            renewals = l.renewals + 1
+        FROM book b
+        WHERE l.loan_id IN (SELECT loan_id FROM req)
+          AND l.member_id = %(member_id)s AND l.returned = FALSE
+          AND l.due_date >= %(today)s::date
+          AND b.book_id = l.book_id
+          AND l.renewals < COALESCE(
+                (SELECT p.renewals FROM unnest(%(categories)s::text[], %(category_renewals)s::int[]) AS p(category, renewals)
+                 WHERE p.category = b.category), %(max_renewals)s::int)
+          AND NOT EXISTS (SELECT 1 FROM book_hold h WHERE h.book_id = l.book_id AND h.status = 'waiting')
+        RETURNING l.loan_id, l.due_date
+    )
+    SELECT q.loan_id, n.due_date,
+           l.member_id IS NOT DISTINCT FROM %(member_id)s AND l.returned = FALSE,
+           l.due_date < %(today)s::date,
+           EXISTS (SELECT 1 FROM book_hold h WHERE h.book_id = l.book_id AND h.status = 'waiting')
+    FROM req q
+    LEFT JOIN renewed n ON n.loan_id = q.loan_id
+    LEFT JOIN loan l ON l.loan_id = q.loan_id
+    ORDER BY q.ord;
+"""
+
+register("renew_loans", RENEW_SQL.format(
+    loans="SELECT loan_id, ord FROM unnest(%(loan_ids)s::int[]) WITH ORDINALITY AS r(loan_id, ord)"))
+
+register("renew_all", RENEW_SQL.format(
+    loans="SELECT loan_id, loan_id AS ord FROM loan WHERE member_id=%(member_id)s AND returned=FALSE"))
+
+# ---------------- Holds ----------------
+# Only books with no copy on the shelf can be held; a member holds a book at
+# most once (book_hold_open_uniq). Returns the new hold_id (None if not placed),
+# the shelf stock and the number of members queued ahead.
+register("place_hold", """
+    WITH b AS (
+        SELECT book_id, copies_available FROM book WHERE book_id=%(book_id)s
+    ), placed AS (
+        INSERT INTO book_hold (book_id, member_id)
+        SELECT book_id, %(member_id)s::int FROM b WHERE copies_available <= 0
+        ON CONFLICT DO NOTHING
+        RETURNING hold_id
+    )
+    SELECT (SELECT hold_id FROM placed),
+           (SELECT copies_available FROM b),
+           (SELECT COUNT(*) FROM book_hold WHERE book_id=%(book_id)s AND status='waiting');
+""")
+
+# Cancelling a 'ready' hold passes its copy on to the next in line.
+register("cancel_hold", """
+    WITH cancelled AS (
+        UPDATE book_hold SET status='cancelled'
+        WHERE hold_id=%(hold_id)s AND member_id=%(member_id)s AND status IN ('waiting', 'ready')
+        RETURNING book_id
+    ), freed AS (
+        SELECT h.book_id FROM book_hold h JOIN cancelled c ON c.book_id = h.book_id
+        WHERE h.hold_id=%(hold_id)s AND h.status='ready'
+    ), counts AS (
+        SELECT book_id, COUNT(*) AS cnt FROM freed GROUP BY book_id
+    ),""" + ALLOCATE_COPIES_SQL + """
+    SELECT book_id FROM cancelled;
+""")
+
+# A member's open holds; position counts the waiting holds up to and including theirs
+register("member_holds", """
+    SELECT h.hold_id, h.book_id, b.title, h.status, h.created_at,
+           CASE WHEN h.status = 'waiting' THEN
+               (SELECT COUNT(*) FROM book_hold w
+                WHERE w.book_id = h.book_id AND w.status = 'waiting' AND w.created_at <= h.created_at)
+           END AS position
+    FROM book_hold h
+    JOIN book b ON b.book_id = h.book_id
+    WHERE h.member_id=%s AND h.status IN ('waiting', 'ready')
+    ORDER BY h.created_at;
+""")
+
+# ---------------- Catalog ----------------
+register("add_author", "INSERT INTO author (full_name) VALUES (%s) RETURNING author_id;")
+
+register("update_author", "UPDATE author SET full_name=%s WHERE author_id=%s;")
+
+register("delete_author", "DELETE FROM author WHERE author_id=%s;")
+
+register("all_authors", "SELECT author_id, full_name FROM author ORDER BY author_id;")
+
+register("add_book", """
+    INSERT INTO book (title, category, isbn, copies_available, author_id)
+    VALUES (%s, %s, %s, %s, %s) RETURNING book_id;
+""")
+
+# A book with no author link, as entered on the GUI Books page
+register("create_book", """
+    INSERT INTO book (title, category, isbn, copies_available)
+    VALUES (%s, %s, %s, %s) RETURNING book_id;
+""")
+
+register("update_book", """
+    UPDATE book SET title=%s, category=%s, isbn=%s, copies_available=%s
+    WHERE book_id=%s;
+""")
+
+register("update_book_stock", "UPDATE book SET copies_available=%s WHERE book_id=%s;")
+
+register("delete_book", "DELETE FROM book WHERE book_id=%s;")
+
+# Keyset page of the catalog: book_id > after_id, in book_id order
+register("catalog_page", """
+    SELECT book_id, title, category, isbn, copies_available FROM book
+    WHERE book_id > %s ORDER BY book_id LIMIT %s;
+""")
+
+register("catalog_by_ids", """
+    SELECT book_id, title, category, isbn, copies_available FROM book
+    WHERE book_id = ANY(%s::int[]);
+""")
+
+# Each branch of `hits` is backed by an index from migrations/0001_catalog_search.sql:
+# the book tsvector, the title trigram index, the author name tsvector and the
+# isbn prefix index. A book matched by several branches scores the sum.
+SEARCH_SQL = register("catalog_search", """
+    WITH q AS (
+        SELECT to_tsquery('simple', %(tsquery)s) AS tsq
+    ), hits AS (
+        SELECT b.book_id, ts_rank(b.search_vector, q.tsq) * 2 AS score
+        FROM book b, q
+        WHERE b.search_vector @@ q.tsq
+        UNION ALL
+        SELECT book_id, similarity(title, %(term)s)
+        FROM book
+        WHERE title %% %(term)s
+        UNION ALL
+        SELECT ba.book_id, ts_rank(to_tsvector('simple', a.full_name), q.tsq)
+        FROM author a JOIN bookauthors ba ON ba.author_id = a.author_id, q
+        WHERE to_tsvector('simple', a.full_name) @@ q.tsq
+        UNION ALL
+        SELECT book_id, 5
+        FROM book
+        WHERE isbn LIKE %(isbn_prefix)s
+    )
+    SELECT b.book_id, b.title, b.category, b.isbn, b.copies_available, SUM(h.score) AS rank
+    FROM hits h JOIN book b ON b.book_id = h.book_id
+    GROUP BY b.book_id
+    ORDER BY rank DESC, b.book_id
+    LIMIT %(limit)s OFFSET %(offset)s;
+""").sql
+
+# Used by Catalog.search_books when the database lacks what the ranked search
+# needs (pg_trgm or the search_vector column from 0001): plain substring match,
+# title order.
+register("catalog_search_ilike", """
+    SELECT book_id, title, category, isbn, copies_available, 0 AS rank
+    FROM book
+    WHERE title ILIKE %(pattern)s OR category ILIKE %(pattern)s OR isbn LIKE %(pattern)s
+    ORDER BY title, book_id
+    LIMIT %(limit)s OFFSET %(offset)s;
+""")
+
+# ---------------- Book clubs ----------------
+register("create_book_club", "INSERT INTO bookclub (club_name, moderator_id) VALUES (%s, %s) RETURNING club_id;")
+
+register("delete_book_club", "DELETE FROM bookclub WHERE club_id=%s;")
+
+register("all_book_clubs", "SELECT club_id, club_name, moderator_id FROM bookclub ORDER BY club_id;")
+
+register("add_club_member", "INSERT INTO bookclubmembers (club_id, member_id) VALUES (%s, %s);")
+
+register("remove_club_member", "DELETE FROM bookclubmembers WHERE club_id=%s AND member_id=%s;")
+
+register("club_members", """
+    SELECT u.user_id, u.full_name
+    FROM bookclubmembers bcm
+    JOIN {users} u ON bcm.member_id = u.user_id
+    WHERE bcm.club_id = %s;
+""")
+
+# ---------------- Dashboard ----------------
+MOST_BORROWED_SQL = """
+    SELECT json_agg(json_build_array(t.book_id, t.title, t.cnt))
+    FROM (
+        SELECT b.book_id, b.title, COUNT(*) AS cnt
+        FROM loan l JOIN book b ON l.book_id = b.book_id
+        GROUP BY b.book_id, b.title
+        ORDER BY cnt DESC
+        LIMIT %(limit)s
+    ) t
+"""
+
+# All-time counts from book_borrow_counts (migrations/0005_loan_archive.sql):
+# an index walk, and still correct after old loans are archived out of `loan`.
+ROLLUP_MOST_BORROWED_SQL = """
+    SELECT json_agg(json_build_array(t.book_id, t.title, t.borrow_count))
+    FROM (
+        SELECT b.book_id, b.title, c.borrow_count
+        FROM book_borrow_counts c JOIN book b ON b.book_id = c.book_id
+        ORDER BY c.borrow_count DESC, c.book_id
+        LIMIT %(limit)s
+    ) t
+"""
+
+# Book and member totals come from library_counters (migrations/0002), active
+# loans from the per-member counters (0010, 0013), so the cost does not grow
+# with the size of book or loan and no borrow writes a row every desk shares.
+register("dashboard_counters", f"""
+    SELECT (SELECT value FROM library_counters WHERE name = 'books'),
+           (SELECT value FROM library_counters WHERE name = 'members'),
+           (SELECT COALESCE(SUM(active_loans), 0) FROM member_loan_counts),
+           ({ROLLUP_MOST_BORROWED_SQL});
+""")
+
+register("dashboard_live", f"""
+    SELECT (SELECT COUNT(*) FROM book),
+           (SELECT COUNT(*) FROM {{users}} WHERE role_id = 2),
+           (SELECT COUNT(*) FROM loan WHERE returned = FALSE),
+           ({MOST_BORROWED_SQL});
+""")
+
+# ---------------- Leaderboard ----------------
+register("leaderboard_all_time", """
+    SELECT b.book_id, b.title, c.borrow_count
+    FROM book_borrow_counts c JOIN book b ON b.book_id = c.book_id
+    ORDER BY c.borrow_count DESC, c.book_id
+    LIMIT %(limit)s;
+""")
+
+register("leaderboard_window", """
+    SELECT b.book_id, b.title, l.borrow_count
+    FROM borrow_leaderboard l JOIN book b ON b.book_id = l.book_id
+    WHERE l.window_name = %(window)s
+    ORDER BY l.rank
+    LIMIT %(limit)s;
+""")
+
+# No row: never computed. Checked in SQL so an empty window still counts as fresh.
+register("leaderboard_fresh", """
+    SELECT computed_at > now() - make_interval(mins => %(max_age)s)
+    FROM leaderboard_refresh WHERE window_name = %(window)s;
+""")
+
+register("leaderboard_refresh", """
+    DELETE FROM borrow_leaderboard WHERE window_name = %(window)s;
+    INSERT INTO borrow_leaderboard (window_name, rank, book_id, borrow_count)
+    SELECT %(window)s, row_number() OVER (ORDER BY SUM(borrow_count) DESC, book_id), book_id, SUM(borrow_count)
+    FROM book_borrow_daily
+    WHERE day > CURRENT_DATE - %(days)s
+    GROUP BY book_id
+    ORDER BY SUM(borrow_count) DESC, book_id
+    LIMIT %(keep)s;
+    INSERT INTO leaderboard_refresh (window_name, computed_at) VALUES (%(window)s, now())
+    ON CONFLICT (window_name) DO UPDATE SET computed_at = EXCLUDED.computed_at;
+""", prepare=False)
+
+register("leaderboard_prune", "DELETE FROM book_borrow_daily WHERE day <= CURRENT_DATE - %(days)s;")
@@ -1,3 +1,6 @@
+from backend.cache import get_cache
+
+
 class Role:
     def __init__(self, conn=None):
         """Pass an existing connection (from User) or create a new one"""
@@ -12,32 +15,34 @@ class Role:
         """Connect to PostgreSQL database if no connection passed"""
         try:
             import psycopg2
-            self.conn = psycopg2.connect(
-                host="localhost",
-                database="smartlibrary",
-                user="postgres",        # your PostgreSQL username
-                password="your_password" # your PostgreSQL password
-            )
+            from backend.config import db_config
+            self.conn = psycopg2.connect(**db_config)
             self.cursor = self.conn.cursor()
             print("Role database connected successfully!")
         except Exception as e:
             print(f"Error connecting to database: {e}")
 
     def get_role_name(self, role_id):
+        # a failed or empty lookup raises out of the loader, so it is never cached
+        try:
+            return get_cache().get_or_load(("roles", role_id), lambda: self._load_role_name(role_id))
+        except LookupError:
+            return None
+
+    def _load_role_name(self, role_id):
         if not self.cursor:
             print("Cannot fetch role: No database connection")
-            return None
+            raise LookupError(role_id)
         try:
             query = "SELECT role_name FROM Role WHERE role_id = %s"
             self.cursor.execute(query, (role_id,))
             result = self.cursor.fetchone()
-            if result:
-                return result[0]
-            else:
-                return None
         except Exception as e:
             print(f"Error fetching role: {e}")
-            return None
+            raise LookupError(role_id)
+        if result:
+            return result[0]
+        raise LookupError(role_id)
 
     def close_connection(self):
         if self.cursor:
@@ -0,0 +1,122 @@
+import json
+import os
+import threading
+from backend.db import get_pool
+
+# Table names that differ between databases: database.sql creates "User", other
+# scripts create "user" or users. Each one is resolved once per process and the
+# answer is saved to SCHEMA_CACHE_FILE, so later starts need no probing at all.
+SCHEMA_CACHE_FILE = os.path.join(os.path.expanduser("~"), ".smartlibrary_schema.json")
+
+TABLE_CANDIDATES = {
+    "users": ["user", "user_account", "users", "User"],
+}
+
+# First candidate that exists, in one round trip; then any public table whose
+# name starts with the fallback prefix.
+RESOLVE_SQL = """
+    SELECT name FROM unnest(%s::text[]) WITH ORDINALITY AS c(name, ord)
+    WHERE to_regclass(quote_ident(name)) IS NOT NULL
+    ORDER BY ord LIMIT 1;
+"""
+
+FALLBACK_SQL = """
+    SELECT table_name FROM information_schema.tables
+    WHERE table_schema = 'public' AND table_name ILIKE %s
+    ORDER BY table_name LIMIT 1;
+"""
+
+
+def quote_identifier(name):
+    """user -> "user", User -> "User" (always quoted, so reserved words are safe)"""
+    return '"' + name.replace('"', '""') + '"'
+
+
+class SchemaCache:
+    _resolved = {}               # (host, database) -> {key: identifier}, shared by every instance
+    _guessed = set()             # (host/database, key) found only via information_schema: not saved
+    _lock = threading.Lock()
+
+    def __init__(self, db_config, path=SCHEMA_CACHE_FILE):
+        self.db_config = db_config
+        self.path = path
+        self.db_key = f"{db_config.get('host', '')}/{db_config.get('database', '')}"
+
+    @classmethod
+    def for_connection(cls, conn):
+        """The cache for the database an open psycopg2 connection is talking to"""
+        params = conn.get_dsn_parameters()
+        return cls({"host": params.get("host", ""), "database": params.get("dbname", "")})
+
+    def table(self, key, cur=None):
+        """
+        Quoted identifier for a logical table ('users'), resolved on first use
+        through cur if given, else on a pooled connection. Only a candidate
+        to_regclass resolved is saved to the file; a name guessed from
+        information_schema lasts for this process, and while no table matches
+        at all the first candidate is returned and the next call probes again.
+        """
+        with self._lock:
+            names = self._resolved.setdefault(self.db_key, self._load_file())
+            if key in names:
+                return names[key]
+            name, resolved = self._probe(key, cur)
+            if name is None:
+                return quote_identifier(TABLE_CANDIDATES[key][0])
+            names[key] = quote_identifier(name)
+            if resolved:
+                self._save_file({k: v for k, v in names.items() if (self.db_key, k) not in self._guessed})
+            else:
+                self._guessed.add((self.db_key, key))
+            return names[key]
+
+    def user_table(self):
+        return self.table("users")
+
+    def forget(self):
+        """Drop what is known about this database, e.g. after a table was renamed"""
+        with self._lock:
+            self._resolved.pop(self.db_key, None)
+            self._guessed.difference_update([g for g in self._guessed if g[0] == self.db_key])
+            self._save_file({})
+
+    def _probe(self, key, cur=None):
+        """(table name, found by to_regclass) for key; (None, False) if no table matches"""
+        candidates = TABLE_CANDIDATES[key]
+        if cur is None:
+            conn = get_pool(self.db_config).getconn()
+            try:
+                cur = conn.cursor()
+                try:
+                    return self._probe(key, cur)
+                finally:
+                    cur.close()
+            finally:
+                conn.close()
+        cur.execute(RESOLVE_SQL, (candidates,))
+        row = cur.fetchone()
+        if row is not None:
+            return row[0], True
+        cur.execute(FALLBACK_SQL, (candidates[0] + "%",))
+        row = cur.fetchone()
+        return (row[0] if row else None), False
+
+    def _load_file(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return dict(json.load(f).get(self.db_key, {}))
+        except (OSError, ValueError):
+            return {}
+
+    def _save_file(self, names):
+        try:
+            try:
+                with open(self.path, encoding="utf-8") as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                data = {}
+            data[self.db_key] = names
+            with open(self.path, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2)
+        except OSError as e:
+            print("Could not save schema cache:", e)
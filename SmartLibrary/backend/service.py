@@ -0,0 +1,368 @@
+import base64
+import json
+import re
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+from backend.db import get_pool
+from backend.cache import get_cache
+from backend.queries import run_query
+from backend.auth import Authenticator
+from backend.member import Member
+from backend.librarian import Librarian
+from backend.catalog import Catalog, parse_sort
+from backend.notify import ChangeListener
+
+# HTTP/JSON front end for desk PCs, kiosks and web clients. Every request runs
+# on the process-wide connection pool, catalog reads go through the page
+# cache (kept coherent across instances by change notifications, backend/notify.py),
+# and connections are kept alive (HTTP/1.1 with Content-Length on every
+# response). Login sessions are signed tokens (backend/auth.py), so the service
+# keeps no per-client state and several instances sharing SMARTLIBRARY_SECRET
+# can sit behind a plain load balancer.
+#
+#   POST   /login                  {"username", "password"} -> {"token", "user_id", "full_name", "role_id", "role_name"}
+#   POST   /logout
+#   GET    /books?q=&limit=&after=  catalog page (keyset on book_id) or ranked search when q is given
+#   GET    /books?category=&author_id=&available=1&sort=category,-title&facets=1&limit=&cursor=
+#                                  filtered, sorted page; facets adds per-category/availability counts;
+#                                  the response's "next" is the cursor of the following page
+#   GET    /loans                  the member's active loans
+#   POST   /loans                  {"book_ids": [...]} -> per-book borrow results
+#   POST   /returns                {"loan_ids": [...]} -> per-loan return results
+#   POST   /renewals               {"loan_ids": [...]} (or {} for every active loan) -> per-loan results
+#   GET    /holds                  the member's open holds
+#   POST   /holds                  {"book_id"} -> queue position for an out-of-stock book
+#   DELETE /holds/<id>
+#   POST   /authors                {"full_name"}                             (librarian)
+#   POST   /books                  {"title", "category", "isbn", "copies_available", "author_id"}  (librarian)
+#   PATCH  /books/<id>             {"copies_available"}                      (librarian)
+#   DELETE /books/<id>                                                       (librarian)
+#   GET    /members                                                          (librarian)
+#   POST   /clubs                  {"club_name", "moderator_id"}             (librarian)
+#   GET    /clubs/<id>/members                                               (librarian)
+#   POST   /clubs/<id>/members     {"member_id"}                             (librarian)
+#
+# Everything but /login and /health needs "Authorization: Bearer <token>".
+
+LIBRARIAN_ROLE = 1
+MEMBER_ROLE = 2
+CATALOG_MAX_AGE = 30   # seconds clients may reuse a catalog response
+MAX_PAGE_SIZE = 500    # largest limit= a catalog request may ask for
+
+
+class ServiceError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _int_param(query, name, default, low, high=None):
+    """Integer query parameter in [low, high]; anything else is a 400"""
+    try:
+        value = int(query.get(name, default))
+    except ValueError:
+        raise ServiceError(400, f"{name} must be an integer")
+    if value < low or (high is not None and value > high):
+        bounds = f"between {low} and {high}" if high is not None else f"at least {low}"
+        raise ServiceError(400, f"{name} must be {bounds}")
+    return value
+
+
+def _encode_cursor(row):
+    """Opaque browse cursor for the page after row"""
+    return base64.urlsafe_b64encode(json.dumps(list(row)).encode("utf-8")).decode("ascii")
+
+
+def _decode_cursor(text):
+    row = json.loads(base64.urlsafe_b64decode(text.encode("ascii")))
+    if not isinstance(row, list) or len(row) != 5:
+        raise ValueError("bad cursor")
+    return tuple(row)
+
+
+def _rows(cur, rows):
+    names = [c[0] for c in cur.description]
+    return [dict(zip(names, r)) for r in rows]
+
+
+class LibraryService:
+    def __init__(self, db_config, auth=None):
+        self.db_config = db_config
+        self.auth = auth if auth is not None else Authenticator(db_config)
+        self.routes = [
+            ("GET", r"/health", self.health, None),
+            ("POST", r"/login", self.login, None),
+            ("POST", r"/logout", self.logout, MEMBER_ROLE),
+            ("GET", r"/books", self.books, MEMBER_ROLE),
+            ("GET", r"/loans", self.active_loans, MEMBER_ROLE),
+            ("POST", r"/loans", self.borrow, MEMBER_ROLE),
+            ("POST", r"/returns", self.return_loans, MEMBER_ROLE),
+            ("POST", r"/renewals", self.renew, MEMBER_ROLE),
+            ("GET", r"/holds", self.holds, MEMBER_ROLE),
+            ("POST", r"/holds", self.place_hold, MEMBER_ROLE),
+            ("DELETE", r"/holds/(\d+)", self.cancel_hold, MEMBER_ROLE),
+            ("POST", r"/authors", self.add_author, LIBRARIAN_ROLE),
+            ("POST", r"/books", self.add_book, LIBRARIAN_ROLE),
+            ("PATCH", r"/books/(\d+)", self.update_stock, LIBRARIAN_ROLE),
+            ("DELETE", r"/books/(\d+)", self.delete_book, LIBRARIAN_ROLE),
+            ("GET", r"/members", self.members, LIBRARIAN_ROLE),
+            ("POST", r"/clubs", self.create_club, LIBRARIAN_ROLE),
+            ("GET", r"/clubs/(\d+)/members", self.club_members, LIBRARIAN_ROLE),
+            ("POST", r"/clubs/(\d+)/members", self.add_club_member, LIBRARIAN_ROLE),
+        ]
+
+    def dispatch(self, method, path, query, body, token):
+        """(status, payload, headers) for one request"""
+        allowed = False
+        for route_method, pattern, handler, role in self.routes:
+            m = re.fullmatch(pattern, path)
+            if not m:
+                continue
+            allowed = True
+            if route_method != method:
+                continue
+            user = None
+            if role is not None:
+                user = dict(self.session(token), token=token)
+                # librarians may use member routes (browsing the catalog), not the other way round
+                if role == LIBRARIAN_ROLE and user["role_id"] != LIBRARIAN_ROLE:
+                    raise ServiceError(403, "Librarian access required")
+            return handler(user, query, body, *[int(g) for g in m.groups()])
+        raise ServiceError(405 if allowed else 404, "Method not allowed" if allowed else "Not found")
+
+    def session(self, token):
+        """The caller's session, from its signed token: authorisation never touches the database"""
+        user = self.auth.authorize(token)
+        if user is None:
+            raise ServiceError(401, "Login required")
+        return user
+
+    # ---------------- Handlers ----------------
+    def health(self, user, query, body):
+        return 200, {"status": "ok", "pool": get_pool(self.db_config).stats(),
+                     "revoked_sessions": len(self.auth.sessions)}, {}
+
+    def login(self, user, query, body):
+        session = self.auth.login(body.get("username", ""), body.get("password", ""))
+        if session is None:
+            raise ServiceError(401, "Invalid username or password")
+        return 200, session, {}
+
+    def logout(self, user, query, body):
+        self.auth.logout(user["token"])
+        return 200, {"logged_out": True}, {}
+
+    def books(self, user, query, body):
+        q = query.get("q", "").strip()
+        limit = _int_param(query, "limit", 50, 1, MAX_PAGE_SIZE)
+        after = _int_param(query, "after", 0, 0)
+        offset = _int_param(query, "offset", 0, 0)
+        if q:
+            # a failed search raises (a 500), so only real results are cached
+            key = ("books", "search", q, limit, offset)
+            rows = get_cache("books").get_or_load(
+                key, lambda: Catalog(self.db_config).search_books(q, limit, offset))
+            books = [{"book_id": r[0], "title": r[1], "category": r[2], "isbn": r[3],
+                      "copies_available": r[4], "rank": r[5]} for r in rows]
+        elif any(k in query for k in ("category", "author_id", "available", "sort", "facets")):
+            return self._browse(query, limit)
+        else:
+            books = get_cache("books").get_or_load(("books", "page", after, limit),
+                                                   lambda: self._catalog_page(after, limit))
+        return 200, {"books": books}, {"Cache-Control": f"max-age={CATALOG_MAX_AGE}"}
+
+    def _browse(self, query, limit):
+        category = query.get("category") or None
+        author_id = int(query["author_id"]) if query.get("author_id") else None
+        available = query.get("available", "") in ("1", "true", "yes")
+        sort = tuple(parse_sort(query.get("sort", "title")))
+        facets = query.get("facets", "") in ("1", "true", "yes")
+        after = _decode_cursor(query["cursor"]) if query.get("cursor") else None
+        key = ("books", "browse", category, author_id, available, sort, limit, after, facets)
+        result = get_cache("books").get_or_load(key, lambda: Catalog(self.db_config).browse(
+            category, author_id, available, sort, limit, after, facets))
+        books = [{"book_id": r[0], "title": r[1], "category": r[2], "isbn": r[3],
+                  "copies_available": r[4]} for r in result["books"]]
+        next_cursor = _encode_cursor(result["books"][-1]) if len(result["books"]) == limit else None
+        payload = {"books": books, "facets": result["facets"], "next": next_cursor}
+        return 200, payload, {"Cache-Control": f"max-age={CATALOG_MAX_AGE}"}
+
+    def _catalog_page(self, after, limit):
+        conn = get_pool(self.db_config).getconn()
+        cur = conn.cursor()
+        try:
+            run_query(cur, "catalog_page", (after, limit))
+            return _rows(cur, cur.fetchall())
+        finally:
+            cur.close()
+            conn.close()
+
+    def _member(self, user):
+        return Member(self.db_config, user["user_id"], user["full_name"], user["role_id"])
+
+    def active_loans(self, user, query, body):
+        loans = self._member(user).view_active_loans()
+        if loans is None:
+            raise ServiceError(500, "Could not load loans")
+        return 200, {"loans": [{"loan_id": l[0], "title": l[1], "borrow_date": l[2], "due_date": l[3]}
+                               for l in loans]}, {}
+
+    def borrow(self, user, query, body):
+        book_ids = [int(b) for b in body.get("book_ids", [])]
+        if not book_ids:
+            raise ServiceError(400, "book_ids is required")
+        return 200, {"results": self._member(user).borrow_books(book_ids)}, {}
+
+    def return_loans(self, user, query, body):
+        loan_ids = [int(l) for l in body.get("loan_ids", [])]
+        if not loan_ids:
+            raise ServiceError(400, "loan_ids is required")
+        member = self._member(user)
+        if user["role_id"] != LIBRARIAN_ROLE:
+            # members may only return their own loans
+            own = {l[0] for l in member.view_active_loans() or []}
+            if not set(loan_ids) <= own:
+                raise ServiceError(403, "Not your loan")
+        return 200, {"results": member.return_books(loan_ids)}, {}
+
+    def renew(self, user, query, body):
+        member = self._member(user)
+        if "loan_ids" in body:
+            # renew_loans only touches the caller's own loans (member_id is in the WHERE)
+            results = member.renew_loans([int(l) for l in body["loan_ids"]])
+        else:
+            results = member.renew_all()
+        return 200, {"results": results}, {}
+
+    def holds(self, user, query, body):
+        rows = self._member(user).view_holds()
+        if rows is None:
+            raise ServiceError(500, "Could not load holds")
+        return 200, {"holds": [{"hold_id": r[0], "book_id": r[1], "title": r[2], "status": r[3],
+                                "created_at": r[4], "position": r[5]} for r in rows]}, {}
+
+    def place_hold(self, user, query, body):
+        result = self._member(user).place_hold(int(body["book_id"]))
+        if result["status"] == "error":
+            raise ServiceError(500, "Could not place hold")
+        if result["status"] == "not_found":
+            raise ServiceError(404, "Book not found")
+        return (201 if result["status"] == "queued" else 200), result, {}
+
+    def cancel_hold(self, user, query, body, hold_id):
+        if not self._member(user).cancel_hold(hold_id):
+            raise ServiceError(404, "Hold not found")
+        return 200, {"hold_id": hold_id, "cancelled": True}, {}
+
+    def _librarian(self, user):
+        return Librarian(self.db_config, user["user_id"], user["full_name"])
+
+    def _created(self, key, new_id):
+        if new_id is None:
+            raise ServiceError(400, "Could not create record")
+        return 201, {key: new_id}, {}
+
+    def add_author(self, user, query, body):
+        return self._created("author_id", self._librarian(user).add_author(body["full_name"]))
+
+    def add_book(self, user, query, body):
+        book_id = self._librarian(user).add_book(
+            body["title"], body.get("category"), body.get("isbn"),
+            int(body.get("copies_available", 0)), body.get("author_id"))
+        return self._created("book_id", book_id)
+
+    def update_stock(self, user, query, body, book_id):
+        if not self._librarian(user).update_book_stock(book_id, int(body["copies_available"])):
+            raise ServiceError(404, "Book not found")
+        return 200, {"book_id": book_id, "copies_available": int(body["copies_available"])}, {}
+
+    def delete_book(self, user, query, body, book_id):
+        if not self._librarian(user).delete_book(book_id):
+            raise ServiceError(404, "Book not found")
+        return 200, {"book_id": book_id, "deleted": True}, {}
+
+    def members(self, user, query, body):
+        rows = self._librarian(user).view_all_members()
+        if rows is None:
+            raise ServiceError(500, "Could not load members")
+        return 200, {"members": [{"user_id": r[0], "full_name": r[1], "username": r[2], "email": r[3]}
+                                 for r in rows]}, {}
+
+    def create_club(self, user, query, body):
+        return self._created("club_id", self._librarian(user).create_book_club(
+            body["club_name"], body.get("moderator_id")))
+
+    def club_members(self, user, query, body, club_id):
+        rows = self._librarian(user).view_club_members(club_id)
+        if rows is None:
+            raise ServiceError(500, "Could not load club members")
+        return 200, {"members": [{"user_id": r[0], "full_name": r[1]} for r in rows]}, {}
+
+    def add_club_member(self, user, query, body, club_id):
+        if not self._librarian(user).add_member_to_club(club_id, int(body["member_id"])):
+            raise ServiceError(400, "Could not add member to club")
+        return 201, {"club_id": club_id, "member_id": int(body["member_id"])}, {}
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # keep-alive: clients reuse one TCP connection
+    service = None                  # set by serve()
+
+    def _handle(self, method):
+        status, payload, headers = 500, {"error": "Internal error"}, {}
+        try:
+            url = urlsplit(self.path)
+            query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            length = int(self.headers.get("Content-Length") or 0)
+            body = json.loads(self.rfile.read(length) or b"{}") if length else {}
+            auth = self.headers.get("Authorization", "")
+            token = auth[7:] if auth.startswith("Bearer ") else None
+            status, payload, headers = self.service.dispatch(method, url.path.rstrip("/") or "/",
+                                                             query, body, token)
+        except ServiceError as e:
+            status, payload = e.status, {"error": str(e)}
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            status, payload = 400, {"error": f"Bad request: {e}"}
+        except Exception as e:
+            print("Error handling request:", e)
+
+        data = json.dumps(payload, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_PATCH(self):
+        self._handle("PATCH")
+
+    def do_DELETE(self):
+        self._handle("DELETE")
+
+    def log_message(self, format, *args):
+        pass   # one line per request is too chatty for a busy desk
+
+
+def serve(db_config, host="127.0.0.1", port=8080):
+    """Serve until interrupted; pass host="0.0.0.0" to accept other machines"""
+    handler = type("LibraryRequestHandler", (RequestHandler,), {"service": LibraryService(db_config)})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    # writes made through other instances or desks drop this instance's cached catalog pages
+    listener = ChangeListener(db_config).start()
+    print(f"SmartLibrary service listening on http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        listener.stop()
+        server.server_close()
@@ -0,0 +1,39 @@
+from backend.db import get_pool
+from backend.queries import run_query
+
+
+class LibraryStats:
+    def __init__(self, db_config):
+        self.db_config = db_config
+
+    def connect(self):
+        return get_pool(self.db_config).getconn()
+
+    def dashboard_stats(self, limit=5):
+        """
+        All dashboard figures in one round trip:
+        {'books', 'members', 'active_loans', 'most_borrowed': [(book_id, title, count), ...]}
+        Uses the trigger-maintained counters when they exist, live counts otherwise.
+        """
+        conn = self.connect()
+        cur = conn.cursor()
+        try:
+            try:
+                run_query(cur, "dashboard_counters", {"limit": limit})
+                row = cur.fetchone()
+                if None in row[:3]:
+                    raise LookupError("library_counters not seeded")
+            except Exception:
+                conn.rollback()
+                run_query(cur, "dashboard_live", {"limit": limit})
+                row = cur.fetchone()
+            books, members, active_loans, most = row
+            return {
+                "books": books,
+                "members": members,
+                "active_loans": active_loans,
+                "most_borrowed": [tuple(r) for r in most or []],
+            }
+        finally:
+            cur.close()
+            conn.close()
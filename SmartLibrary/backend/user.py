@@ -1,28 +1,19 @@
-import psycopg2
+from contextlib import closing
+from backend.db import get_pool
+from backend.auth import check_credentials
 
 class User:
     def __init__(self, db_config):
         self.db_config = db_config
 
     def connect(self):
-        return psycopg2.connect(**self.db_config)
+        return get_pool(self.db_config).getconn()
 
     def login(self, username, password):
+        """(user_id, full_name, role_id), or None if the credentials are wrong"""
         try:
-            conn = self.connect()
-            cur = conn.cursor()
-
-            cur.execute("""
-                SELECT user_id, full_name, role_id
-                FROM "User"
-                WHERE username = %s AND password = %s;
-            """, (username, password))
-
-            row = cur.fetchone()
-            cur.close()
-            conn.close()
-
-            return row
+            with closing(self.connect()) as conn:
+                return check_credentials(conn, username, password)
 
         except Exception as e:
             print("Error during login:", e)
@@ -0,0 +1,84 @@
+"""
+Load test for backend/async_api.py. Run from the SmartLibrary directory against
+a live database (settings from backend/config.py; needs asyncpg):
+
+    python -m benchmarks.async_load --clients 200 --ops 50
+
+Every client starts at once on a cold process, so the first get_async_pool()
+calls all miss together; exactly one pool should be created. Each client then
+loops over a catalog page read and, every --login-every operations, a login
+for a username that does not exist (a full PBKDF2 check in the executor).
+Latencies are reported per operation kind.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from backend import async_api
+from backend.async_api import AsyncUser, fetch, get_async_pool, close_async_pools
+from backend.config import db_config
+
+
+async def catalog_page():
+    pool = await get_async_pool(db_config)
+    async with pool.acquire() as conn:
+        await fetch(conn, "catalog_page", (0, 50))
+
+
+async def client(n, ops, login_every, timings):
+    user = AsyncUser(db_config)
+    for i in range(ops):
+        if login_every and i % login_every == 0:
+            kind, call = "login miss", user.login(f"load-test-{n}-{i}", "wrong password")
+        else:
+            kind, call = "catalog page", catalog_page()
+        started = time.perf_counter()
+        await call
+        timings.setdefault(kind, []).append(time.perf_counter() - started)
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+async def run(clients, ops, login_every):
+    timings = {}
+    created = 0
+    create_pool = async_api.asyncpg.create_pool
+
+    def counting_create_pool(*args, **kwargs):
+        nonlocal created
+        created += 1
+        return create_pool(*args, **kwargs)
+
+    async_api.asyncpg.create_pool = counting_create_pool
+    try:
+        began = time.perf_counter()
+        await asyncio.gather(*(client(n, ops, login_every, timings) for n in range(clients)))
+        seconds = time.perf_counter() - began
+    finally:
+        async_api.asyncpg.create_pool = create_pool
+        await close_async_pools()
+    return seconds, created, timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test backend/async_api.py")
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--ops", type=int, default=50, help="operations per client")
+    parser.add_argument("--login-every", type=int, default=10,
+                        help="every Nth operation is a failed login (0: never)")
+    args = parser.parse_args()
+
+    seconds, created, timings = asyncio.run(run(args.clients, args.ops, args.login_every))
+    total = args.clients * args.ops
+    print(f"{total} operations from {args.clients} clients in {seconds:.2f} s "
+          f"({total / seconds:,.0f} ops/s), {created} pool(s) created")
+    for kind, values in sorted(timings.items()):
+        print(f"{kind:13} n={len(values):<6} p50 {statistics.median(values) * 1000:7.1f} ms  "
+              f"p95 {percentile(values, 0.95) * 1000:7.1f} ms  max {max(values) * 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
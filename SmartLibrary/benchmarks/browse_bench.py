@@ -0,0 +1,114 @@
+"""
+Catalog browse benchmark (backend/catalog.py Catalog.browse). Run from the
+SmartLibrary directory against a scratch database, which is migrated and
+filled up to --books books first:
+
+    python -m benchmarks.browse_bench --database smartlibrary_bench --books 1000000
+
+For each filter/sort case it times the first page with facet counts and then
+--pages keyset pages after it, and prints the indexes the page query uses.
+One book in five is out of stock, so "available only" shows what the partial
+indexes of 0018_in_stock_browse_indexes.sql buy.
+"""
+import argparse
+import json
+import statistics
+import time
+from contextlib import closing
+from backend.catalog import Catalog, browse_query
+from backend.db import get_pool
+from backend.queries import QUERIES
+from benchmarks.seed import add_database_argument, bench_config, seed_books
+
+TITLE = (("title", "asc"),)
+CASES = [
+    ("all, title", {}, TITLE),
+    ("all, title desc", {}, (("title", "desc"),)),
+    ("all, in stock first", {}, (("available", "desc"), ("title", "asc"))),
+    ("category", {"category": "History"}, TITLE),
+    ("available", {"available": True}, TITLE),
+    ("category + available", {"category": "History", "available": True}, TITLE),
+    ("author", {"author_id": "sample"}, TITLE),
+    ("all, category then title", {}, (("category", "asc"), ("title", "asc"))),
+]
+
+
+def index_names(plan):
+    """Names of the indexes anywhere in an EXPLAIN (FORMAT JSON) plan node"""
+    names = [plan["Index Name"]] if "Index Name" in plan else []
+    for child in plan.get("Plans", []):
+        names += index_names(child)
+    return names
+
+
+def plan_indexes(config, filters, sort, params):
+    name = browse_query(filters, sort, facets=False)
+    with closing(get_pool(config).getconn()) as conn, closing(conn.cursor()) as cur:
+        cur.execute("EXPLAIN (FORMAT JSON) " + QUERIES[name].sql, params)
+        plan = cur.fetchone()[0]
+        conn.rollback()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return sorted(set(index_names(plan[0]["Plan"]))) or ["(none: sequential scan)"]
+
+
+def run_case(catalog, filters, sort, pages, page_size):
+    """Seconds for the first page (with facets) and for each following page"""
+    kwargs = dict(category=filters.get("category"), author_id=filters.get("author_id"),
+                  available=filters.get("available", False), sort=sort, limit=page_size)
+    began = time.perf_counter()
+    result = catalog.browse(facets=True, **kwargs)
+    first = time.perf_counter() - began
+    rest = []
+    books = result["books"]
+    for _ in range(pages):
+        if len(books) < page_size:
+            break
+        began = time.perf_counter()
+        books = catalog.browse(after=books[-1], **kwargs)["books"]
+        rest.append(time.perf_counter() - began)
+    return first, rest
+
+
+def sample_author(config):
+    """The author with the most books, so the author filter has pages to walk"""
+    with closing(get_pool(config).getconn()) as conn, closing(conn.cursor()) as cur:
+        cur.execute("SELECT author_id FROM bookauthors GROUP BY author_id ORDER BY COUNT(*) DESC LIMIT 1;")
+        row = cur.fetchone()
+        conn.rollback()
+    return row[0] if row else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Catalog.browse on a generated catalog")
+    add_database_argument(parser)
+    parser.add_argument("--books", type=int, default=1_000_000)
+    parser.add_argument("--pages", type=int, default=20, help="keyset pages after the first")
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5, help="runs of each case")
+    args = parser.parse_args()
+
+    config = bench_config(args.database)
+    seed_books(config, args.books)
+    catalog = Catalog(config)
+    author_id = sample_author(config)
+
+    for label, filters, sort in CASES:
+        if filters.get("author_id") == "sample":
+            filters = dict(filters, author_id=author_id)
+        firsts, rests = [], []
+        run_case(catalog, filters, sort, args.pages, args.page_size)  # warm up
+        for _ in range(args.repeat):
+            first, rest = run_case(catalog, filters, sort, args.pages, args.page_size)
+            firsts.append(first)
+            rests += rest
+        params = {"category": filters.get("category"), "author_id": filters.get("author_id"),
+                  "limit": args.page_size}
+        used = plan_indexes(config, [f for f, v in filters.items() if v], sort, params)
+        deeper = f"next pages p50 {statistics.median(rests) * 1000:6.1f} ms" if rests else "no further pages"
+        print(f"{label:26} first page + facets p50 {statistics.median(firsts) * 1000:7.1f} ms, "
+              f"{deeper}  [{', '.join(used)}]")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Overdue scan and fine computation (backend/fines.py FineEngine) over millions
+of active loans. Run from the SmartLibrary directory against a scratch
+database, which is migrated and filled up to --loans active loans first;
+loan_fines and fine_runs are emptied so every run starts from scratch:
+
+    python -m benchmarks.fines_bench --database smartlibrary_bench --loans 2000000
+
+scan         the overdue predicate alone (loan_active_due_date_idx)
+first run    every overdue loan gets its fine: the full scan plus one
+             reassessment of each fine in --batch-size batches
+next day     the incremental run: only loans due in the one new day are
+             scanned, then the open fines are brought up to date
+same day     a re-run with nothing new to do
+"""
+import argparse
+import time
+from contextlib import closing
+from datetime import date, timedelta
+from backend.db import get_pool
+from backend.fines import FineEngine
+from benchmarks.seed import add_database_argument, bench_config, seed_active_loans, seed_books, seed_members
+
+SCAN_SQL = "SELECT COUNT(*) FROM loan WHERE returned = FALSE AND due_date < %s;"
+
+
+def execute(config, sql, params=None):
+    with closing(get_pool(config).getconn()) as conn, closing(conn.cursor()) as cur:
+        cur.execute(sql, params)
+        row = cur.fetchone() if cur.description else None
+        conn.commit()
+        return row
+
+
+def timed_run(engine, as_of):
+    began = time.perf_counter()
+    result = engine.run(as_of)
+    return time.perf_counter() - began, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the overdue fine engine")
+    add_database_argument(parser)
+    parser.add_argument("--books", type=int, default=100_000)
+    parser.add_argument("--members", type=int, default=50_000)
+    parser.add_argument("--loans", type=int, default=2_000_000, help="active loans")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    config = bench_config(args.database)
+    seed_books(config, args.books)
+    seed_members(config, args.members)
+    seed_active_loans(config, args.loans)
+    execute(config, "TRUNCATE loan_fines, fine_runs;")
+
+    today = date.today()
+    engine = FineEngine(config, batch_size=args.batch_size, pause=0)
+    cutoff = today - timedelta(days=engine.grace_days)
+
+    began = time.perf_counter()
+    overdue = execute(config, SCAN_SQL, (cutoff,))[0]
+    print(f"scan:      {overdue:,} overdue loans found in {(time.perf_counter() - began) * 1000:.0f} ms")
+
+    for label, as_of in (("first run", today), ("next day", today + timedelta(days=1)),
+                         ("same day", today + timedelta(days=1))):
+        seconds, result = timed_run(engine, as_of)
+        print(f"{label + ':':10} {seconds:7.2f} s  {result['new_fines']:,} new, "
+              f"{result['reassessed']:,} reassessed ({result['reassessed'] / seconds:,.0f} fines/s)")
+
+
+if __name__ == "__main__":
+    main()
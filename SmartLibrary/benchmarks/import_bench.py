@@ -0,0 +1,92 @@
+"""
+Catalog import throughput (backend/importer.py CatalogImporter). Run from the
+SmartLibrary directory against a scratch database (it is migrated first;
+every run adds new books):
+
+    python -m benchmarks.import_bench --database smartlibrary_bench --rows 50000
+
+Writes --rows generated records as CSV and as JSON Lines to a temporary
+directory, with --duplicates of them repeating an ISBN and authors drawn from
+a small pool, and imports each file. For comparison, --baseline-rows books
+go in the way the Books page adds one: a checkout, one INSERT and a commit
+per book.
+"""
+import argparse
+import csv
+import json
+import os
+import tempfile
+import time
+from contextlib import closing
+from backend.db import get_pool
+from backend.importer import CatalogImporter
+from backend.queries import run_query
+from benchmarks.seed import CATEGORIES, WORDS, add_database_argument, bench_config
+
+
+def records(rows, duplicates, run):
+    """Generated book records; ISBNs carry the run number so reruns don't collide"""
+    every = round(1 / duplicates) if duplicates else 0
+    for i in range(rows):
+        number = i - 1 if every and i and i % every == 0 else i  # repeats the previous ISBN
+        yield {
+            "title": f"{WORDS[i % len(WORDS)].title()} {WORDS[(i // 7) % len(WORDS)]} {i}",
+            "category": CATEGORIES[i % len(CATEGORIES)],
+            "isbn": f"{run:06d}{number:09d}",
+            "copies": 1 + i % 4,
+            "authors": f"{WORDS[i % 29].title()} {WORDS[i % 31].title()}; {WORDS[i % 13].title()} Editor",
+        }
+
+
+def write_files(directory, rows, duplicates, run):
+    paths = {"csv": os.path.join(directory, "books.csv"), "jsonl": os.path.join(directory, "books.jsonl")}
+    with open(paths["csv"], "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["title", "category", "isbn", "copies", "authors"])
+        writer.writeheader()
+        writer.writerows(records(rows, duplicates, run))
+    with open(paths["jsonl"], "w", encoding="utf-8") as f:
+        for record in records(rows, duplicates, run + 1):
+            f.write(json.dumps(record) + "\n")
+    return paths
+
+
+def one_at_a_time(config, rows, run):
+    pool = get_pool(config)
+    began = time.perf_counter()
+    for i in range(rows):
+        with closing(pool.getconn()) as conn, closing(conn.cursor()) as cur:
+            run_query(cur, "create_book", (f"Single insert {i}", "Reference", f"{run:06d}{i:09d}", 1))
+            conn.commit()
+    return time.perf_counter() - began
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the bulk catalog import")
+    add_database_argument(parser)
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--duplicates", type=float, default=0.02,
+                        help="fraction of records repeating the previous record's ISBN")
+    parser.add_argument("--baseline-rows", type=int, default=2000)
+    args = parser.parse_args()
+
+    config = bench_config(args.database)
+    run = int(time.time()) % 100_000 * 10  # run, run + 1, run + 2: CSV, JSON Lines, single INSERTs
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = write_files(directory, args.rows, args.duplicates, run)
+        for fmt, path in paths.items():
+            stats = CatalogImporter(config, chunk_size=args.chunk_size).import_file(path, fmt)
+            print(f"{fmt:6} {stats['read']:,} records in {stats['seconds']:.2f} s "
+                  f"({stats['read'] / stats['seconds']:,.0f} rows/s): {stats['books_added']:,} added, "
+                  f"{stats['duplicates']:,} duplicates, {stats['rejected']:,} rejected, "
+                  f"{stats['author_links']:,} author links, {stats['chunks']} chunks")
+
+    if args.baseline_rows:
+        seconds = one_at_a_time(config, args.baseline_rows, run + 2)
+        print(f"single {args.baseline_rows:,} INSERTs in {seconds:.2f} s "
+              f"({args.baseline_rows / seconds:,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
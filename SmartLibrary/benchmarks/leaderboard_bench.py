@@ -0,0 +1,77 @@
+"""
+Most-borrowed leaderboard benchmark (backend/leaderboard.py) against the
+GROUP BY over all of loan the dashboard used to run. Run from the SmartLibrary
+directory against a scratch database, which is migrated and filled up to
+--loans loans first (that takes a while the first time):
+
+    python -m benchmarks.leaderboard_bench --database smartlibrary_bench --loans 10000000
+
+aggregate  COUNT(*) per book over loan (all time, or borrow_date in the window)
+top()      Leaderboard.top(window, 5) with the window's precomputed rows fresh
+refresh    Leaderboard.refresh(): every window recomputed from book_borrow_daily
+"""
+import argparse
+import statistics
+import time
+from contextlib import closing
+from backend.db import get_pool
+from backend.leaderboard import Leaderboard, WINDOWS
+from backend.queries import MOST_BORROWED_SQL
+from benchmarks.seed import add_database_argument, bench_config, seed_books, seed_loans, seed_members
+
+WINDOW_AGGREGATE_SQL = """
+    SELECT b.book_id, b.title, COUNT(*) AS cnt
+    FROM loan l JOIN book b ON l.book_id = b.book_id
+    WHERE l.borrow_date >= CURRENT_DATE - %(days)s
+    GROUP BY b.book_id, b.title
+    ORDER BY cnt DESC
+    LIMIT %(limit)s;
+"""
+
+
+def timed(fn, repeat):
+    """Median milliseconds of `repeat` calls"""
+    seconds = []
+    for _ in range(repeat):
+        began = time.perf_counter()
+        fn()
+        seconds.append(time.perf_counter() - began)
+    return statistics.median(seconds) * 1000
+
+
+def aggregate(config, window):
+    with closing(get_pool(config).getconn()) as conn, closing(conn.cursor()) as cur:
+        if window == "all":
+            cur.execute(MOST_BORROWED_SQL, {"limit": 5})
+        else:
+            cur.execute(WINDOW_AGGREGATE_SQL, {"days": WINDOWS[window], "limit": 5})
+        cur.fetchall()
+        conn.rollback()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the most-borrowed leaderboard")
+    add_database_argument(parser)
+    parser.add_argument("--books", type=int, default=100_000)
+    parser.add_argument("--members", type=int, default=10_000)
+    parser.add_argument("--loans", type=int, default=10_000_000)
+    parser.add_argument("--repeat", type=int, default=5, help="runs of each query")
+    args = parser.parse_args()
+
+    config = bench_config(args.database)
+    seed_books(config, args.books)
+    seed_members(config, args.members)
+    seed_loans(config, args.loans)
+    leaderboard = Leaderboard(config)
+    leaderboard.refresh()
+
+    print(f"{'window':6} {'aggregate':>12} {'top()':>10}")
+    for window in ["all"] + list(WINDOWS):
+        slow = timed(lambda: aggregate(config, window), args.repeat)
+        fast = timed(lambda: leaderboard.top(window, 5), args.repeat)
+        print(f"{window:6} {slow:9.1f} ms {fast:7.2f} ms")
+    print(f"refresh {timed(leaderboard.refresh, args.repeat):.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Login throughput (backend/auth.py Authenticator) under concurrent attempts.
+Run from the SmartLibrary directory against a scratch database (migrated
+first; --users bench members get a known password):
+
+    python -m benchmarks.login_bench --database smartlibrary_bench --threads 16 --logins 50
+
+Each thread logs in --logins times, cycling through a correct password, a
+wrong one and an unknown username; every attempt costs one PBKDF2 check at
+--iterations rounds. authorize() is then timed on the issued tokens: it
+verifies the signature and needs no database round trip.
+"""
+import argparse
+import statistics
+import threading
+import time
+from contextlib import closing
+from backend.auth import Authenticator, SessionTokens, hash_password
+from backend.db import get_pool
+from backend.queries import users_table
+from benchmarks.seed import add_database_argument, bench_config, seed_members
+
+PASSWORD = "bench-password"
+
+
+def set_passwords(config, users, iterations):
+    stored = hash_password(PASSWORD, iterations)
+    with closing(get_pool(config).getconn()) as conn, closing(conn.cursor()) as cur:
+        cur.execute(f"UPDATE {users_table(cur)} SET password = %s "
+                    "WHERE username = ANY(%s) AND password IS DISTINCT FROM %s;",
+                    (stored, [f"bench_member_{i}" for i in range(1, users + 1)], stored))
+        conn.commit()
+
+
+def attempts(n, thread, users):
+    """(username, password, expected to succeed) for one thread"""
+    for i in range(n):
+        user = f"bench_member_{1 + (thread * n + i) % users}"
+        kind = i % 3
+        if kind == 0:
+            yield user, PASSWORD, True
+        elif kind == 1:
+            yield user, "wrong password", False
+        else:
+            yield f"nobody_{thread}_{i}", PASSWORD, False
+
+
+def run(auth, threads, logins, users):
+    timings, tokens, failures = {}, [], []
+    lock = threading.Lock()
+    start = threading.Barrier(threads + 1)
+
+    def worker(thread):
+        start.wait()
+        for username, password, ok in attempts(logins, thread, users):
+            began = time.perf_counter()
+            session = auth.login(username, password)
+            seconds = time.perf_counter() - began
+            kind = "success" if ok else ("wrong password" if username.startswith("bench") else "unknown user")
+            with lock:
+                timings.setdefault(kind, []).append(seconds)
+                if (session is not None) != ok:
+                    failures.append(username)
+                elif session:
+                    tokens.append(session["token"])
+
+    workers = [threading.Thread(target=worker, args=(t,)) for t in range(threads)]
+    for w in workers:
+        w.start()
+    start.wait()
+    began = time.perf_counter()
+    for w in workers:
+        w.join()
+    return time.perf_counter() - began, timings, tokens, failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Authenticator.login under concurrency")
+    add_database_argument(parser)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--logins", type=int, default=50, help="attempts per thread")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--iterations", type=int, default=None,
+                        help="PBKDF2 rounds (default: backend/auth.py DEFAULT_ITERATIONS)")
+    args = parser.parse_args()
+
+    # a pool of its own (the extra key), one connection per thread
+    config = dict(bench_config(args.database), application_name="login_bench")
+    get_pool(config, maxconn=args.threads)
+    seed_members(config, args.users)
+    auth = Authenticator(config, sessions=SessionTokens("benchmark secret"),
+                         **({"iterations": args.iterations} if args.iterations else {}))
+    set_passwords(config, args.users, auth.iterations)
+
+    seconds, timings, tokens, failures = run(auth, args.threads, args.logins, args.users)
+    total = args.threads * args.logins
+    print(f"{total} logins from {args.threads} threads in {seconds:.2f} s "
+          f"({total / seconds:,.1f} logins/s, {auth.iterations:,} rounds), "
+          f"{len(failures)} unexpected results")
+    for kind, values in sorted(timings.items()):
+        print(f"  {kind:14} p50 {statistics.median(values) * 1000:7.1f} ms  max {max(values) * 1000:7.1f} ms")
+
+    began = time.perf_counter()
+    for token in tokens * 100:
+        auth.authorize(token)
+    checks = len(tokens) * 100
+    if checks:
+        print(f"authorize: {checks / (time.perf_counter() - began):,.0f} checks/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Time to the login screen, to a loaded dashboard after login, and the GUI's
+memory along the way (request user-019). Run from the SmartLibrary directory
+against a live database (settings from backend/config.py) with a real
+account:
+
+    python -m benchmarks.pages_bench --username librarian1 --password secret
+
+The window runs offscreen. After login every page the account can open is
+visited once (built and loaded on that first visit) and then again, which
+should cost no query while its data is fresh. Memory is the process's peak
+resident set size (Unix).
+"""
+import argparse
+import os
+import resource
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtWidgets import QApplication  # noqa: E402
+from GUI.gui_app import MainWindow, PAGES, User, Librarian, Member, db_config  # noqa: E402
+
+MEMBER_PAGES = ["dashboard", "catalog", "loans"]
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def wait_idle(app, window, timeout=60):
+    """Process events until no background query is pending"""
+    deadline = time.monotonic() + timeout
+    app.processEvents()
+    while window.db.pending:
+        if time.monotonic() > deadline:
+            raise TimeoutError("background queries still running")
+        app.processEvents()
+        time.sleep(0.001)
+
+
+def report(stage, began):
+    print(f"{stage:34} {(time.perf_counter() - began) * 1000:8.1f} ms   peak RSS {peak_rss_mb():6.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark time-to-login and page loading in the GUI")
+    parser.add_argument("--username", required=True)
+    parser.add_argument("--password", required=True)
+    args = parser.parse_args()
+
+    print(f"{'after imports':34} {'':>11}   peak RSS {peak_rss_mb():6.1f} MB")
+    began = time.perf_counter()
+    app = QApplication([])
+    window = MainWindow()
+    window.show()
+    app.processEvents()
+    report("login screen shown", began)
+
+    began = time.perf_counter()
+    row = User(db_config).login(args.username, args.password)
+    if not row:
+        parser.error("login failed")
+    user_id, full_name, role_id = row
+    # what LoginPage.finish_login does, minus the welcome dialog
+    if role_id == 1:
+        window.current_user = {'id': user_id, 'name': full_name, 'role': 'librarian', 'role_id': role_id}
+        window.backend_user = Librarian(db_config, user_id, full_name)
+        window.setup_for_librarian()
+        pages = list(PAGES)
+    else:
+        window.current_user = {'id': user_id, 'name': full_name, 'role': 'member', 'role_id': role_id}
+        window.backend_user = Member(db_config, user_id, full_name, role_id)
+        window.setup_for_member()
+        pages = MEMBER_PAGES
+    window.switch_to_main()
+    wait_idle(app, window)
+    report("login to loaded dashboard", began)
+
+    for visit in ("first visit", "revisit"):
+        for name in pages:
+            began = time.perf_counter()
+            window.show_page(name)
+            wait_idle(app, window)
+            report(f"{visit}: {name}", began)
+
+    if window.listener:
+        window.listener.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Connection pool benchmark. Run from the SmartLibrary directory against a live
+database (settings from backend/config.py):
+
+    python -m benchmarks.pool_bench --threads 16 --ops 200
+
+cold start  every thread checks out at once from an empty pool, so each one
+            opens its own connection; with connects done outside the pool
+            lock this takes about one connect, not one per thread
+steady      each thread runs checkout / SELECT 1 / close in a loop
+direct      the same loop with a fresh psycopg2.connect() per operation
+"""
+import argparse
+import threading
+import time
+import psycopg2
+from backend.config import db_config
+from backend.db import ConnectionPool
+
+
+def run_threads(threads, fn):
+    """Start `threads` threads on fn together; seconds until the last finishes"""
+    start = threading.Barrier(threads + 1)
+
+    def worker():
+        start.wait()
+        fn()
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for w in workers:
+        w.start()
+    start.wait()
+    began = time.perf_counter()
+    for w in workers:
+        w.join()
+    return time.perf_counter() - began
+
+
+def select_one(conn):
+    cur = conn.cursor()
+    try:
+        cur.execute("SELECT 1;")
+        cur.fetchone()
+    finally:
+        cur.close()
+
+
+def cold_start(threads):
+    pool = ConnectionPool(db_config, minconn=0, maxconn=threads)
+    held, held_lock = [], threading.Lock()
+
+    def checkout():
+        conn = pool.getconn()
+        with held_lock:
+            held.append(conn)
+
+    seconds = run_threads(threads, checkout)
+    for conn in held:
+        conn.close()
+    pool.closeall()
+    return seconds
+
+
+def steady(threads, ops):
+    pool = ConnectionPool(db_config, minconn=1, maxconn=threads)
+
+    def loop():
+        for _ in range(ops):
+            conn = pool.getconn()
+            try:
+                select_one(conn)
+            finally:
+                conn.close()
+
+    seconds = run_threads(threads, loop)
+    stats = pool.stats()
+    pool.closeall()
+    return seconds, stats
+
+
+def direct(threads, ops):
+    def loop():
+        for _ in range(ops):
+            conn = psycopg2.connect(**db_config)
+            try:
+                select_one(conn)
+            finally:
+                conn.close()
+
+    return run_threads(threads, loop)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark backend/db.py ConnectionPool")
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--ops", type=int, default=200, help="operations per thread")
+    args = parser.parse_args()
+    total = args.threads * args.ops
+
+    seconds = cold_start(args.threads)
+    print(f"cold start: {args.threads} checkouts in {seconds * 1000:.0f} ms")
+
+    seconds, stats = steady(args.threads, args.ops)
+    print(f"steady:     {total / seconds:,.0f} ops/s  "
+          f"({stats['connects']} connects, {stats['waits']} waits, "
+          f"{stats['checkouts_per_connect']:.0f} checkouts per connect)")
+
+    seconds = direct(args.threads, args.ops)
+    print(f"direct:     {total / seconds:,.0f} ops/s  ({total} connects)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Catalog search benchmark: ranked search (backend/catalog.py
+Catalog.search_books, indexes from 0001_catalog_search.sql) against the
+substring query the catalog page used to run. Run from the SmartLibrary
+directory against a scratch database, which is migrated and filled up to
+--books books first:
+
+    python -m benchmarks.search_bench --database smartlibrary_bench --books 1000000
+
+ranked        search_books(term, 50, 0)
+ilike         title ILIKE '%term%' OR category ILIKE '%term%' (the old query;
+              pg_trgm indexes from 0001 can serve it now)
+ilike, no idx the same with bitmap scans switched off, i.e. the sequential
+              scan it was before 0001
+"""
+import argparse
+import statistics
+import time
+from contextlib import closing
+from backend.catalog import Catalog
+from backend.db import get_pool
+from benchmarks.seed import add_database_argument, bench_config, seed_books
+
+TERMS = ["river", "winter gar", "sto", "glass memory", "histo", "harbor queen", "9790000012"]
+
+ILIKE_SQL = """
+    SELECT book_id, title, category, isbn, copies_available FROM book
+    WHERE title ILIKE %s OR category ILIKE %s
+    LIMIT 50;
+"""
+
+
+def timed(fn, repeat):
+    """Median seconds of `repeat` calls, and the last result"""
+    seconds = []
+    for _ in range(repeat):
+        began = time.perf_counter()
+        result = fn()
+        seconds.append(time.perf_counter() - began)
+    return statistics.median(seconds), result
+
+
+def ilike(config, term, seqscan=False):
+    with closing(get_pool(config).getconn()) as conn, closing(conn.cursor()) as cur:
+        if seqscan:
+            cur.execute("SET LOCAL enable_bitmapscan = off;")
+        cur.execute(ILIKE_SQL, (f"%{term}%", f"%{term}%"))
+        rows = cur.fetchall()
+        conn.rollback()
+        return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ranked catalog search against ILIKE")
+    add_database_argument(parser)
+    parser.add_argument("--books", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5, help="runs of each query")
+    args = parser.parse_args()
+
+    config = bench_config(args.database)
+    seed_books(config, args.books)
+    catalog = Catalog(config)
+
+    print(f"{'term':14} {'ranked':>16} {'ilike':>16} {'ilike, no idx':>16}")
+    for term in TERMS:
+        catalog.search_books(term, 50, 0)  # warm up
+        ranked, hits = timed(lambda: catalog.search_books(term, 50, 0), args.repeat)
+        plain, rows = timed(lambda: ilike(config, term), args.repeat)
+        seq, _ = timed(lambda: ilike(config, term, seqscan=True), args.repeat)
+        print(f"{term:14} {ranked * 1000:8.1f} ms ({len(hits):2}) {plain * 1000:8.1f} ms ({len(rows):2}) "
+              f"{seq * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
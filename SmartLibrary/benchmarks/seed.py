@@ -0,0 +1,146 @@
+"""
+Synthetic data for the benchmarks. They run against a scratch database named
+with --database: it is migrated first, then each table is topped up to the
+size asked for, so later runs reuse the rows already there.
+"""
+from contextlib import closing
+from backend.config import db_config
+from backend.db import get_pool
+from backend.migrate import migrate
+from backend.queries import users_table
+
+WORDS = [
+    "river", "garden", "silent", "winter", "stone", "house", "light", "shadow",
+    "empire", "ocean", "night", "history", "modern", "secret", "journey", "city",
+    "machine", "theory", "letters", "island", "summer", "forest", "glass", "fire",
+    "mountain", "queen", "engine", "mirror", "paper", "storm", "memory", "harbor",
+]
+CATEGORIES = [
+    "Fiction", "History", "Science", "Biography", "Poetry", "Travel", "Art",
+    "Philosophy", "Mathematics", "Cooking", "Music", "Law", "Medicine",
+    "Economics", "Drama", "Religion", "Sports", "Computing", "Children", "Reference",
+]
+CHUNK = 100_000  # rows per INSERT transaction
+
+# Titles of three words and a number, about 2% without a category, one book
+# in five out of stock
+BOOKS_SQL = """
+    INSERT INTO book (title, category, isbn, copies_available)
+    SELECT initcap(w[1 + (i * 7) %% n] || ' ' || w[1 + (i * 13) %% n] || ' ' || w[1 + (i / 31) %% n]) || ' ' || i,
+           CASE WHEN i %% 50 = 0 THEN NULL ELSE c[1 + i %% cardinality(c)] END,
+           '979' || lpad(i::text, 10, '0'),
+           CASE WHEN i %% 5 = 0 THEN 0 ELSE 1 + i %% 4 END
+    FROM generate_series(%(first)s, %(last)s) i,
+         (SELECT %(words)s::text[] AS w, cardinality(%(words)s::text[]) AS n, %(categories)s::text[] AS c) lists
+    ON CONFLICT (isbn) DO NOTHING;
+"""
+
+AUTHORS_SQL = """
+    INSERT INTO author (full_name)
+    SELECT initcap(w[1 + i %% n] || ' ' || w[1 + (i / n) %% n]) || ' ' || i
+    FROM generate_series(%(first)s, %(last)s) i,
+         (SELECT %(words)s::text[] AS w, cardinality(%(words)s::text[]) AS n) lists;
+"""
+
+# One author per book without one, spread round-robin over all authors
+BOOK_AUTHORS_SQL = """
+    INSERT INTO bookauthors (book_id, author_id)
+    SELECT b.book_id, a.ids[1 + b.book_id %% cardinality(a.ids)]
+    FROM book b, (SELECT array_agg(author_id ORDER BY author_id) AS ids FROM author) a
+    WHERE NOT EXISTS (SELECT 1 FROM bookauthors ba WHERE ba.book_id = b.book_id)
+    ON CONFLICT DO NOTHING;
+"""
+
+MEMBERS_SQL = """
+    WITH users AS (
+        INSERT INTO {users} (username, password, role_id, full_name)
+        SELECT 'bench_member_' || i, 'x', 2, 'Bench Member ' || i
+        FROM generate_series(%(first)s, %(last)s) i
+        ON CONFLICT (username) DO NOTHING
+        RETURNING user_id
+    )
+    INSERT INTO member (user_id) SELECT user_id FROM users;
+"""
+
+# Loans borrowed over the last %(days)s days, 14 days each, a few books far
+# more popular than the rest; %(active)s of them not yet returned
+LOANS_SQL = """
+    INSERT INTO loan (book_id, member_id, borrow_date, due_date, returned)
+    SELECT book_id, member_id, borrowed, borrowed + 14, NOT active
+    FROM (
+        SELECT ids.books[1 + LEAST(floor(cardinality(ids.books) * random() ^ 3)::int, cardinality(ids.books) - 1)] AS book_id,
+               ids.members[1 + floor(cardinality(ids.members) * random())::int %% cardinality(ids.members)] AS member_id,
+               CURRENT_DATE - floor(random() * %(days)s)::int AS borrowed,
+               random() < %(active)s AS active
+        FROM generate_series(%(first)s, %(last)s) i,
+             (SELECT (SELECT array_agg(book_id) FROM book) AS books,
+                     (SELECT array_agg(member_id) FROM member) AS members) ids
+    ) g;
+"""
+
+
+def add_database_argument(parser):
+    parser.add_argument("--database", required=True,
+                        help="scratch database to migrate and fill (other settings from backend/config.py)")
+
+
+def bench_config(database):
+    """db_config for the scratch database, with the migrations applied"""
+    config = dict(db_config, database=database)
+    migrate(config, verbose=False)
+    return config
+
+
+def count(cur, table, where="TRUE"):
+    cur.execute(f"SELECT COUNT(*) FROM {table} WHERE {where};")
+    return cur.fetchone()[0]
+
+
+def top_up(conn, table, rows, sql, params=None, where="TRUE"):
+    """Run sql over generate_series chunks until `rows` rows of table match where"""
+    with closing(conn.cursor()) as cur:
+        have = count(cur, table, where)
+        if have < rows:
+            print(f"seeding {table}: {have:,} -> {rows:,} rows")
+        while have < rows:
+            last = min(rows, have + CHUNK)
+            cur.execute(sql, dict(params or {}, first=have + 1, last=last))
+            added = cur.rowcount
+            conn.commit()
+            if not added:
+                raise RuntimeError(f"could not add rows to {table} (conflicting data?)")
+            have += added
+        cur.execute(f"ANALYZE {table};")
+        conn.commit()
+
+
+def seed_books(config, books):
+    """At least `books` books, one author per ten books, every book with an author"""
+    with closing(get_pool(config).getconn()) as conn:
+        top_up(conn, "book", books, BOOKS_SQL, {"words": WORDS, "categories": CATEGORIES})
+        top_up(conn, "author", max(1, books // 10), AUTHORS_SQL, {"words": WORDS})
+        with closing(conn.cursor()) as cur:
+            cur.execute(BOOK_AUTHORS_SQL)
+            conn.commit()
+            cur.execute("ANALYZE bookauthors;")
+            conn.commit()
+
+
+def seed_members(config, members):
+    """At least `members` members, each with a user row"""
+    with closing(get_pool(config).getconn()) as conn:
+        with closing(conn.cursor()) as cur:
+            sql = MEMBERS_SQL.format(users=users_table(cur))
+        top_up(conn, "member", members, sql)
+
+
+def seed_loans(config, loans, active=0.05, days=730):
+    """At least `loans` loans over books and members already seeded"""
+    with closing(get_pool(config).getconn()) as conn:
+        top_up(conn, "loan", loans, LOANS_SQL, {"active": active, "days": days})
+
+
+def seed_active_loans(config, loans, days=60):
+    """At least `loans` loans not yet returned, borrowed over the last `days` days"""
+    with closing(get_pool(config).getconn()) as conn:
+        top_up(conn, "loan", loans, LOANS_SQL, {"active": 1.0, "days": days}, where="returned = FALSE")
@@ -0,0 +1,84 @@
+"""
+GUI startup time (request user-018). Run from the SmartLibrary directory; the
+database in backend/config.py is only read:
+
+    python -m benchmarks.startup_bench --runs 5
+
+window      a fresh process imports GUI/gui_app.py and shows MainWindow
+            (offscreen), once with the configured database and once with
+            --unreachable-host, which never answers; both should take the same
+            time since nothing touches the database before the window is up
+users table resolving the users table identifier (backend/schema.py): probing
+            the database against reading the persisted cache file
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+CHILD_FLAG = "--child"
+
+
+def child():
+    """Runs in the measured process: time from here to a shown, painted window"""
+    began = time.perf_counter()
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtWidgets import QApplication
+    from GUI.gui_app import MainWindow
+    app = QApplication([])
+    window = MainWindow()
+    window.show()
+    app.processEvents()
+    print(time.perf_counter() - began, flush=True)
+    os._exit(0)   # don't wait for migrations still trying to connect
+
+
+def time_window(runs, env):
+    seconds = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-m", "benchmarks.startup_bench", CHILD_FLAG],
+                             env=dict(os.environ, **env), capture_output=True, text=True, timeout=120)
+        if out.returncode != 0:
+            raise RuntimeError(out.stderr)
+        seconds.append(float(out.stdout.split()[-1]))
+    return statistics.median(seconds) * 1000
+
+
+def time_users_table(runs):
+    from backend.config import db_config
+    from backend.schema import SchemaCache
+    cold, warm = [], []
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "schema.json")
+        for _ in range(runs):
+            if os.path.exists(path):
+                os.remove(path)
+            for timings in (cold, warm):   # first probes and saves, second reads the file
+                SchemaCache._resolved.clear()   # as in a new process
+                began = time.perf_counter()
+                SchemaCache(db_config, path=path).table("users")
+                timings.append(time.perf_counter() - began)
+    return statistics.median(cold) * 1000, statistics.median(warm) * 1000
+
+
+def main():
+    if CHILD_FLAG in sys.argv:
+        child()
+    parser = argparse.ArgumentParser(description="Benchmark GUI startup")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--unreachable-host", default="10.255.255.1",
+                        help="address that drops connection attempts")
+    args = parser.parse_args()
+
+    print(f"window, database up:          {time_window(args.runs, {}):7.1f} ms")
+    print(f"window, database unreachable: "
+          f"{time_window(args.runs, {'SMARTLIBRARY_DB_HOST': args.unreachable_host}):7.1f} ms")
+    probed, cached = time_users_table(args.runs)
+    print(f"users table: probed {probed:.1f} ms, from the cache file {cached:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
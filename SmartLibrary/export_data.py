@@ -0,0 +1,38 @@
+import argparse
+import sys
+from datetime import date
+from backend.exporter import DataExporter, EXPORTS
+from backend.config import db_config
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Stream library tables to CSV, JSON Lines or Parquet",
+        epilog="loan includes the archived loans (archived column true)")
+    parser.add_argument("table", choices=sorted(EXPORTS))
+    parser.add_argument("--format", choices=["csv", "jsonl", "parquet"], default="csv")
+    parser.add_argument("--output", "-o", default="-", help="file to write, '-' for stdout (not for parquet)")
+    parser.add_argument("--category", help="book: only this category")
+    parser.add_argument("--since", type=date.fromisoformat, help="loan: borrowed on or after YYYY-MM-DD")
+    parser.add_argument("--until", type=date.fromisoformat, help="loan: borrowed before YYYY-MM-DD")
+    args = parser.parse_args()
+
+    exporter = DataExporter(db_config)
+    filters = {"category": args.category, "since": args.since, "until": args.until}
+
+    if args.format == "parquet":
+        if args.output == "-":
+            parser.error("parquet needs --output")
+        rows = exporter.export(args.table, args.output, "parquet", **filters)
+    elif args.output == "-":
+        rows = exporter.export(args.table, sys.stdout, args.format, **filters)
+    else:
+        with open(args.output, "w", newline="", encoding="utf-8") as out:
+            rows = exporter.export(args.table, out, args.format, **filters)
+
+    if rows is not None:
+        print(f"Exported {rows} rows from {args.table}.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
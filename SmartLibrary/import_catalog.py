@@ -0,0 +1,28 @@
+import argparse
+from backend.importer import CatalogImporter
+from backend.config import db_config
+
+
+def show_progress(stats):
+    rate = stats["read"] / stats["seconds"] if stats["seconds"] else 0
+    print(f"  {stats['read']} rows read, {stats['books_added']} books added, "
+          f"{stats['duplicates']} duplicates ({rate:.0f} rows/s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import books from CSV or JSON Lines")
+    parser.add_argument("path", help="file with title, category, isbn, copies_available, authors columns")
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="default: guessed from the extension")
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    print(f"===== IMPORTING {args.path} =====")
+    importer = CatalogImporter(db_config, chunk_size=args.chunk_size, progress=show_progress)
+    stats = importer.import_file(args.path, args.format)
+    print(f"\nDone in {stats['seconds']:.1f}s: {stats['books_added']} books added, "
+          f"{stats['duplicates']} duplicates skipped, {stats['rejected']} rows rejected, "
+          f"{stats['author_links']} author links.")
+
+
+if __name__ == "__main__":
+    main()
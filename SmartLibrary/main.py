@@ -1,13 +1,13 @@
 from backend.user import User
 from backend.member import Member
 from backend.librarian import Librarian
+from backend.migrate import migrate
+from backend.config import db_config
 
-db_config = {
-    "host": "localhost",
-    "database": "smartlibrary",
-    "user": "postgres",
-    "password": "Pes@2022"
-}
+try:
+    migrate(db_config)
+except Exception as e:
+    print("Error applying database migrations:", e)
 
 print("===== SMART LIBRARY LOGIN =====")
 username = input("Username: ")
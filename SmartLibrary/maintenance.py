@@ -0,0 +1,56 @@
+import argparse
+from decimal import Decimal
+from backend.maintenance import LoanArchiver, expire_holds
+from backend.leaderboard import Leaderboard
+from backend.fines import FineEngine
+from backend.migrate import migrate
+from backend.config import db_config
+
+
+def main():
+    # Run `python maintenance.py migrate` once when setting up a database.
+    # The other jobs are meant to be run from cron / Task Scheduler, e.g. nightly:
+    #   python maintenance.py archive-loans --months 12
+    #   python maintenance.py assess-fines
+    parser = argparse.ArgumentParser(description="SmartLibrary maintenance jobs")
+    jobs = parser.add_subparsers(dest="job", required=True)
+
+    jobs.add_parser("migrate", help="create the schema and apply pending migrations (search indexes etc.)")
+
+    archive = jobs.add_parser("archive-loans", help="move old returned loans to loan_archive")
+    archive.add_argument("--months", type=int, default=12, help="keep this many months of returned loans")
+    archive.add_argument("--batch-size", type=int, default=1000)
+    archive.add_argument("--max-batches", type=int, help="stop after this many batches")
+
+    jobs.add_parser("refresh-leaderboard", help="recompute the 7/30-day most-borrowed rankings")
+
+    holds = jobs.add_parser("expire-holds", help="pass uncollected hold copies to the next in line")
+    holds.add_argument("--pickup-days", type=int, default=3, help="days a set-aside copy is kept")
+
+    fines = jobs.add_parser("assess-fines", help="find overdue loans and bring their fines up to date")
+    fines.add_argument("--rate", type=Decimal, default=Decimal("0.50"), help="fine per day overdue")
+    fines.add_argument("--grace-days", type=int, default=2, help="days after the due date before fines start")
+    fines.add_argument("--max-fine", type=Decimal, default=Decimal("20.00"), help="cap per loan")
+    fines.add_argument("--batch-size", type=int, default=5000)
+
+    args = parser.parse_args()
+
+    if args.job == "migrate":
+        applied = migrate(db_config)
+        print(f"{len(applied)} migrations applied." if applied else "Schema is up to date.")
+    elif args.job == "archive-loans":
+        archiver = LoanArchiver(db_config, batch_size=args.batch_size)
+        archiver.archive_returned_loans(args.months, args.max_batches)
+    elif args.job == "refresh-leaderboard":
+        Leaderboard(db_config).refresh()
+        print("Leaderboard refreshed.")
+    elif args.job == "expire-holds":
+        expire_holds(db_config, args.pickup_days)
+    elif args.job == "assess-fines":
+        engine = FineEngine(db_config, daily_rate=args.rate, grace_days=args.grace_days,
+                            max_fine=args.max_fine, batch_size=args.batch_size)
+        engine.run()
+
+
+if __name__ == "__main__":
+    main()
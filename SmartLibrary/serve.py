@@ -0,0 +1,23 @@
+import argparse
+from backend.service import serve
+from backend.migrate import migrate
+from backend.config import db_config
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the SmartLibrary HTTP/JSON service")
+    parser.add_argument("--host", default="127.0.0.1",
+                        help="address to bind (0.0.0.0 for every interface)")
+    parser.add_argument("--port", type=int, default=8080)
+    args = parser.parse_args()
+
+    try:
+        migrate(db_config)
+    except Exception as e:
+        print("Error applying database migrations:", e)
+
+    serve(db_config, args.host, args.port)
+
+
+if __name__ == "__main__":
+    main()
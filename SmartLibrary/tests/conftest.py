@@ -0,0 +1,82 @@
+"""
+Database tests run against a scratch PostgreSQL database named by the
+SMARTLIBRARY_TEST_DB environment variable (the other connection settings come
+from backend/config.py). They are skipped when the variable is unset, psycopg2
+is missing or the server can't be reached. Migrations are applied first.
+
+    SMARTLIBRARY_TEST_DB=smartlibrary_test python -m pytest -q
+"""
+import os
+import sys
+import uuid
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+TEST_DB = os.environ.get("SMARTLIBRARY_TEST_DB")
+
+
+@pytest.fixture(scope="session")
+def db_config():
+    if not TEST_DB:
+        pytest.skip("set SMARTLIBRARY_TEST_DB to a scratch database to run the database tests")
+    psycopg2 = pytest.importorskip("psycopg2")
+    from backend.config import db_config as base
+    from backend.migrate import migrate
+
+    config = dict(base, database=TEST_DB)
+    try:
+        psycopg2.connect(**config).close()
+    except psycopg2.OperationalError as e:
+        pytest.skip(f"database {TEST_DB} not reachable: {e}")
+    migrate(config, verbose=False)
+    return config
+
+
+class Factory:
+    """Creates uniquely named rows for one test, straight through psycopg2"""
+
+    def __init__(self, db_config):
+        import psycopg2
+        self.conn = psycopg2.connect(**db_config)
+        self.conn.autocommit = True
+        self.tag = uuid.uuid4().hex[:10]
+
+    def execute(self, sql, params=None):
+        cur = self.conn.cursor()
+        try:
+            cur.execute(sql, params)
+            return cur.fetchall() if cur.description else None
+        finally:
+            cur.close()
+
+    def member(self, role_id=2):
+        """A new user + Member row; returns member_id"""
+        from backend.queries import users_table
+        cur = self.conn.cursor()
+        try:
+            name = f"test_{self.tag}_{uuid.uuid4().hex[:8]}"
+            cur.execute(f"INSERT INTO {users_table(cur)} (username, password, role_id, full_name) "
+                        "VALUES (%s, 'x', %s, %s) RETURNING user_id;", (name, role_id, name))
+            user_id = cur.fetchone()[0]
+            cur.execute("INSERT INTO member (user_id) VALUES (%s) RETURNING member_id;", (user_id,))
+            return cur.fetchone()[0]
+        finally:
+            cur.close()
+
+    def book(self, copies, category=None):
+        """A new book with `copies` on the shelf; returns book_id"""
+        return self.execute(
+            "INSERT INTO book (title, category, isbn, copies_available) "
+            "VALUES (%s, %s, NULL, %s) RETURNING book_id;",
+            (f"Test book {self.tag}", category, copies))[0][0]
+
+    def close(self):
+        self.conn.close()
+
+
+@pytest.fixture
+def factory(db_config):
+    f = Factory(db_config)
+    yield f
+    f.close()
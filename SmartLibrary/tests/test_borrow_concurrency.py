@@ -0,0 +1,119 @@
+"""
+Concurrent borrows must never push copies_available below zero nor give a
+member more active loans than their policy allows (request user-002). Each
+test runs with hundreds of borrowers spread over a few members, all going for
+one low-stock book.
+"""
+import threading
+import pytest
+
+pytest.importorskip("psycopg2")
+
+from backend.db import get_pool, close_all_pools  # noqa: E402
+from backend.member import Member, MEMBER_ROLE  # noqa: E402
+from backend.policy import CirculationPolicy  # noqa: E402
+
+MEMBERS = 8
+LOW_STOCK = 3
+SPARE_CONNECTIONS = 10  # left on the server for the factory and other sessions
+
+
+def run_together(fns):
+    """Start every fn at the same moment; re-raise the first failure"""
+    start = threading.Barrier(len(fns))
+    errors = []
+
+    def worker(fn):
+        try:
+            start.wait()
+            fn()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(fn,)) for fn in fns]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    if errors:
+        raise errors[0]
+
+
+@pytest.fixture(params=[50, 200])
+def workers(request):
+    return request.param
+
+
+@pytest.fixture
+def pooled_config(db_config, factory, workers):
+    """
+    db_config with a pool of its own, one connection per worker as far as the
+    server's max_connections allows (the rest wait in getconn()). The extra
+    application_name gives it a separate entry in get_pool().
+    """
+    server_max = int(factory.execute("SHOW max_connections;")[0][0])
+    config = dict(db_config, application_name=f"borrow_concurrency_{workers}")
+    get_pool(config, maxconn=max(1, min(workers, server_max - SPARE_CONNECTIONS)), timeout=120)
+    yield config
+    close_all_pools()
+
+
+def active_loans(factory, member_ids):
+    rows = factory.execute(
+        "SELECT member_id, COUNT(*) FROM loan WHERE member_id = ANY(%s) AND returned = FALSE "
+        "GROUP BY member_id;", (member_ids,))
+    return dict(rows)
+
+
+def test_stock_never_goes_negative(pooled_config, factory, workers):
+    max_loans = CirculationPolicy(pooled_config).rule(MEMBER_ROLE).max_loans
+    book_id = factory.book(LOW_STOCK)
+    member_ids = [factory.member() for _ in range(MEMBERS)]
+    desks = [Member(pooled_config, member_ids[i % MEMBERS], "test") for i in range(workers)]
+    results = []
+
+    run_together([lambda d=d: results.append(d.borrow_book(book_id)) for d in desks])
+
+    statuses = [r["status"] for r in results]
+    assert "error" not in statuses
+    assert statuses.count("borrowed") == LOW_STOCK
+    stock, loans = factory.execute(
+        "SELECT b.copies_available, (SELECT COUNT(*) FROM loan WHERE book_id=b.book_id AND returned=FALSE) "
+        "FROM book b WHERE b.book_id=%s;", (book_id,))[0]
+    assert stock == 0
+    assert loans == LOW_STOCK
+    assert all(n <= max_loans for n in active_loans(factory, member_ids).values())
+
+
+def test_member_limit_holds_under_concurrency(pooled_config, factory, workers):
+    max_loans = CirculationPolicy(pooled_config).rule(MEMBER_ROLE).max_loans
+    assert workers // MEMBERS > max_loans, "every member needs more attempts than their limit"
+    low_stock = factory.book(LOW_STOCK)
+    book_ids = [factory.book(5) for _ in range(workers)]
+    member_ids = [factory.member() for _ in range(MEMBERS)]
+
+    # every worker borrows its own book for one of the members, singly or in a
+    # batch together with the low-stock book
+    results = []
+    fns = []
+    for i in range(workers):
+        desk = Member(pooled_config, member_ids[i % MEMBERS], "test")
+        if i % 2:
+            fns.append(lambda d=desk, b=book_ids[i]: results.append(d.borrow_book(b)))
+        else:
+            fns.append(lambda d=desk, b=book_ids[i]: results.extend(d.borrow_books([b, low_stock])))
+    run_together(fns)
+
+    assert not [r for r in results if r["status"] == "error"]
+
+    # each member had plenty of attempts on books in stock: exactly at the limit
+    assert active_loans(factory, member_ids) == {m: max_loans for m in member_ids}
+    rows = factory.execute(
+        "SELECT b.book_id, b.copies_available, "
+        "(SELECT COUNT(*) FROM loan WHERE book_id=b.book_id AND returned=FALSE) "
+        "FROM book b WHERE b.book_id = ANY(%s);", (book_ids + [low_stock],))
+    initial = dict.fromkeys(book_ids, 5)
+    initial[low_stock] = LOW_STOCK
+    for book_id, stock, loans in rows:
+        assert stock >= 0
+        assert stock + loans == initial[book_id]
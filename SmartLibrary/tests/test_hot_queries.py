@@ -0,0 +1,81 @@
+"""
+Every statement in backend/migrate.py HOT_QUERIES must be planned with its
+expected indexes once the migrations are applied (request user-011). The
+planner runs with its normal settings, so the scratch database is first
+filled to a realistic size; the rows are kept for later runs.
+"""
+import pytest
+
+pytest.importorskip("psycopg2")
+
+from backend.migrate import HOT_QUERIES, check_hot_queries  # noqa: E402
+from backend.queries import users_table  # noqa: E402
+
+BOOKS = 20_000
+AUTHORS = 2_000
+MEMBERS = 2_000
+LOANS = 100_000   # one in twenty still active
+
+VOLUME_SQL = {
+    "book": """
+        INSERT INTO book (title, category, isbn, copies_available)
+        SELECT 'Volume ' || md5(i::text), (ARRAY['Fiction','History','Science','Poetry','Travel'])[1 + i %% 5],
+               NULL, i %% 3
+        FROM generate_series(1, %(n)s) i;
+    """,
+    "author": """
+        INSERT INTO author (full_name) SELECT 'Volume Author ' || md5(i::text) FROM generate_series(1, %(n)s) i;
+    """,
+    "member": """
+        WITH users AS (
+            INSERT INTO {users} (username, password, role_id, full_name)
+            SELECT 'volume_' || md5(random()::text), 'x', 2, 'Volume Member'
+            FROM generate_series(1, %(n)s) i
+            RETURNING user_id
+        )
+        INSERT INTO member (user_id) SELECT user_id FROM users;
+    """,
+    "loan": """
+        INSERT INTO loan (book_id, member_id, borrow_date, due_date, returned)
+        SELECT b.ids[1 + i %% cardinality(b.ids)], m.ids[1 + (i * 7) %% cardinality(m.ids)],
+               CURRENT_DATE - i %% 700, CURRENT_DATE - i %% 700 + 14, i %% 20 <> 0
+        FROM generate_series(1, %(n)s) i,
+             (SELECT array_agg(book_id) AS ids FROM book) b,
+             (SELECT array_agg(member_id) AS ids FROM member) m;
+    """,
+}
+
+
+@pytest.fixture(scope="module")
+def volume(db_config):
+    """Top the scratch database up to the sizes above and refresh its statistics"""
+    from conftest import Factory
+    f = Factory(db_config)
+    try:
+        cur = f.conn.cursor()
+        users = users_table(cur)
+        cur.close()
+        for table, size in (("book", BOOKS), ("author", AUTHORS), ("member", MEMBERS), ("loan", LOANS)):
+            have = f.execute(f"SELECT COUNT(*) FROM {table};")[0][0]
+            if have < size:
+                f.execute(VOLUME_SQL[table].format(users=users), {"n": size - have})
+        f.execute("""
+            INSERT INTO bookauthors (book_id, author_id)
+            SELECT b.book_id, a.ids[1 + b.book_id % cardinality(a.ids)]
+            FROM book b, (SELECT array_agg(author_id) AS ids FROM author) a
+            WHERE NOT EXISTS (SELECT 1 FROM bookauthors ba WHERE ba.book_id = b.book_id);
+        """)
+        f.execute("ANALYZE;")
+    finally:
+        f.close()
+
+
+@pytest.fixture(scope="module")
+def plans(db_config, volume):
+    return check_hot_queries(db_config)
+
+
+@pytest.mark.parametrize("name", sorted(HOT_QUERIES))
+def test_hot_query_uses_its_indexes(plans, name):
+    missing, used = plans[name]
+    assert not missing, f"{name} does not use {missing}; its plan reads {used or 'no index'}"
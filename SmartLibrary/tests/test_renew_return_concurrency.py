@@ -0,0 +1,53 @@
+"""
+Renewals racing returns of the same loans (request user-024): a returned loan
+must not be renewed afterwards, every successful renewal must be counted, no
+loan may pass its renewal limit and each copy goes back on the shelf once.
+"""
+import pytest
+
+pytest.importorskip("psycopg2")
+
+from backend.member import Member, MEMBER_ROLE  # noqa: E402
+from backend.policy import CirculationPolicy  # noqa: E402
+from test_borrow_concurrency import run_together  # noqa: E402
+
+RENEWERS = 6
+RETURNERS = 2
+ROUNDS = 5
+
+
+def test_renewals_and_returns_on_the_same_loans(db_config, factory):
+    rule = CirculationPolicy(db_config).rule(MEMBER_ROLE)
+    copies = 2
+
+    for _ in range(ROUNDS):
+        member_id = factory.member()
+        book_ids = [factory.book(copies) for _ in range(min(rule.max_loans, 3))]
+        borrowed = Member(db_config, member_id, "test").borrow_books(book_ids)
+        loan_ids = [r["loan_id"] for r in borrowed]
+        assert None not in loan_ids
+
+        renewals, returns = [], []
+        fns = [lambda d=Member(db_config, member_id, "test"): renewals.extend(d.renew_loans(loan_ids))
+               for _ in range(RENEWERS)]
+        fns += [lambda d=Member(db_config, member_id, "test"): returns.extend(d.return_books(loan_ids))
+                for _ in range(RETURNERS)]
+        run_together(fns)
+
+        assert not [r for r in renewals + returns if r["status"] == "error"]
+        # both returners asked for every loan; exactly one of them got each
+        returned = [r["loan_id"] for r in returns if r["status"] == "returned"]
+        assert sorted(returned) == sorted(loan_ids)
+
+        rows = factory.execute(
+            "SELECT loan_id, returned, renewals FROM loan WHERE loan_id = ANY(%s);", (loan_ids,))
+        assert len(rows) == len(loan_ids)
+        for loan_id, is_returned, count in rows:
+            assert is_returned
+            assert count <= rule.max_renewals
+            # no renewal was lost, and none was reported that didn't happen
+            assert count == sum(1 for r in renewals if r["loan_id"] == loan_id and r["status"] == "renewed")
+
+        stock = factory.execute(
+            "SELECT book_id, copies_available FROM book WHERE book_id = ANY(%s);", (book_ids,))
+        assert sorted(stock) == sorted((b, copies) for b in book_ids)